@@ -1,110 +1,229 @@
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
-import keyword 
+import os
+import re
+import sys
+from tkinter import messagebox, ttk
+from editor_core import (EDITOR_FONT, apply_theme, busy_with, create_text_widget, is_replacing, status_message,
+                         theme_colors, use_lexer_for)
+from large_file import LargeFileView, is_large_file
+from tab_registry import DocumentState, TabRegistry
+from file_io import INSERT_SLICE, FileSaver, TextLoader, iter_file_text, iter_string_text
+from text_buffer import TextBuffer
+from session import document_entry, iter_compressed_text, load_session, save_session, unsaved_path
 
 # Global variable to store the current file path
 current_file = None
 
-# Theme configurations
-dark_theme = {
-    "bg": "#1e1e1e",        # Background: dark gray
-    "fg": "#d4d4d4",        # Foreground (text): light gray
-    "cursor": "#ffffff",    # Cursor: white
-    "select_bg": "#264f78"  # Selection background: blue
-}
-light_theme = {
-    "bg": "#ffffff",        # Background: white
-    "fg": "#000000",        # Foreground: black
-    "cursor": "#000000",    # Cursor: black
-    "select_bg": "#0078d7"  # Selection: blue
-}
-
 is_dark_mode = False   # Track theme state
 
-# Create main application window
-root = tk.Tk()
-root.title("Simple Text Editor")
-root.geometry("800x600")
-
-# --- STATUS BAR (Create FIRST so it stays at bottom) ---
-# Create a Frame (an invisible container/box) at the bottom
-status_bar = tk.Frame(root, height=20)
-status_bar.pack(side=tk.BOTTOM, fill=tk.X)
-# Create a StringVar — a "smart" variable
-status_text = tk.StringVar()
-status_text.set("Line: 1 | Column: 0 | Words: 0 | Chars: 0")
-# Put a Label inside the Frame, connected to the StringVar
-status_label = tk.Label(status_bar, textvariable=status_text, anchor=tk.E, padx=10)
-status_label.pack(fill=tk.X)
-
-# --- TABS SETUP (Create SECOND to fill remaining space) ---
-notebook = ttk.Notebook(root)
-notebook.pack(expand=True, fill=tk.BOTH)
+# The window and its widgets, made by build_window()
+root = None
+status_bar = None
+status_text = None
+status_label = None
+notebook = None
+registry = None     # tab id -> DocumentState (see tab_registry.py)
+outline_panel = None    # View -> Outline, None while hidden
+watcher = None          # notices other programs changing open files (file_watch.py)
 
 
 # --- FUNCTION TO GET ACTIVE TEXT WIDGET ---
 def get_current_text_widget():
-    # Get the currently selected tab ID
-    tab_id = notebook.select()
-    if not tab_id: return None
-    
-    # Get the widget object from ID
-    tab_frame = notebook.nametowidget(tab_id)
-    
-    # Find the Text widget inside this frame
-    for child in tab_frame.winfo_children():
-        if isinstance(child, tk.Text):
-            return child
-    return None
+    # The registry knows the document behind each tab (no searching the
+    # frame's children). Only the selected tab is guaranteed a live widget
+    doc = registry.current()
+    return doc.text if doc else None
 
 
-# --- FUNCTION TO CREATE NEW TAB ---
-def create_editor_tab(content="", title="Untitled"):
-    # 1. Create a frame for the tab
+# --- FUNCTION TO ADD AN EMPTY TAB ---
+# A frame with its scrollbar, in the notebook and the registry. The Text
+# widget comes later (build_text_widget / build_large_view)
+def new_tab_frame(doc, label=None):
     frame = tk.Frame(notebook)
     # Create a scrollbar for the text widget
     scrollbar = tk.Scrollbar(frame)
     scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
+    frame.scrollbar = scrollbar
     frame.pack(expand=True, fill=tk.BOTH)
-    # 2. Add the frame to notebook
-    notebook.add(frame, text=title)
-    
+    notebook.add(frame, text=label or doc.title)
+    registry.add(frame, doc)
+    if doc.path:
+        watcher.watch(doc, doc.path)
+    return frame
+
+
+# --- FUNCTION TO CREATE NEW TAB ---
+def create_editor_tab(content="", title="Untitled", file_path=None, position=None):
+    # 1-2. Create the tab's frame, and its document in the registry
+    doc = DocumentState(title, file_path)
+    frame = new_tab_frame(doc)
 
     # 3. Create Text widget inside the frame
-    text_widget = tk.Text(
-        frame,
-        wrap=tk.WORD,
-        font=("Helvetica", 18),
-        undo=True
-    )
-    text_widget.pack(expand=True, fill=tk.BOTH)
+    text_widget = build_text_widget(doc)
     
-    # 4. Insert content if any
-    if content:
+    # 4. Insert content if any. Files and big strings are streamed in over
+    #    several ticks (file_io.py) so the window never freezes
+    if file_path:
+        load_into_tab(frame, text_widget, iter_file_text(file_path), title, position=position)
+    elif len(content) > INSERT_SLICE:
+        load_into_tab(frame, text_widget, iter_string_text(content), title, in_thread=False)
+    elif content:
         text_widget.insert("1.0", content)
         
     # 5. Make this the active tab
     notebook.select(frame)
-    
-    # 6. Apply bindings to THIS specific text widget
-    text_widget.bind("<KeyRelease>", lambda e: [update_status(), apply_syntax_highlighting()])
+    return text_widget
+
+
+# --- FUNCTION TO BUILD THE TEXT WIDGET OF A TAB ---
+# Used for new tabs, and again when a parked tab is selected: then the
+# document's buffer already holds the text and the widget is filled from it
+def build_text_widget(doc):
+    # The widget with its buffer, scheduler, highlighting, counts, undo,
+    # font sizes and crash-recovery journal (see editor_core.py). The status
+    # bar follows keys, clicks and the selection; the file name picks the
+    # highlighting language
+    text_widget = create_text_widget(doc.frame, SESSION_NAME, on_status=update_status, buffer=doc.buffer,
+                                     path=doc.path)
+    text_widget.journal.start(doc.title, doc.path, clean=not doc.dirty)
+    text_widget.loader = None
+    text_widget.reloader = None     # FileReload (file_watch.py) while reloading
+    doc.text = text_widget
+    doc.buffer = text_widget.buffer
+
+    # Apply bindings to THIS specific text widget
     text_widget.bind("<<Modified>>", lambda e: on_text_change())
-    # Update status on click/focus
-    text_widget.bind("<ButtonRelease-1>", lambda e: update_status())
-    text_widget.bind("<FocusIn>", lambda e: update_status())
+    # Update status on focus
+    text_widget.bind("<FocusIn>", lambda e: text_widget.scheduler.trigger("status"))
+    text_widget.bind("<Escape>", lambda e: cancel_loading())
     
-    # Apply current theme to new tab
-    theme = dark_theme if is_dark_mode else light_theme
-    text_widget.config(
-        bg=theme["bg"],
-        fg=theme["fg"],
-        insertbackground=theme["cursor"],
-        selectbackground=theme["select_bg"]
-    )
+    # Apply current theme to the widget
+    apply_theme(text_widget, is_dark_mode)
+    text_widget.scheduler.trigger("highlight")
     
     return text_widget
 
+# Only idle, unmodified tabs give up their widget. Parking drops the undo
+# history, and can't happen halfway through a load or save
+def can_park(doc):
+    text = doc.text
+    if getattr(text, "large_view", None) or text.loader or text.reloader or getattr(text, "saver", None):
+        return False
+    find_window = getattr(text, "find_window", None)
+    if find_window is not None and find_window.winfo_exists():
+        return False    # a Find & Replace window is working on this widget
+    return not is_replacing(text) and not text.edit_modified()
+
+# --- FUNCTION TO BRING BACK A TAB WITHOUT A WIDGET ---
+# Parked tabs are rebuilt from their buffer. Tabs restored from the last
+# session have never been read yet: that happens now, on first selection
+def materialize_tab(doc):
+    if doc.kind == "large":
+        text = build_large_view(doc)
+        go_to_line_when_indexed(text, int(doc.cursor.split(".")[0]))
+        return
+    loaded = doc.buffer is not None
+    text = build_text_widget(doc)
+    if loaded or not (doc.pending or doc.path):
+        return
+
+    def restore_loaded():
+        doc.pending = None
+        registry.restore(doc)
+        text.see(tk.INSERT)
+        if doc.dirty:
+            notebook.tab(doc.frame, text="*" + doc.title)
+
+    if doc.pending:
+        chunks = iter_compressed_text(unsaved_path(SESSION_NAME, doc.pending))
+    else:
+        chunks = iter_file_text(doc.path)
+        watcher.watch(doc, doc.path)    # changes from now on, not since the last session
+    load_into_tab(doc.frame, text, chunks, doc.title, on_loaded=restore_loaded)
+
+# A tab was selected: rebuild it if it was parked, then refresh the status
+# and the outline
+def on_tab_changed(event=None):
+    registry.on_tab_changed()
+    if outline_panel:
+        outline_panel.show(get_current_text_widget())
+    update_status()
+
+
+# --- FUNCTION TO STREAM TEXT INTO A TAB ---
+# Shows the progress in the tab title; a cancelled or failed load closes the tab.
+# `position` ("line.column") is where the cursor goes once the text is in,
+# `on_loaded` is called after that
+def load_into_tab(frame, text_widget, chunks, title, in_thread=True, position=None, on_loaded=None):
+    def show_progress(percent):
+        notebook.tab(frame, text=f"{title} ({percent}%)")
+
+    def finished(cancelled, error):
+        text_widget.loader = None
+        text_widget.undo_manager.resume()
+        if cancelled or error:
+            if error:
+                messagebox.showerror("Error", f"Could not open {title}:\n{error}")
+            notebook.forget(frame)
+            watcher.forget(registry.remove(frame))
+            frame.destroy()
+            if not notebook.tabs():
+                create_editor_tab()
+            return
+        notebook.tab(frame, text=title)
+        if position:
+            text_widget.mark_set(tk.INSERT, position)
+            text_widget.see(tk.INSERT)
+        if on_loaded:
+            on_loaded()
+        doc = registry.get(frame)
+        text_widget.journal.start(doc.title, doc.path, clean=not text_widget.edit_modified())
+        text_widget.scheduler.trigger("status", "highlight")
+
+    # Loading isn't an edit: the journal and undo history start once the text is in
+    text_widget.journal.stop()
+    text_widget.undo_manager.pause()
+    text_widget.loader = TextLoader(text_widget, chunks, show_progress, finished, in_thread)
+    text_widget.loader.start()
+
+# Stop loading the current tab (Escape)
+def cancel_loading():
+    text = get_current_text_widget()
+    if text and getattr(text, "loader", None):
+        text.loader.cancel()
+
+
+# --- FUNCTION TO CREATE A LARGE-FILE TAB ---
+# Huge files are memory-mapped and shown a window of lines at a time
+# (see large_file.py). These tabs are read-only until "Edit Large File".
+def create_large_file_tab(file_path):
+    title = file_path.split("/")[-1]
+    doc = DocumentState(title, file_path, kind="large")
+    frame = new_tab_frame(doc, f"{title} (0%)")
+    text_widget = build_large_view(doc)
+    notebook.select(frame)
+    return text_widget
+
+def build_large_view(doc):
+    frame = doc.frame
+    title = doc.title
+    text_widget = tk.Text(frame, wrap=tk.NONE, font=EDITOR_FONT, undo=False)
+    text_widget.pack(expand=True, fill=tk.BOTH)
+    doc.text = text_widget      # never parked, the view holds the file open
+
+    # Show indexing progress in the tab title
+    def show_progress(percent):
+        notebook.tab(frame, text=title if percent >= 100 else f"{title} ({percent}%)")
+
+    text_widget.large_view = LargeFileView(text_widget, frame.scrollbar, doc.path, on_progress=show_progress)
+
+    text_widget.bind("<KeyRelease>", lambda e: update_status())
+    text_widget.bind("<ButtonRelease-1>", lambda e: update_status())
+    text_widget.bind("<<Modified>>", lambda e: on_text_change())
+
+    apply_theme(text_widget, is_dark_mode)
+    return text_widget
+
 
 # Function to create a new file
 def new_file():
@@ -116,12 +235,18 @@ def close_current_tab():
     if not current_tab: return
 
     # Check for unsaved changes IN THIS TAB
-    text_widget = get_current_text_widget()
-    if text_widget and text_widget.edit_modified():
+    doc = registry.get(current_tab)
+    if getattr(doc.text, "saver", None):
+        messagebox.showinfo("Please Wait", "This file is still being saved.")
+        return
+    if doc.is_modified():
         if not messagebox.askyesno("Unsaved Changes", "Close tab without saving?"):
             return # Cancel closing
 
     notebook.forget(current_tab)
+    registry.remove(current_tab)
+    watcher.forget(doc)
+    doc.frame.destroy()
     
     # If no tabs left, create new one
     if not notebook.tabs():
@@ -129,73 +254,141 @@ def close_current_tab():
 
 # Function to open an existing text file
 def open_file():
+    from tkinter import filedialog
     file_path = filedialog.askopenfilename(
         defaultextension=".txt",
         filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
     )
     if file_path:
-        with open(file_path, "r") as file:
-            content = file.read()
-            # Create NEW TAB
-            create_editor_tab(content, title=file_path.split("/")[-1])
+        # Very big files get a memory-mapped, read-only tab instead
+        if is_large_file(file_path):
+            create_large_file_tab(file_path)
+            return
+        # Create NEW TAB, the file is read in the background
+        create_editor_tab(title=file_path.split("/")[-1], file_path=file_path)
 
 # Function to save the current text to a file
 def save_file():
     text = get_current_text_widget()
     if not text: return
+    if getattr(text, "loader", None):
+        messagebox.showinfo("Please Wait", "This file is still loading.")
+        return
+    if getattr(text, "saver", None):
+        messagebox.showinfo("Please Wait", "This file is still being saved.")
+        return
+    if getattr(text, "reloader", None):
+        messagebox.showinfo("Please Wait", "This file is still being reloaded.")
+        return
 
     # Simple approach: Always Save As for now
+    from tkinter import filedialog
     file_path = filedialog.asksaveasfilename(
         defaultextension=".txt",
         filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
     )
 
     if file_path:
-        with open(file_path, "w") as file:
-            file.write(text.get("1.0", tk.END))
-        
-        # Update tab title
         current_tab = notebook.select()
-        notebook.tab(current_tab, text=file_path.split("/")[-1])
-        
-        messagebox.showinfo("Success", "File saved successfully!")
-        text.edit_modified(False)
+        name = file_path.split("/")[-1]
+        large_view = getattr(text, "large_view", None)
+        doc = registry.get(current_tab)
+        # Don't silently write over what another program saved
+        same_file = doc.path and os.path.abspath(file_path) == os.path.abspath(doc.path)
+        if same_file and watcher.changed(doc) and not messagebox.askyesno(
+                "File Changed",
+                f"{name} was changed by another program since it was opened.\n"
+                "Save anyway and replace those changes?"):
+            return
+
+        # The file is written on a worker thread from a snapshot of the
+        # document, so typing can go on while a big file is being saved
+        if large_view:
+            version = large_view.version
+            chunks = large_view.iter_chunks()   # mapped file + edits, as bytes
+        else:
+            version = text.buffer.version
+            chunks = text.buffer.snapshot().iter_chunks()
+
+        def finished(error):
+            text.saver = None
+            if not text.winfo_exists(): return
+            if error:
+                watcher.resume(doc)
+                notebook.tab(current_tab, text="*" + name)
+                messagebox.showerror("Error", f"Could not save {name}:\n{error}")
+                return
+            # Only clear the modified flag if nothing changed while saving
+            if large_view:
+                unchanged = large_view.version == version and not text.edit_modified()
+                if unchanged: large_view.mark_saved()
+            else:
+                unchanged = text.buffer.version == version
+                if unchanged:
+                    text.edit_modified(False)
+                    text.journal.start(name, file_path)     # the file is the new base
+                use_lexer_for(text, file_path)      # e.g. saved as .sql
+            notebook.tab(current_tab, text=name if unchanged else "*" + name)
+            doc.path, doc.title = file_path, name
+            watcher.update(doc, file_path)      # our own change, not someone else's
+            # Keep Find in Files indexes current (there are none unless
+            # Find in Files was used, then trigram_index.py is loaded)
+            trigram_index = sys.modules.get("trigram_index")
+            if trigram_index:
+                trigram_index.notify_saved(file_path)
+            messagebox.showinfo("Success", "File saved successfully!")
+
+        notebook.tab(current_tab, text=f"{name} (saving…)")
+        watcher.pause(doc)
+        text.saver = FileSaver(text, file_path, chunks, finished, binary=bool(large_view))
+        text.saver.start()
 
 # A function that reads cursor position and updates the status bar
 def update_status(event=None):
     text = get_current_text_widget()
     if not text: return
 
+    large_view = getattr(text, "large_view", None)
+    if large_view:
+        # The widget only holds a window of the file, ask the view instead
+        column = text.index(tk.INSERT).split(".")[1]
+        total = large_view.index.line_count()
+        prefix = "" if large_view.index.done else "~"
+        mode = "editing" if large_view.editable else "read-only"
+        status_text.set(f"Line: {large_view.current_line() + 1} of {prefix}{total} | Column: {column} | Large file ({mode})")
+        return
+
     try:
-        position = text.index(tk.INSERT)
-        line, column = position.split(".")
-        content = text.get("1.0", "end-1c")
-        word_count = len(content.split()) if content else 0
-        char_count = len(content)
-        status_text.set(f"Line: {line} | Column: {column} | Words: {word_count} | Chars: {char_count}")
+        # Cursor, counts (kept by doc_stats.py), selection and undo memory
+        status_text.set(status_message(text))
     except:
         pass 
 
-# Function to undo the last action
+# Function to undo the last action (large-file tabs have no undo). Not
+# while Replace All or a reload has the text locked: the undo would be
+# lost, and redoing it later would apply it twice
 def undo_text():
     text = get_current_text_widget()
-    if text:
-        try: text.edit_undo()
-        except tk.TclError: pass
+    if text and hasattr(text, "undo_manager") and not busy_with(text):
+        text.undo_manager.undo()
+        update_status()
 
 # Function to redo the last action
 def redo_text():
     text = get_current_text_widget()
-    if text:
-        try: text.edit_redo()
-        except tk.TclError: pass
+    if text and hasattr(text, "undo_manager") and not busy_with(text):
+        text.undo_manager.redo()
+        update_status()
 
 # Function to mark text as modified (shows * in title)
 def on_text_change(event=None):
     text = get_current_text_widget()
     if not text: return
-    
-    if text.edit_modified():
+    if getattr(text, "loader", None): return    # Loading isn't a change
+
+    large_view = getattr(text, "large_view", None)
+    modified = large_view.is_dirty if large_view else text.edit_modified()
+    if modified:
         # Get current tab index
         current_tab = notebook.select()
         current_title = notebook.tab(current_tab, "text")
@@ -204,8 +397,210 @@ def on_text_change(event=None):
 
 # Function to handle window close
 def on_closing():
+    # Quitting now would kill a save half way (the old file stays intact)
+    for doc in registry.live_docs():
+        if getattr(doc.text, "saver", None):
+            messagebox.showinfo("Please Wait", "A file is still being saved.")
+            return
     if messagebox.askyesno("Quit", "Are you sure you want to quit?"):
-        root.destroy()
+        remember_session()
+        root.destroy()      # also drops the crash journals
+        from edit_journal import flush_journals
+        flush_journals()
+
+
+# --- FILES CHANGED BY OTHER PROGRAMS (see file_watch.py) ---
+# The tab gets a bar that offers to reload. Only the lines that changed
+# are replaced, so the cursor, scroll position and undo history stay
+# (Undo takes the reload back)
+def on_file_changed(doc, path):
+    from file_watch import show_change_bar
+    if registry.get(doc.frame) is not doc:
+        return      # the tab was closed
+    name = doc.title
+
+    # Compare leaves the bar up, so Reload or Keep Mine can be picked after
+    def compare():
+        compare_with_saved(doc)
+        on_file_changed(doc, path)
+
+    if not os.path.exists(path):
+        show_change_bar(doc.frame, f"{name} was deleted or moved by another program.", [("OK", lambda: None)])
+    elif doc.kind == "large":
+        lost = " and lose your edits to it" if doc.is_modified() else ""
+        show_change_bar(doc.frame, f"{name} was changed by another program. Reopen it{lost}?",
+                        [("Reopen", lambda: reopen_large_file(doc)), ("Ignore", lambda: None)])
+    elif doc.is_modified():
+        show_change_bar(doc.frame, f"{name} was changed by another program. Reload it and replace your changes?",
+                        [("Reload", lambda: reload_tab(doc)), ("Compare", compare), ("Keep Mine", lambda: None)])
+    else:
+        show_change_bar(doc.frame, f"{name} was changed by another program.",
+                        [("Reload", lambda: reload_tab(doc)), ("Compare", compare), ("Ignore", lambda: None)])
+
+def reload_tab(doc):
+    from file_watch import FileReload
+    text = doc.text
+    if text is None or text.loader or text.reloader or getattr(text, "saver", None):
+        return
+    if is_replacing(text):
+        # Its offsets would go stale under the reload
+        messagebox.showinfo("Please Wait", "Replace All is still running, reload once it is done.")
+        on_file_changed(doc, doc.path)      # bring the bar back
+        return
+
+    def finished(error, signature):
+        text.reloader = None
+        if not text.winfo_exists(): return
+        if error:
+            notebook.tab(doc.frame, text="*" + doc.title)
+            messagebox.showerror("Error", f"Could not reload {doc.title}:\n{error}")
+            return
+        watcher.update(doc, doc.path, signature)
+        notebook.tab(doc.frame, text=doc.title)
+        text.journal.start(doc.title, doc.path)     # the file is the journal's new base
+        text.scheduler.trigger("status")
+
+    notebook.tab(doc.frame, text=f"{doc.title} (reloading…)")
+    text.reloader = FileReload(text, doc.path, finished)
+    text.reloader.start()
+
+# The memory-mapped view can't follow a file that changed under it: open it again
+def reopen_large_file(doc):
+    if getattr(doc.text, "saver", None):
+        return
+    doc.text.destroy()      # also closes the mapping
+    build_large_view(doc)
+    watcher.update(doc)
+
+
+# --- COMPARE (see diff_engine.py and diff_view.py) ---
+# Shows two documents side by side with the lines that differ highlighted:
+# a tab and its file on disk, or two tabs. The diff runs in the background
+
+# The text of a document, as a function the diff's worker thread can call
+# (it must not touch any widget there)
+def document_reader(doc):
+    buffer = doc.text.buffer if doc.text is not None else doc.buffer
+    if buffer is not None:
+        return buffer.snapshot().get_text   # a snapshot never changes, safe to read anywhere
+    if doc.pending:
+        path = unsaved_path(SESSION_NAME, doc.pending)
+        return lambda: "".join(chunk for chunk, percent in iter_compressed_text(path))
+    from diff_engine import read_file_text
+    return lambda: read_file_text(doc.path, doc.encoding)
+
+def can_compare(doc):
+    if doc.kind == "large":
+        messagebox.showinfo("Compare", f"{doc.title} is open as a large file and can't be compared.")
+        return False
+    if doc.text is not None and doc.text.loader:
+        messagebox.showinfo("Please Wait", f"{doc.title} is still loading.")
+        return False
+    return True
+
+def compare_with_saved(doc=None):
+    doc = doc or registry.current()
+    if doc is None or not can_compare(doc):
+        return
+    if not doc.path or not os.path.exists(doc.path):
+        messagebox.showinfo("Compare", "This tab has no saved file to compare with.")
+        return
+    from diff_engine import read_file_text
+    from diff_view import DiffView
+    path, encoding = doc.path, doc.encoding
+    DiffView(root, f"{doc.title} (on disk)", lambda: read_file_text(path, encoding),
+             f"{doc.title} (this tab)", document_reader(doc), is_dark_mode)
+
+def compare_with_tab():
+    from diff_view import DiffView, ask_choice
+    doc = registry.current()
+    if doc is None or not can_compare(doc):
+        return
+    others = [registry.get(tab) for tab in notebook.tabs()]
+    others = [other for other in others if other is not None and other is not doc and other.kind != "large"]
+    if not others:
+        messagebox.showinfo("Compare", "Open another tab to compare this one with.")
+        return
+
+    def picked(position):
+        other = others[position]
+        if registry.get(other.frame) is not other or registry.get(doc.frame) is not doc:
+            return      # closed in the meantime
+        if can_compare(other) and can_compare(doc):
+            DiffView(root, other.title, document_reader(other), doc.title, document_reader(doc), is_dark_mode)
+
+    ask_choice(root, f"Compare {doc.title} With", [other.title for other in others], picked)
+
+
+# --- SESSION (see session.py) ---
+# On quit the open tabs, cursors, scroll positions and unsaved text are
+# written down. On start the tab strip comes back at once; each file is
+# only read when its tab is first selected (materialize_tab)
+SESSION_NAME = "advanced"
+
+def remember_session():
+    docs = [registry.get(tab_id) for tab_id in notebook.tabs()]
+    selected = notebook.index(notebook.select()) if notebook.select() else 0
+    try:
+        save_session(SESSION_NAME, [document_entry(doc) for doc in docs if doc], selected)
+    except OSError as error:
+        messagebox.showwarning("Session", f"Could not save the session:\n{error}")
+
+# Returns False if there was no session to restore
+def restore_session():
+    session = load_session(SESSION_NAME)
+    if not session:
+        return False
+    entries, selected = session
+    frames = []
+    for entry in entries:
+        # Files deleted since then are dropped (unless there's unsaved text)
+        if entry["path"] and not entry["unsaved"] and not os.path.exists(entry["path"]):
+            continue
+        doc = DocumentState(entry["title"], entry["path"], kind=entry["kind"])
+        doc.cursor = entry["cursor"]
+        doc.top = entry["top"]
+        doc.styles = entry["styles"]
+        doc.pending = entry["unsaved"]
+        doc.dirty = bool(doc.pending)
+        label = "*" + doc.title if doc.dirty else doc.title
+        frames.append(new_tab_frame(doc, label))
+    if not frames:
+        return False
+    notebook.select(frames[min(selected, len(frames) - 1)])
+    return True
+
+
+# --- CRASH RECOVERY (see edit_journal.py) ---
+# Journals left behind mean the editor didn't quit normally: offer to
+# bring those documents back, each in its own tab
+def offer_recovery():
+    from edit_journal import discard_journal, find_orphans, flush_journals, recover
+    folders = find_orphans(SESSION_NAME)
+    documents = [document for document in map(recover, folders) if document]
+    accepted = documents and messagebox.askyesno(
+        "Recover Unsaved Changes",
+        f"The editor didn't close properly last time.\n"
+        f"Recover the unsaved changes to {len(documents)} document(s)?")
+    if not accepted:
+        for folder in folders:
+            discard_journal(folder)
+        return
+    frame = None
+    for title, path, content in documents:
+        doc = DocumentState(title, path)
+        doc.buffer = TextBuffer(content)
+        doc.dirty = True
+        frame = new_tab_frame(doc, "*" + title)
+        # Built right away (not when first selected): its own journal then
+        # holds the recovered text before the old journals are deleted
+        build_text_widget(doc)
+        registry.restore(doc)
+        registry.touch(doc)
+    flush_journals()
+    for folder in folders:
+        discard_journal(folder)
+    notebook.select(frame)
 
 def cut_text():
     text = get_current_text_widget()
@@ -225,68 +620,240 @@ def select_all():
         text.tag_add("sel", "1.0", "end-1c")
         return "break"
 
-# Function to find and replace text window render
+# Function to open the Find & Replace window (see find_dialog.py, only
+# loaded the first time it is needed)
 def find_replace():
     text = get_current_text_widget()
     if not text: return
-    
-    find_window = tk.Toplevel(root)
-    find_window.title("Find & Replace")
-    find_window.geometry("400x150")
-    find_window.resizable(False, False)
-    
-    tk.Label(find_window, text="Find:").grid(row=0, column=0, padx=5, pady=5, sticky="e")
-    find_entry = tk.Entry(find_window, width=30)
-    find_entry.grid(row=0, column=1, padx=5, pady=5)
-    
-    tk.Label(find_window, text="Replace:").grid(row=1, column=0, padx=5, pady=5, sticky="e")
-    replace_entry = tk.Entry(find_window, width=30)
-    replace_entry.grid(row=1, column=1, padx=5, pady=5)
-
-    def find_text():
-        text.tag_remove("found", "1.0", tk.END)
-        search_term = find_entry.get()
-        if search_term:
-            start = "1.0"
-            while True:
-                pos = text.search(search_term, start, stopindex=tk.END)
-                if not pos: break
-                end = f"{pos}+{len(search_term)}c"
-                text.tag_add("found", pos, end)
-                start = end
-            text.tag_config("found", background="yellow", foreground="black")
-
-    def replace_all():
-        search_term = find_entry.get()
-        replace_term = replace_entry.get()
-        if search_term:
-            content = text.get("1.0", tk.END)
-            new_content = content.replace(search_term, replace_term)
-            text.delete("1.0", tk.END)
-            text.insert("1.0", new_content)
-
-    tk.Button(find_window, text="Find All", command=find_text).grid(row=0, column=2, padx=5)
-    tk.Button(find_window, text="Replace All", command=replace_all).grid(row=1, column=2, padx=5)
-    tk.Button(find_window, text="Close", command=find_window.destroy).grid(row=2, column=1, pady=10)
+    from find_dialog import open_find_replace
+    open_find_replace(root, text)
+
+
+# --- FIND IN FILES PANEL ---
+# Searches a whole folder in worker processes (see find_in_files.py).
+# Hits are listed as they come in; double-click one to open it.
+def find_in_files():
+    # Loaded on first use: they bring in multiprocessing and sqlite3
+    from tkinter import filedialog
+    from find_in_files import MAX_SHOWN_HITS, FileSearch
+    from trigram_index import open_index
+    panel = tk.Toplevel(root)
+    panel.title("Find in Files")
+    panel.geometry("700x450")
+
+    form = tk.Frame(panel)
+    form.pack(fill=tk.X, padx=5, pady=5)
+    tk.Label(form, text="Folder:").grid(row=0, column=0, padx=5, pady=2, sticky="e")
+    folder_entry = tk.Entry(form, width=50)
+    folder_entry.insert(0, os.getcwd())
+    folder_entry.grid(row=0, column=1, padx=5, pady=2, sticky="we")
+
+    def browse():
+        folder = filedialog.askdirectory(parent=panel, initialdir=folder_entry.get())
+        if folder:
+            folder_entry.delete(0, tk.END)
+            folder_entry.insert(0, folder)
+
+    tk.Button(form, text="Browse…", command=browse).grid(row=0, column=2, padx=5)
+    tk.Label(form, text="Find:").grid(row=1, column=0, padx=5, pady=2, sticky="e")
+    find_entry = tk.Entry(form, width=50)
+    find_entry.grid(row=1, column=1, padx=5, pady=2, sticky="we")
+    form.columnconfigure(1, weight=1)
+
+    match_case = tk.BooleanVar(value=True)
+    whole_word = tk.BooleanVar(value=False)
+    use_regex = tk.BooleanVar(value=False)
+    # Keep a trigram index of the folder so repeat searches only open the
+    # files that can match (see trigram_index.py)
+    use_index = tk.BooleanVar(value=True)
+    options = tk.Frame(form)
+    options.grid(row=2, column=1, sticky="w")
+    tk.Checkbutton(options, text="Match case", variable=match_case).pack(side=tk.LEFT)
+    tk.Checkbutton(options, text="Whole word", variable=whole_word).pack(side=tk.LEFT)
+    tk.Checkbutton(options, text="Regex", variable=use_regex).pack(side=tk.LEFT)
+    tk.Checkbutton(options, text="Use index", variable=use_index).pack(side=tk.LEFT)
+
+    status = tk.StringVar()
+    tk.Label(panel, textvariable=status, anchor="w").pack(fill=tk.X, padx=5)
+
+    results = tk.Frame(panel)
+    results.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
+    result_scroll = tk.Scrollbar(results)
+    result_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+    result_list = tk.Listbox(results, yscrollcommand=result_scroll.set, font=("Courier", 11))
+    result_list.pack(expand=True, fill=tk.BOTH)
+    result_scroll.config(command=result_list.yview)
+
+    rows = []           # (path, line, column) for each row of the list
+    total = [0]         # hits found, including the ones not listed
+    search = [None]
+
+    def show_hits(items):
+        for path, hits in items:
+            total[0] += len(hits)
+            name = os.path.relpath(path, search[0].folder)
+            for line, column, line_text in hits:
+                if len(rows) >= MAX_SHOWN_HITS:
+                    break
+                result_list.insert(tk.END, f"{name}:{line}: {line_text.strip()}")
+                rows.append((path, line, column))
+        status.set(f"{total[0]} hits so far, {search[0].files_searched} files searched…")
+
+    def finished(cancelled, error):
+        if error:
+            status.set(f"Search failed: {error}")
+            return
+        shown = f" (first {MAX_SHOWN_HITS} listed)" if total[0] > len(rows) else ""
+        state = "Cancelled" if cancelled else "Done"
+        status.set(f"{state}: {total[0]} hits{shown} in {search[0].files_searched} files")
+
+    def start_search():
+        stop_search()
+        folder = folder_entry.get()
+        if not find_entry.get() or not os.path.isdir(folder):
+            status.set("Pick a folder and enter something to find.")
+            return
+        result_list.delete(0, tk.END)
+        rows.clear()
+        total[0] = 0
+        paths = None
+        indexed = False
+        if use_index.get():
+            index = open_index(folder)
+            indexed = index.ready
+            term, regex = find_entry.get(), use_regex.get()
+            # Narrow down to the files that contain the search text, plus
+            # any file created or changed since the index was last updated.
+            # Finding those stats the whole tree, so the search does it on
+            # its own thread. The first time there is no index yet, so
+            # everything is searched
+            paths = lambda: index.candidates(term, regex=regex)
+            index.update_async()    # index the changed files for next time
+        try:
+            search[0] = FileSearch(panel, folder, find_entry.get(), use_regex.get(), whole_word.get(),
+                                   match_case.get(), on_hits=show_hits, on_done=finished, paths=paths)
+        except re.error as error:
+            messagebox.showerror("Find in Files", f"Invalid regular expression:\n{error}", parent=panel)
+            return
+        status.set("Searching indexed files…" if indexed else "Searching…")
+        search[0].start()
+
+    def stop_search():
+        if search[0] and search[0].active:
+            search[0].cancel()
+
+    def open_hit(event=None):
+        selection = result_list.curselection()
+        if selection:
+            path, line, column = rows[selection[0]]
+            open_file_at(path, line, column)
+
+    def close():
+        stop_search()
+        panel.destroy()
+
+    buttons = tk.Frame(form)
+    buttons.grid(row=1, column=2, rowspan=2, padx=5)
+    tk.Button(buttons, text="Search", command=start_search).pack(fill=tk.X)
+    tk.Button(buttons, text="Cancel", command=stop_search).pack(fill=tk.X)
+    find_entry.bind("<Return>", lambda e: start_search())
+    result_list.bind("<Double-Button-1>", open_hit)
+    result_list.bind("<Return>", open_hit)
+    panel.bind("<Escape>", lambda e: stop_search())
+    panel.protocol("WM_DELETE_WINDOW", close)
+    find_entry.focus_set()
+
+# Open a file in a new tab with the cursor on line/column (1-based line)
+def open_file_at(file_path, line, column=0):
+    title = file_path.split("/")[-1]
+    if not is_large_file(file_path):
+        create_editor_tab(title=title, file_path=file_path, position=f"{line}.{column}")
+        return
+    go_to_line_when_indexed(create_large_file_tab(file_path), line)
+
+# Line numbers of a large file are only known once it has been indexed
+def go_to_line_when_indexed(text, line):
+    if line <= 1 or not text.winfo_exists(): return
+    if text.large_view.index.done:
+        text.large_view.goto_line(line - 1)
+    else:
+        root.after(100, go_to_line_when_indexed, text, line)
+
+
+# Function to jump to a line number
+def goto_line():
+    text = get_current_text_widget()
+    if not text: return
+
+    from tkinter import simpledialog
+    line = simpledialog.askinteger("Go to Line", "Line number:", parent=root, minvalue=1)
+    if line is None: return
+    large_view = getattr(text, "large_view", None)
+    if large_view:
+        large_view.goto_line(line - 1)
+    else:
+        text.mark_set(tk.INSERT, f"{line}.0")
+        text.see(tk.INSERT)
+    update_status()
+
+# --- OUTLINE AND GO TO SYMBOL (see outline.py) ---
+# View -> Outline shows the classes and functions of the current tab
+def toggle_outline():
+    global outline_panel
+    if outline_panel:
+        outline_panel.close()
+        outline_panel = None
+        return
+    from outline_panel import OutlinePanel
+    outline_panel = OutlinePanel(root, notebook, on_pick=show_symbol)
+    outline_panel.show(get_current_text_widget())
+
+# Ctrl+P: fuzzy search over the symbols of every open tab. Parked tabs
+# use the outline they had when they were parked
+def goto_symbol():
+    from outline_panel import open_goto_symbol
+    current = registry.current()
+    sources = []
+    for doc in sorted(registry.docs.values(), key=lambda doc: doc is not current):
+        outline = getattr(doc.text, "outline", None)
+        symbols = outline.symbols if outline else doc.symbols
+        if symbols:
+            sources.append((doc.title, symbols, doc))
+    open_goto_symbol(root, sources, on_pick=jump_to_symbol)
+
+def jump_to_symbol(doc, symbol):
+    notebook.select(doc.frame)
+    on_tab_changed()    # builds the tab's widget now if it was parked
+    show_symbol(symbol)
+
+# Put the cursor on a symbol of the current tab
+def show_symbol(symbol):
+    text = get_current_text_widget()
+    if not text: return
+    text.mark_set(tk.INSERT, f"{symbol.line}.0")
+    text.see(tk.INSERT)
+    text.focus_set()
+    update_status()
+
+# Large files open read-only; this lets the user change them
+def edit_large_file():
+    text = get_current_text_widget()
+    large_view = getattr(text, "large_view", None)
+    if large_view:
+        large_view.enable_editing()
+        update_status()
 
 
 # --- Theme toggle function ---
 def toggle_theme():
     global is_dark_mode
     is_dark_mode = not is_dark_mode
-    theme = dark_theme if is_dark_mode else light_theme
-
-    # Apply to ALL open tabs
-    for tab_id in notebook.tabs():
-        tab_frame = notebook.nametowidget(tab_id)
-        for child in tab_frame.winfo_children():
-            if isinstance(child, tk.Text):
-                child.config(
-                    bg=theme["bg"],
-                    fg=theme["fg"],
-                    insertbackground=theme["cursor"],
-                    selectbackground=theme["select_bg"]
-                )
+    theme = theme_colors(is_dark_mode)
+
+    # Apply to the tabs that have a widget; parked tabs pick up the
+    # theme when they are rebuilt
+    for doc in registry.live_docs():
+        apply_theme(doc.text, is_dark_mode)
     
     # Re-apply syntax highlighting for CURRENT tab
     apply_syntax_highlighting()
@@ -300,93 +867,162 @@ def toggle_theme():
 # Font tags
 def change_font_size(size):
     text = get_current_text_widget()
-    if not text: return
+    if not text or not hasattr(text, "styles"): return
     
-    tag_name = f"size_{size}"
-    text.tag_config(tag_name, font=("Helvetica", size))
-    try:
-        text.tag_add(tag_name, "sel.first", "sel.last")
-    except tk.TclError:
-        pass 
+    ranges = text.tag_ranges("sel")
+    if not ranges: return
+    # One size per character: the old size is replaced, not stacked
+    start = text.buffer.index_to_offset(text.index(ranges[0]))
+    end = text.buffer.index_to_offset(text.index(ranges[-1]))
+    text.styles.set_size(start, end, size)
+    # Taller lines move the numbers below them
+    text.scheduler.trigger("gutter")
 
 # Syntax highlighting
 def apply_syntax_highlighting(event=None):
     text = get_current_text_widget()
-    if not text: return
-    
-    text.tag_remove("keyword", "1.0", tk.END)
-    keyword_color = "orange" if is_dark_mode else "blue"
-    text.tag_config("keyword", foreground=keyword_color)
-    
-    for kw in keyword.kwlist:
-        start = "1.0"
-        while True:
-            pos = text.search(kw, start, stopindex=tk.END)
-            if not pos: break
-            end = f"{pos}+{len(kw)}c"
-            text.tag_add("keyword", pos, end)
-            start = end
-
-
-#Create a menu bar
-menu_bar = tk.Menu(root)
-root.config(menu=menu_bar)
-
-#Create a file menu
-file_menu = tk.Menu(menu_bar, tearoff=0)
-menu_bar.add_cascade(label="File", menu=file_menu)
-file_menu.add_command(label="New", command=new_file)
-file_menu.add_command(label="Open", command=open_file)
-file_menu.add_command(label="Save", command=save_file)
-file_menu.add_separator()
-file_menu.add_command(label="Close Tab", command=close_current_tab)
-file_menu.add_separator()
-file_menu.add_command(label="Exit", command=root.quit)
-
-# Create an edit menu
-edit_menu = tk.Menu(menu_bar, tearoff=0)
-menu_bar.add_cascade(label="Edit", menu=edit_menu)
-edit_menu.add_command(label="Undo", command=undo_text)
-edit_menu.add_command(label="Redo", command=redo_text)
-edit_menu.add_separator()
-edit_menu.add_command(label="Cut", command=cut_text)
-edit_menu.add_command(label="Copy", command=copy_text)
-edit_menu.add_command(label="Paste", command=paste_text)
-edit_menu.add_separator()
-edit_menu.add_command(label="Select All", command=select_all)
-edit_menu.add_separator()
-edit_menu.add_command(label="Find & Replace", command=find_replace)
-
-# Create a Format menu
-format_menu = tk.Menu(menu_bar, tearoff=0)
-menu_bar.add_cascade(label="Format", menu=format_menu)
-font_size_menu = tk.Menu(format_menu, tearoff=0)
-format_menu.add_cascade(label="Font Size", menu=font_size_menu)
-for size in [12, 14, 16, 18, 20, 24, 32]:
-    font_size_menu.add_command(label=str(size), command=lambda s=size: change_font_size(s))
-
-# Create a View menu
-view_menu = tk.Menu(menu_bar, tearoff=0)
-menu_bar.add_cascade(label="View", menu=view_menu)
-view_menu.add_command(label="Toggle Dark Mode", command=toggle_theme)
-
-#Keyboard shortcuts
-root.bind("<Control-n>", lambda event: new_file())
-root.bind("<Control-o>", lambda event: open_file())
-root.bind("<Control-s>", lambda event: save_file())
-root.bind("<Control-z>", lambda event: undo_text())
-root.bind("<Control-y>", lambda event: redo_text())
-root.bind("<Control-h>", lambda event: find_replace())
-root.bind("<Control-d>", lambda event: toggle_theme())
-root.bind("<Control-a>", lambda event: select_all())
-root.bind("<Control-w>", lambda event: close_current_tab())
-
-root.protocol("WM_DELETE_WINDOW", on_closing)
-
-# Create initial tab
-create_editor_tab()
-
-# Handle tab changes
-notebook.bind("<<NotebookTabChanged>>", lambda e: update_status())
-
-root.mainloop()
\ No newline at end of file
+    if not text or not hasattr(text, "highlighter"): return
+
+    # Only dirty lines are redone, once typing pauses (see highlighter.py)
+    text.highlighter.configure_colors(is_dark_mode)
+    text.scheduler.trigger("highlight")
+
+
+# --- WINDOW ---
+# Builds the window, status bar, tab strip and menus. Nothing here runs on
+# import, so the functions above can be reused and timed (see benchmarks/)
+# without a window popping up
+def build_window():
+    global root, status_bar, status_text, status_label, notebook, registry, watcher
+    # Only needed once there is a window (see editor_core.py on startup)
+    from file_watch import FileWatcher
+    from perf_monitor import enable_from_environment
+    # Create main application window
+    root = tk.Tk()
+    enable_from_environment(root)
+    root.title("Simple Text Editor")
+    root.geometry("800x600")
+
+    # --- STATUS BAR (Create FIRST so it stays at bottom) ---
+    # Create a Frame (an invisible container/box) at the bottom
+    status_bar = tk.Frame(root, height=20)
+    status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+    # Create a StringVar — a "smart" variable
+    status_text = tk.StringVar()
+    status_text.set("Line: 1 | Column: 0 | Words: 0 | Chars: 0")
+    # Put a Label inside the Frame, connected to the StringVar
+    status_label = tk.Label(status_bar, textvariable=status_text, anchor=tk.E, padx=10)
+    status_label.pack(fill=tk.X)
+
+    # --- TABS SETUP (Create SECOND to fill remaining space) ---
+    notebook = ttk.Notebook(root)
+    notebook.pack(expand=True, fill=tk.BOTH)
+    # tab id -> DocumentState (see tab_registry.py)
+    registry = TabRegistry(notebook, materialize=materialize_tab, can_park=can_park)
+    # Tells a tab when another program changes its file. Coming back to
+    # the window checks right away
+    watcher = FileWatcher(root, on_change=on_file_changed)
+    root.bind("<FocusIn>", lambda event: watcher.check_now())
+
+    build_menus()
+
+    #Keyboard shortcuts
+    root.bind("<Control-n>", lambda event: new_file())
+    root.bind("<Control-o>", lambda event: open_file())
+    root.bind("<Control-s>", lambda event: save_file())
+    root.bind("<Control-z>", lambda event: undo_text())
+    root.bind("<Control-y>", lambda event: redo_text())
+    root.bind("<Control-h>", lambda event: find_replace())
+    root.bind("<Control-d>", lambda event: toggle_theme())
+    root.bind("<Control-a>", lambda event: select_all())
+    root.bind("<Control-w>", lambda event: close_current_tab())
+    root.bind("<Control-g>", lambda event: goto_line())
+    root.bind("<Control-p>", lambda event: goto_symbol())
+    root.bind("<Control-F>", lambda event: find_in_files())    # Ctrl+Shift+F
+
+    root.protocol("WM_DELETE_WINDOW", on_closing)
+    return root
+
+
+def build_menus():
+    #Create a menu bar
+    menu_bar = tk.Menu(root)
+    root.config(menu=menu_bar)
+
+    #Create a file menu
+    file_menu = tk.Menu(menu_bar, tearoff=0)
+    menu_bar.add_cascade(label="File", menu=file_menu)
+    file_menu.add_command(label="New", command=new_file)
+    file_menu.add_command(label="Open", command=open_file)
+    file_menu.add_command(label="Save", command=save_file)
+    file_menu.add_command(label="Compare with Saved", command=compare_with_saved)
+    file_menu.add_command(label="Compare with Tab…", command=compare_with_tab)
+    file_menu.add_separator()
+    file_menu.add_command(label="Close Tab", command=close_current_tab)
+    file_menu.add_command(label="Cancel Loading", command=cancel_loading)
+    file_menu.add_separator()
+    file_menu.add_command(label="Exit", command=on_closing)
+
+    # Create an edit menu
+    edit_menu = tk.Menu(menu_bar, tearoff=0)
+    menu_bar.add_cascade(label="Edit", menu=edit_menu)
+    edit_menu.add_command(label="Undo", command=undo_text)
+    edit_menu.add_command(label="Redo", command=redo_text)
+    edit_menu.add_separator()
+    edit_menu.add_command(label="Cut", command=cut_text)
+    edit_menu.add_command(label="Copy", command=copy_text)
+    edit_menu.add_command(label="Paste", command=paste_text)
+    edit_menu.add_separator()
+    edit_menu.add_command(label="Select All", command=select_all)
+    edit_menu.add_separator()
+    edit_menu.add_command(label="Find & Replace", command=find_replace)
+    edit_menu.add_command(label="Find in Files", command=find_in_files)
+    edit_menu.add_command(label="Go to Line", command=goto_line)
+    edit_menu.add_command(label="Go to Symbol", command=goto_symbol)
+    edit_menu.add_separator()
+    edit_menu.add_command(label="Edit Large File", command=edit_large_file)
+
+    # Create a Format menu
+    format_menu = tk.Menu(menu_bar, tearoff=0)
+    menu_bar.add_cascade(label="Format", menu=format_menu)
+    font_size_menu = tk.Menu(format_menu, tearoff=0)
+    format_menu.add_cascade(label="Font Size", menu=font_size_menu)
+    for size in [12, 14, 16, 18, 20, 24, 32]:
+        font_size_menu.add_command(label=str(size), command=lambda s=size: change_font_size(s))
+
+    # Create a View menu
+    view_menu = tk.Menu(menu_bar, tearoff=0)
+    menu_bar.add_cascade(label="View", menu=view_menu)
+    view_menu.add_command(label="Toggle Dark Mode", command=toggle_theme)
+    view_menu.add_command(label="Outline", command=toggle_outline)
+    view_menu.add_separator()
+    view_menu.add_command(label="Performance", command=show_performance)
+
+
+# View -> Performance (see perf_monitor.py)
+def show_performance():
+    from perf_monitor import open_panel
+    open_panel(root)
+
+
+def main():
+    build_window()
+
+    # Bring back the last session (only the selected tab is read now),
+    # or start with an empty tab
+    if restore_session():
+        on_tab_changed()
+    else:
+        create_editor_tab()
+
+    # Handle tab changes
+    notebook.bind("<<NotebookTabChanged>>", on_tab_changed)
+
+    # Once the window is up, check for documents to recover from a crash
+    root.after_idle(offer_recovery)
+
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,64 +1,47 @@
+import os
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
-import keyword 
+from tkinter import messagebox
+from editor_core import apply_theme, busy_with, create_text_widget, is_replacing, status_message, theme_colors, use_lexer_for
+from large_file import is_large_file
+from file_io import FileSaver, TextLoader, iter_file_text
+from session import load_session, save_session
 
 # Global variable to store the current file path
 current_file = None
 
-# Theme configurations
-dark_theme = {
-    "bg": "#1e1e1e",        # Background: dark gray
-    "fg": "#d4d4d4",        # Foreground (text): light gray
-    "cursor": "#ffffff",    # Cursor: white
-    "select_bg": "#264f78"  # Selection background: blue
-}
-light_theme = {
-    "bg": "#ffffff",        # Background: white
-    "fg": "#000000",        # Foreground: black
-    "cursor": "#000000",    # Cursor: black
-    "select_bg": "#0078d7"  # Selection: blue
-}
-
 is_dark_mode = False   # Track theme state
-
-# Create main application window
-root = tk.Tk()
-
-# Set window title
-root.title("Simple Text Editor")
-
-# Set window size
-root.geometry("800x600")
-
-
-# Create text editor area
-text = tk.Text(
-    root,                    # Parent window
-    wrap=tk.WORD,            # Wrap text by words (not characters)
-    font=("Helvetica", 18),   # Font style and size
-    undo=True               # Enable undo functionality
-)
-
-# Make text area fill the entire window
-# Rule of thumb: In tkinter pack(), always pack fixed-size widgets first (like status bars), then pack the expanding widget last.
-text.pack(expand=True, fill=tk.BOTH)
-
-
-# Create a Frame (an invisible container/box) at the bottom
-status_bar = tk.Frame(root, height=20)
-status_bar.pack(side=tk.BOTTOM, fill=tk.X)  #stretches across the full width
-# Create a StringVar — a "smart" variable
-status_text = tk.StringVar()
-status_text.set("Line: 1 | Column: 0")
-
-
-#Put a Label inside the Frame, connected to the StringVar
-status_label = tk.Label(status_bar, textvariable=status_text, anchor=tk.E, padx=10)
-status_label.pack(fill=tk.X)
-
+loader = None          # TextLoader while a file is being read in the background
+saver = None           # FileSaver while a file is being written in the background
+reloader = None        # FileReload while changes made by another program come in
+SESSION_NAME = "simple"   # name of the session and journal folders (session.py, edit_journal.py)
+
+# The window and its widgets, made by build_window()
+root = None
+text = None
+status_bar = None
+status_text = None
+status_label = None
+outline_panel = None    # View -> Outline, None while hidden
+watcher = None          # notices other programs changing the file (file_watch.py)
+
+
+# Replace All and Reload lock the text while they work through it: say so
+# and return True, instead of swapping the document out from under them
+def document_busy():
+      busy = busy_with(text)
+      if busy:
+            messagebox.showinfo("Please Wait", f"{busy} is still running, try again once it is done.")
+      return busy is not None
 
 # Function to create a new file
 def new_file():
+      if document_busy():
+            return
+      # Stop a file that is still streaming in, or the rest of it would
+      # land in the new document
+      if loader:
+            loader.cancel()
+
       # Delete all text from the text box (from start to end)
       text.delete("1.0", tk.END)
 
@@ -68,10 +51,16 @@ def new_file():
       # Set the current file to None
       global current_file
       current_file = None
+      text.journal.start("Untitled")
+      use_lexer_for(text, None)
+      watcher.forget(text)
 
 # Function to open an existing text file
 def open_file():
+      if document_busy():
+            return
       # Open a file dialog to select a text file
+      from tkinter import filedialog
       file_path = filedialog.askopenfilename(
             defaultextension=".txt",
             filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
@@ -79,38 +68,106 @@ def open_file():
 
       # If a file is selected, open it and display its contents
       if file_path:
-            # Update the title to show the file name
-            root.title(file_path.split("/")[-1])
-
-            # Set the current file to the selected file
-            global current_file
-            current_file = file_path    
+            # Huge files are loaded whole here; the tabbed editor has a
+            # memory-mapped large-file mode for them (see large_file.py)
+            if is_large_file(file_path) and not messagebox.askyesno(
+                  "Large File",
+                  "This file is very large and will use a lot of memory.\n"
+                  "Open it in Advanced_TextEditor.py for large-file mode.\n\nLoad it anyway?"):
+                  return
+
+            load_file(file_path)
+
+# Function to read a file into the text box.
+# `on_loaded` runs once all of it is in (used to restore the last session)
+def load_file(file_path, on_loaded=None):
+      global current_file, loader
+      if document_busy():
+            return
+      # A file still streaming in from an earlier Open is dropped
+      if loader:
+            loader.cancel()
+
+      # Update the title to show the file name
+      root.title(file_path.split("/")[-1])
+
+      # Set the current file to the selected file
+      current_file = file_path    
+      # Highlight it in its own language (see lexers.py)
+      use_lexer_for(text, file_path)
+      # Notice if another program changes the file from now on
+      watcher.watch(text, file_path)
+
+      # Clear the old text from the text box. Loading isn't an edit, so the
+      # journal and the undo history wait until the file is in
+      text.journal.stop()
+      text.undo_manager.pause()
+      text.delete("1.0", tk.END)
 
-            # Open the file and display its contents in the text box
-            with open(file_path, "r") as file:
-                  # Clear the old text from the text box
+      # Read the file on a background thread and insert it a slice at a
+      # time (see file_io.py), so the window doesn't freeze
+      name = file_path.split("/")[-1]
+
+      def show_progress(percent):
+            root.title(f"{name} ({percent}%)")
+
+      def finished(cancelled, error):
+            global loader, current_file
+            loader = None
+            text.undo_manager.resume()
+            if cancelled or error:
+                  # Don't keep half a file around: it could be saved over the real one
+                  if error:
+                        messagebox.showerror("Error", f"Could not open {name}:\n{error}")
                   text.delete("1.0", tk.END)
-                  # Insert the contents of the file into the text box
-                  text.insert(tk.END, file.read())
-                
-            text.edit_modified(False)
+                  text.edit_modified(False)
+                  current_file = None
+                  root.title("Simple Text Editor")
+                  text.journal.start("Untitled")
+                  use_lexer_for(text, None)
+                  watcher.forget(text)
+                  return
+            root.title(name)
+            if on_loaded:
+                  on_loaded()
+            text.journal.start(name, file_path, clean=not text.edit_modified())
+            apply_syntax_highlighting()
+            update_status()
+
+      loader = TextLoader(text, iter_file_text(file_path), show_progress, finished)
+      loader.start()
+
+# Function to stop loading a file (Escape)
+def cancel_loading():
+      if loader:
+            loader.cancel()
            
 
 # Function to save the current text to a file
-def save_file():
+def save_file(then=None):
     global current_file
+    # Saving half-loaded text would cut the file short
+    if loader:
+        messagebox.showinfo("Please Wait", "The file is still loading.")
+        return
+    if saver:
+        messagebox.showinfo("Please Wait", "The file is still being saved.")
+        return
+    if reloader:
+        messagebox.showinfo("Please Wait", "The file is still being reloaded.")
+        return
     # If there is a current file, save the text to it
     if current_file:
-        # Open the file in write mode
-        with open(current_file, "w") as file:
-            # Write the text from the text box to the file
-            file.write(text.get("1.0", tk.END))
-        # Show a success message
-        messagebox.showinfo("Success", "File saved successfully!")
-        text.edit_modified(False)       # Reset the "modified" flag
-        root.title(root.title().lstrip("*").split("/")[-1].split(".")[0])  # Remove * from title
+        # Don't silently write over what another program saved
+        if watcher.changed(text) and not messagebox.askyesno(
+                "File Changed",
+                f"{os.path.basename(current_file)} was changed by another program since it was opened.\n"
+                "Save anyway and replace those changes?"):
+            return
+        write_file(current_file, then)
     else:
         # open a file dialog to select a file to save
+        from tkinter import filedialog
         file_path = filedialog.asksaveasfilename(
             defaultextension=".txt",  # Default file extension
             filetypes=[("Text files", "*.txt"), ("All files", "*.*")] # Allow only .txt files
@@ -120,57 +177,142 @@ def save_file():
         if file_path:
             # Remember the path!
             current_file = file_path   
-            # Update the title to show the file name    
-            root.title(file_path) 
-            # Open the file in write mode
-            with open(file_path, "w") as file:
-                # Write the text from the text box to the file
-                file.write(text.get("1.0", tk.END))
-            # Show a success message
-            messagebox.showinfo("Success", "File saved successfully!")
-            text.edit_modified(False)       # Reset the "modified" flag
-            root.title(root.title().lstrip("*").split("/")[-1].split(".")[0]) # Remove * from title
+            write_file(file_path, then)
         else:
             messagebox.showerror("Error", "No file selected!")
+            if then: then()
+
+# Write the document to a file in the background (see file_io.py).
+# `then` is called once the file is safely on disk, e.g. to close the window
+def write_file(file_path, then=None):
+    global saver
+    name = file_path.split("/")[-1]
+    # Remember which version we are saving; the user may keep typing
+    version = text.buffer.version
+
+    def finished(error):
+        global saver
+        saver = None
+        if error:
+            watcher.resume(text)
+            root.title("*" + name)
+            messagebox.showerror("Error", f"Could not save {name}:\n{error}")
+            return
+        watcher.update(text, file_path)     # our own change, not someone else's
+        # Only reset the "modified" flag if nothing changed while saving
+        if text.buffer.version == version:
+            text.edit_modified(False)
+            root.title(name.split(".")[0])      # Remove * from title
+            text.journal.start(name, file_path)      # the file is the journal's new base
+            use_lexer_for(text, file_path)          # e.g. saved as .sql
+        else:
+            root.title("*" + name)
+        messagebox.showinfo("Success", "File saved successfully!")
+        if then: then()
+
+    root.title(f"{name} (saving…)")
+    watcher.pause(text)
+    # A snapshot is free and never changes, so the worker thread can write
+    # it out while the user keeps typing
+    saver = FileSaver(text, file_path, text.buffer.snapshot().iter_chunks(), finished)
+    saver.start()
+
+# --- FILE CHANGED BY ANOTHER PROGRAM (see file_watch.py) ---
+# A bar above the text offers to reload. Only the lines that changed are
+# replaced, so the cursor, scroll position and undo history stay (Undo
+# takes the reload back)
+def on_file_changed(key, path):
+    from file_watch import show_change_bar
+    name = os.path.basename(path)
+
+    # Compare leaves the bar up, so Reload or Keep Mine can be picked after
+    def compare():
+        compare_with_saved()
+        on_file_changed(key, path)
+
+    if not os.path.exists(path):
+        show_change_bar(root, f"{name} was deleted or moved by another program.", [("OK", lambda: None)])
+    elif text.edit_modified():
+        show_change_bar(root, f"{name} was changed by another program. Reload it and replace your changes?",
+                        [("Reload", reload_file), ("Compare", compare), ("Keep Mine", lambda: None)])
+    else:
+        show_change_bar(root, f"{name} was changed by another program.",
+                        [("Reload", reload_file), ("Compare", compare), ("Ignore", lambda: None)])
+
+def reload_file():
+    global reloader
+    from file_watch import FileReload
+    if not current_file or loader or saver or reloader:
+        return
+    if is_replacing(text):
+        # Its offsets would go stale under the reload
+        messagebox.showinfo("Please Wait", "Replace All is still running, reload once it is done.")
+        on_file_changed(text, current_file)     # bring the bar back
+        return
+    name = os.path.basename(current_file)
+
+    def finished(error, signature):
+        global reloader
+        reloader = text.reloader = None
+        if error:
+            root.title("*" + name)
+            messagebox.showerror("Error", f"Could not reload {name}:\n{error}")
+            return
+        watcher.update(text, current_file, signature)
+        root.title(name)
+        text.journal.start(name, current_file)      # the file is the journal's new base
+        update_status()
+
+    root.title(f"{name} (reloading…)")
+    # Kept on the widget too, so Replace All (search.py) knows to wait
+    reloader = text.reloader = FileReload(text, current_file, finished)
+    reloader.start()
+
+# Function to show the text side by side with the saved file, the lines
+# that differ highlighted (see diff_engine.py and diff_view.py)
+def compare_with_saved():
+    if loader:
+        messagebox.showinfo("Please Wait", "The file is still loading.")
+        return
+    if not current_file or not os.path.exists(current_file):
+        messagebox.showinfo("Compare", "There is no saved file to compare with.")
+        return
+    from diff_engine import read_file_text
+    from diff_view import DiffView
+    name = os.path.basename(current_file)
+    path = current_file
+    # A snapshot never changes, so the diff's worker thread can read it
+    DiffView(root, f"{name} (on disk)", lambda: read_file_text(path),
+             f"{name} (editor)", text.buffer.snapshot().get_text, is_dark_mode)
 
 # A function that reads cursor position and updates the status bar
 def update_status(event=None):
-      # 1. Get cursor position (Line & Column)
-    position = text.index(tk.INSERT)
-    line, column = position.split(".")
-    # 2. Get all text content
-    # "1.0" = start of text
-    # "end-1c" = end of text (minus the automatic trailing newline)
-    content = text.get("1.0", "end-1c")
-    # 3. Count words
-    # .split() splits by whitespace (spaces, tabs, newlines)
-    word_count = len(content.split()) if content else 0
-    # 4. Count characters
-    # Calculate length of the string
-    char_count = len(content)
-    # 5. Update Status Bar
-    status_text.set(
-        f"Line: {line} | Column: {column} | Words: {word_count} | Chars: {char_count}"
-    )
+    # Line & Column, word and character counts (kept up to date by
+    # doc_stats.py on every edit), the selection and the undo memory.
+    # editor_core.py puts the line together
+    status_text.set(status_message(text))
 
 # Function to undo the last action
 def undo_text():
-    try:                        # "Try to do this..."
-        text.edit_undo()        #   → attempt undo
-    except tk.TclError:         # "If it fails with TclError..."
-        pass   
+    # Replace All or a reload has the text locked: the undo would be lost,
+    # and redoing it later would apply it twice
+    if busy_with(text):
+        return
+    text.undo_manager.undo()    # Does nothing if there is nothing to undo
+    update_status()
 
 # Function to redo the last action
 def redo_text():
-    try:
-        text.edit_redo()
-    except tk.TclError:
-        pass
+    if busy_with(text):
+        return
+    text.undo_manager.redo()
+    update_status()
 
 # Function to mark text as modified (shows * in title)
 def on_text_change(event=None):
     # text.edit_modified() returns True if text has been changed
-    if text.edit_modified():
+    # (text inserted while loading a file doesn't count)
+    if text.edit_modified() and not loader:
         title = root.title()
         # Add * at the beginning if not already there
         if not title.startswith("*"):
@@ -180,6 +322,10 @@ def on_text_change(event=None):
 # Function to handle window close — asks to save if unsaved changes
 def on_closing():
     global current_file
+    # Quitting now would kill a save half way (the old file stays intact)
+    if saver:
+        messagebox.showinfo("Please Wait", "The file is still being saved.")
+        return
     # Check if there are any unsaved changes
     if text.edit_modified():
         # Show a dialog with 3 buttons: Yes / No / Cancel
@@ -190,16 +336,96 @@ def on_closing():
         # answer = True (Yes), False (No), None (Cancel)
 
         if answer is True:       # User clicked "Yes" → save then close
-            save_file()
+            # The save runs in the background, close once it is done
+            save_file(then=quit_editor)
             #root.title((current_file or "Simple Text Editor").split("/")[-1])
-            root.destroy()
         else:    # User clicked "No" → close without saving
             #root.title((current_file or "Simple Text Editor").split("/")[-1])
-            root.destroy()
+            quit_editor()
         # If answer is None → User clicked "Cancel" → do nothing (stay open)
     else:
         #root.title((current_file or "Simple Text Editor").split("/")[-1])
-        root.destroy()           # No changes → just close
+        quit_editor()            # No changes → just close
+
+# --- SESSION (see session.py) ---
+# The open file, cursor, scroll position and font sizes are remembered on
+# quit and put back on the next start. Unsaved text is never kept here: by
+# the time we quit the user has either saved it or chosen "No"
+def quit_editor():
+    entries = []
+    if current_file and not loader:
+        entries.append({
+            "title": current_file.split("/")[-1],
+            "path": current_file,
+            "kind": "text",
+            "cursor": text.index(tk.INSERT),
+            "top": text.index("@0,0"),
+            "styles": text.styles.serialize(),
+            "unsaved": None,
+        })
+    try:
+        save_session(SESSION_NAME, entries)
+    except OSError:
+        pass        # not worth keeping the window open for
+    root.destroy()      # also drops the crash journal
+    from edit_journal import flush_journals
+    flush_journals()
+
+def restore_session():
+    session = load_session(SESSION_NAME)
+    if not session:
+        return
+    entry = session[0][0]
+    if not entry["path"] or not os.path.isfile(entry["path"]) or is_large_file(entry["path"]):
+        return
+
+    def put_back():
+        text.styles.restore(entry["styles"] or [])
+        text.edit_modified(False)
+        text.mark_set(tk.INSERT, entry["cursor"])
+        text.yview(entry["top"])
+
+    # The window shows up right away, the file streams in behind it
+    load_file(entry["path"], on_loaded=put_back)
+
+# --- CRASH RECOVERY (see edit_journal.py) ---
+# If the editor didn't quit normally last time, its journal is still there:
+# offer to replay it. Returns True if a document was recovered
+def offer_recovery():
+    global current_file
+    from edit_journal import discard_journal, find_orphans, flush_journals, recover
+    folders = find_orphans(SESSION_NAME)
+    recovered = None
+    for folder in folders:     # newest first, one document fits this editor
+        recovered = recover(folder)
+        if recovered:
+            break
+    accepted = recovered is not None and messagebox.askyesno(
+        "Recover Unsaved Changes",
+        f"The editor didn't close properly last time.\n"
+        f"Recover the unsaved changes to {recovered[0]}?")
+    if not accepted:
+        for folder in folders:
+            discard_journal(folder)
+        return False
+    title, current_file, content = recovered
+    text.journal.stop()
+    text.undo_manager.pause()
+    text.insert("1.0", content)
+    text.undo_manager.resume()
+    text.edit_modified(True)
+    root.title("*" + title)
+    text.journal.start(title, current_file, clean=False)
+    # The old journals go once the new one holds the recovered text
+    flush_journals()
+    for folder in folders:
+        discard_journal(folder)
+    use_lexer_for(text, current_file)
+    if current_file:
+        watcher.watch(text, current_file)
+    apply_syntax_highlighting()
+    update_status()
+    return True
 
 def cut_text():
     text.event_generate("<<Cut>>")      # Triggers built-in cut
@@ -211,60 +437,45 @@ def select_all():
     text.tag_add("sel", "1.0", "end-1c")  # Select from start to end
     return "break"      
 
-# Function to find and replace text window render
+# Function to open the Find & Replace window (see find_dialog.py, only
+# loaded the first time it is needed)
 def find_replace():
-    # Create a new popup window
-    find_window = tk.Toplevel(root)
-    find_window.title("Find & Replace")
-    find_window.geometry("400x150")
-    find_window.resizable(False, False)
-    # --- Find row ---
-    tk.Label(find_window, text="Find:").grid(row=0, column=0, padx=5, pady=5, sticky="e")
-    find_entry = tk.Entry(find_window, width=30)
-    find_entry.grid(row=0, column=1, padx=5, pady=5)
-    # --- Replace row ---
-    tk.Label(find_window, text="Replace:").grid(row=1, column=0, padx=5, pady=5, sticky="e")
-    replace_entry = tk.Entry(find_window, width=30)
-    replace_entry.grid(row=1, column=1, padx=5, pady=5)
-
-    # --- Buttons ---
-    tk.Button(find_window, text="Find All", command=lambda: find_text(find_entry)).grid(row=0, column=2, padx=5)
-    tk.Button(find_window, text="Replace All", command=lambda: replace_all(find_entry, replace_entry)).grid(row=1, column=2, padx=5)
-    tk.Button(find_window, text="Close", command=find_window.destroy).grid(row=2, column=1, pady=10)
-
-
-  # --- Find button: highlights all matches ---
-def find_text(find_entry):
-    # Remove old highlights
-    text.tag_remove("found", "1.0", tk.END)
-    
-    search_term = find_entry.get()
-    if search_term:
-        start = "1.0"
-        while True:
-            # Search for the term starting from 'start' position
-            pos = text.search(search_term, start, stopindex=tk.END)
-            if not pos:
-                break   # No more matches
-            # Calculate end position
-            end = f"{pos}+{len(search_term)}c"
-            # Highlight the found text
-            text.tag_add("found", pos, end)
-            start = end   # Continue searching after this match
-        # Style the highlights: yellow background
-        text.tag_config("found", background="yellow", foreground="black")
-
-
-    # --- Replace All button ---
-def replace_all(find_entry, replace_entry):
-    search_term = find_entry.get()
-    replace_term = replace_entry.get()
-    if search_term:
-        # Get all text, replace, and put it back
-        content = text.get("1.0", tk.END)
-        new_content = content.replace(search_term, replace_term)
-        text.delete("1.0", tk.END)
-        text.insert("1.0", new_content)
+    from find_dialog import open_find_replace
+    open_find_replace(root, text)
+
+# Function to jump to a line number
+def goto_line():
+    from tkinter import simpledialog
+    line = simpledialog.askinteger("Go to Line", "Line number:", parent=root, minvalue=1)
+    if line is None:
+        return
+    text.mark_set(tk.INSERT, f"{line}.0")   # Move the cursor...
+    text.see(tk.INSERT)                     # ...and scroll so it's visible
+    update_status()
+
+# Function to show or hide the Outline panel: the classes and functions of
+# the document (see outline.py)
+def toggle_outline():
+    global outline_panel
+    if outline_panel:
+        outline_panel.close()
+        outline_panel = None
+        return
+    from outline_panel import OutlinePanel
+    outline_panel = OutlinePanel(root, text, on_pick=show_symbol)
+    outline_panel.show(text)
+
+# Function to jump to a class or function by typing part of its name (Ctrl+P)
+def goto_symbol():
+    from outline_panel import open_goto_symbol
+    title = os.path.basename(current_file) if current_file else "Untitled"
+    open_goto_symbol(root, [(title, text.outline.symbols, None)], on_pick=lambda owner, symbol: show_symbol(symbol))
+
+def show_symbol(symbol):
+    text.mark_set(tk.INSERT, f"{symbol.line}.0")
+    text.see(tk.INSERT)
+    text.focus_set()
+    update_status()
 
 # --- Theme toggle function ---
 def toggle_theme():
@@ -272,15 +483,10 @@ def toggle_theme():
     is_dark_mode = not is_dark_mode   # Flip True ↔ False
 
     # Pick the right theme
-    theme = dark_theme if is_dark_mode else light_theme
+    theme = theme_colors(is_dark_mode)
 
-    # Apply to text widget
-    text.config(
-        bg=theme["bg"],
-        fg=theme["fg"],
-        insertbackground=theme["cursor"],         # Cursor color
-        selectbackground=theme["select_bg"]       # Selection color
-    )
+    # Apply to text widget (colors, cursor, selection, highlighting)
+    apply_theme(text, is_dark_mode)
 
     # Apply to root window and status bar
     root.config(bg=theme["bg"])
@@ -289,159 +495,196 @@ def toggle_theme():
     # Re-apply syntax highlighting with new theme colors
     apply_syntax_highlighting()
 
-# Create a dictionary to keep track of font tags
-# We need to create a new tag for each size, e.g., "size12", "size14"
+# Change the font size of the selected text
+# Each size has its own tag, e.g., "size_12", "size_14"
 def change_font_size(size):
-    # 1. Create a tag name, e.g., "size_20"
-    tag_name = f"size_{size}"
-    
-    # 2. Configure the tag with the font details
-    # We use "Helvetica" as the base font family
-    text.tag_config(tag_name, font=("Helvetica", size))
-    
-    # 3. Apply this tag to the CURRENT SELECTION
-    try:
-        # "sel.first" to "sel.last" covers the highlighted text
-        text.tag_add(tag_name, "sel.first", "sel.last")
-        
-        # Optional: Remove other size tags from this area so they don't overlap
-        # (For a simple start, we can just add the new one, as the newest tag usually wins)
-    except tk.TclError:
-        # No text selected -> Do nothing (or apply to whole doc if you prefer)
-        pass 
+    # 1. Find the CURRENT SELECTION ("sel" tag)
+    ranges = text.tag_ranges("sel")
+    if not ranges:
+        # No text selected -> Do nothing
+        return
+
+    # 2. Turn the selection into buffer offsets
+    start = text.buffer.index_to_offset(text.index(ranges[0]))
+    end = text.buffer.index_to_offset(text.index(ranges[-1]))
+
+    # 3. Give the selection the new size. style_runs.py removes the old size
+    # tag from it first, so sizes never pile up on the same text
+    text.styles.set_size(start, end, size)
+    # Taller lines move the numbers below them
+    text.scheduler.trigger("gutter")
 
 
 # Function to highlight Python keywords
 def apply_syntax_highlighting(event=None):
-    # 1. Clear existing highlights (remove "keyword" tag from all text)
-    text.tag_remove("keyword", "1.0", tk.END)
-    
-    # 2. Configure the "keyword" tag (e.g., orange or blue)
+    # 1. Configure the "keyword" tag (e.g., orange or blue)
     # We choose a color that works well in dark/light themes
-    keyword_color = "orange" if is_dark_mode else "blue"
-    text.tag_config("keyword", foreground=keyword_color)
-    
-    # 3. Get all Python keywords (def, class, if, else, etc.)
-    keywords = keyword.kwlist
-    
-    # 4. Search and highlight each keyword
-    for kw in keywords:
-        start = "1.0"
-        while True:
-            # Search for keyword
-            # matches=True -> full word match only
-            pos = text.search(kw, start, stopindex=tk.END, count=tk.IntVar())
-            
-            if not pos:
-                break
-            
-            # Use regex logic-like check to ensure whole word match manually if needed,
-            # but simple search is a good start. 
-            
-            # Simple approach: Find end position
-            end = f"{pos}+{len(kw)}c"
-            
-            # Check if it's a whole word (simple check: precede/succeed by whitespace/punctuation?)
-            # For simplicity in Step 10, we'll just highlight all occurrences first.
-            text.tag_add("keyword", pos, end)
-            start = end
-
-
-#Create a menu bar
-menu_bar = tk.Menu(root)
-
-#Attach the menu bar to the root window
-root.config(menu=menu_bar)
-
-#Create a file menu
-# Dropdown under File which has options like New, Open, Save, Exit
-file_menu = tk.Menu(menu_bar, tearoff=0)
-
-#Add the file menu to the menu bar
-menu_bar.add_cascade(label="File", menu=file_menu)
-
-#Add commands to the file menu
-file_menu.add_command(label="New", command=new_file)
-file_menu.add_command(label="Open", command=open_file)
-file_menu.add_command(label="Save", command=save_file)
-# Add a separator line in menu
-file_menu.add_separator()
-# Add Exit option to close the application
-file_menu.add_command(label="Exit", command=root.quit)
-
-# Create an edit menu
-edit_menu = tk.Menu(menu_bar, tearoff=0)
-menu_bar.add_cascade(label="Edit", menu=edit_menu)
-edit_menu.add_command(label="Undo", command=text.edit_undo)
-edit_menu.add_command(label="Redo", command=text.edit_redo)
-edit_menu.add_separator()
-edit_menu.add_command(label="Cut", command=cut_text)
-edit_menu.add_command(label="Copy", command=copy_text)
-edit_menu.add_command(label="Paste", command=paste_text)
-edit_menu.add_separator()
-edit_menu.add_command(label="Select All", command=select_all)
-
-# In your edit menu section:
-edit_menu.add_separator()
-edit_menu.add_command(label="Find & Replace", command=find_replace)
-
-# Create a View menu
-view_menu = tk.Menu(menu_bar, tearoff=0)
-menu_bar.add_cascade(label="View", menu=view_menu)
-view_menu.add_command(label="Toggle Dark Mode", command=toggle_theme)
-
-# Create a Format menu
-format_menu = tk.Menu(menu_bar, tearoff=0)
-menu_bar.add_cascade(label="Format", menu=format_menu)
-
-# Add font size submenu
-font_size_menu = tk.Menu(format_menu, tearoff=0)
-format_menu.add_cascade(label="Font Size", menu=font_size_menu)
-
-# Add options: 12, 14, 16, 18, 20, 24, 32
-# We use lambda to pass the specific size to the function
-font_size_menu.add_command(label="12", command=lambda: change_font_size(12))
-font_size_menu.add_command(label="14", command=lambda: change_font_size(14))
-font_size_menu.add_command(label="16", command=lambda: change_font_size(16))
-font_size_menu.add_command(label="18", command=lambda: change_font_size(18))
-font_size_menu.add_command(label="20", command=lambda: change_font_size(20))
-font_size_menu.add_command(label="24", command=lambda: change_font_size(24))
-font_size_menu.add_command(label="32", command=lambda: change_font_size(32))
-
-#Create a help menu
-# help_menu = tk.Menu(menu_bar, tearoff=0)
-# menu_bar.add_cascade(label="Help", menu=help_menu)
-# help_menu.add_command(label="About", command=show_about)
-
-#Keyboard shortcuts
-root.bind("<Control-n>", lambda event: new_file())
-root.bind("<Control-o>", lambda event: open_file())
-root.bind("<Control-s>", lambda event: save_file())
-root.bind("<Control-z>", lambda event: undo_text())
-root.bind("<Control-y>", lambda event: redo_text())
-# In your shortcuts section:
-root.bind("<Control-h>", lambda event: find_replace())
-
-# Handle window close button (X)
-root.protocol("WM_DELETE_WINDOW", on_closing)
-
-root.bind("<Control-d>", lambda event: toggle_theme())
-
-
-# Call update_status whenever the cursor moves
-text.bind("<KeyRelease>", lambda event: update_status())          # After any key press
-# text.bind("<ButtonRelease-1>", lambda event: update_status()) # After mouse click
-#   ↑ We use "Release" not "Press" because:
-#   - On Press: cursor is still at the OLD position
-#   - On Release: cursor has MOVED to the NEW position
-
-# Detect when text is modified (<<Modified>> fires when text changes)
-text.bind("<<Modified>>", lambda event: on_text_change())
-
-# Re-highlight on every key release (so it updates as you type)
-text.bind("<KeyRelease>", lambda event: [update_status(), apply_syntax_highlighting()])
-
-
-# Run the application continuously
-# Starts and keeps the window open
-root.mainloop()
\ No newline at end of file
+    text.highlighter.configure_colors(is_dark_mode)
+
+    # 2. Re-highlight only the lines that changed, once typing pauses.
+    # The rest of the file is highlighted in the background (see highlighter.py)
+    text.scheduler.trigger("highlight")
+
+
+# --- WINDOW ---
+# Builds the window, the text area, the status bar and the menus. Nothing
+# here runs on import, so the functions above can be reused and timed
+# (see benchmarks/) without a window popping up
+def build_window():
+    global root, text, status_bar, status_text, status_label, watcher
+    # Only needed once there is a window (see editor_core.py on startup)
+    from file_watch import FileWatcher
+    from perf_monitor import enable_from_environment
+    # Create main application window
+    root = tk.Tk()
+    enable_from_environment(root)
+
+    # Set window title
+    root.title("Simple Text Editor")
+
+    # Set window size
+    root.geometry("800x600")
+
+    # Create a Frame (an invisible container/box) at the bottom
+    # Rule of thumb: In tkinter pack(), always pack fixed-size widgets first (like status bars), then pack the expanding widget last.
+    status_bar = tk.Frame(root, height=20)
+    status_bar.pack(side=tk.BOTTOM, fill=tk.X)  #stretches across the full width
+    # Create a StringVar — a "smart" variable
+    status_text = tk.StringVar()
+    status_text.set("Line: 1 | Column: 0")
+
+    #Put a Label inside the Frame, connected to the StringVar
+    status_label = tk.Label(status_bar, textvariable=status_text, anchor=tk.E, padx=10)
+    status_label.pack(fill=tk.X)
+
+    # Create text editor area. editor_core.py gives it everything the
+    # document needs: its TextBuffer, the scheduler that collapses bursts of
+    # key events, highlighting, word counts, undo, font sizes and the
+    # crash-recovery journal. The status bar refreshes about once per frame
+    # after keys, clicks and selection changes
+    text = create_text_widget(root, SESSION_NAME, on_status=update_status)
+    text.journal.start("Untitled")
+
+    # Detect when text is modified (<<Modified>> fires when text changes)
+    text.bind("<<Modified>>", lambda event: on_text_change())
+
+    # Tell us when another program changes the open file. Coming back to
+    # the window checks right away
+    watcher = FileWatcher(root, on_change=on_file_changed)
+    root.bind("<FocusIn>", lambda event: watcher.check_now())
+
+    build_menus()
+
+    #Keyboard shortcuts
+    root.bind("<Control-n>", lambda event: new_file())
+    root.bind("<Control-o>", lambda event: open_file())
+    root.bind("<Control-s>", lambda event: save_file())
+    root.bind("<Control-z>", lambda event: undo_text())
+    root.bind("<Control-y>", lambda event: redo_text())
+    # In your shortcuts section:
+    root.bind("<Control-h>", lambda event: find_replace())
+    root.bind("<Control-g>", lambda event: goto_line())
+    root.bind("<Control-p>", lambda event: goto_symbol())
+    root.bind("<Escape>", lambda event: cancel_loading())
+    root.bind("<Control-d>", lambda event: toggle_theme())
+
+    # Handle window close button (X)
+    root.protocol("WM_DELETE_WINDOW", on_closing)
+    return root
+
+
+def build_menus():
+    #Create a menu bar
+    menu_bar = tk.Menu(root)
+
+    #Attach the menu bar to the root window
+    root.config(menu=menu_bar)
+
+    #Create a file menu
+    # Dropdown under File which has options like New, Open, Save, Exit
+    file_menu = tk.Menu(menu_bar, tearoff=0)
+
+    #Add the file menu to the menu bar
+    menu_bar.add_cascade(label="File", menu=file_menu)
+
+    #Add commands to the file menu
+    file_menu.add_command(label="New", command=new_file)
+    file_menu.add_command(label="Open", command=open_file)
+    file_menu.add_command(label="Save", command=save_file)
+    file_menu.add_command(label="Compare with Saved", command=compare_with_saved)
+    file_menu.add_command(label="Cancel Loading", command=cancel_loading)
+    # Add a separator line in menu
+    file_menu.add_separator()
+    # Add Exit option to close the application
+    file_menu.add_command(label="Exit", command=on_closing)
+
+    # Create an edit menu
+    edit_menu = tk.Menu(menu_bar, tearoff=0)
+    menu_bar.add_cascade(label="Edit", menu=edit_menu)
+    edit_menu.add_command(label="Undo", command=undo_text)
+    edit_menu.add_command(label="Redo", command=redo_text)
+    edit_menu.add_separator()
+    edit_menu.add_command(label="Cut", command=cut_text)
+    edit_menu.add_command(label="Copy", command=copy_text)
+    edit_menu.add_command(label="Paste", command=paste_text)
+    edit_menu.add_separator()
+    edit_menu.add_command(label="Select All", command=select_all)
+
+    # In your edit menu section:
+    edit_menu.add_separator()
+    edit_menu.add_command(label="Find & Replace", command=find_replace)
+    edit_menu.add_command(label="Go to Line", command=goto_line)
+    edit_menu.add_command(label="Go to Symbol", command=goto_symbol)
+
+    # Create a View menu
+    view_menu = tk.Menu(menu_bar, tearoff=0)
+    menu_bar.add_cascade(label="View", menu=view_menu)
+    view_menu.add_command(label="Toggle Dark Mode", command=toggle_theme)
+    view_menu.add_command(label="Outline", command=toggle_outline)
+    view_menu.add_separator()
+    view_menu.add_command(label="Performance", command=show_performance)
+
+    # Create a Format menu
+    format_menu = tk.Menu(menu_bar, tearoff=0)
+    menu_bar.add_cascade(label="Format", menu=format_menu)
+
+    # Add font size submenu
+    font_size_menu = tk.Menu(format_menu, tearoff=0)
+    format_menu.add_cascade(label="Font Size", menu=font_size_menu)
+
+    # Add options: 12, 14, 16, 18, 20, 24, 32
+    # We use lambda to pass the specific size to the function
+    font_size_menu.add_command(label="12", command=lambda: change_font_size(12))
+    font_size_menu.add_command(label="14", command=lambda: change_font_size(14))
+    font_size_menu.add_command(label="16", command=lambda: change_font_size(16))
+    font_size_menu.add_command(label="18", command=lambda: change_font_size(18))
+    font_size_menu.add_command(label="20", command=lambda: change_font_size(20))
+    font_size_menu.add_command(label="24", command=lambda: change_font_size(24))
+    font_size_menu.add_command(label="32", command=lambda: change_font_size(32))
+
+    #Create a help menu
+    # help_menu = tk.Menu(menu_bar, tearoff=0)
+    # menu_bar.add_cascade(label="Help", menu=help_menu)
+    # help_menu.add_command(label="About", command=show_about)
+
+
+# View -> Performance (see perf_monitor.py)
+def show_performance():
+    from perf_monitor import open_panel
+    open_panel(root)
+
+
+def main():
+    build_window()
+
+    # Recover from a crash, or else reopen the file from last time
+    if not offer_recovery():
+        restore_session()
+
+    # Run the application continuously
+    # Starts and keeps the window open
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import random
+
+# --- SYNTHETIC DOCUMENTS ---
+# Benchmarks need the same input every run, so the documents are made from
+# a fixed random seed: Python source (for highlighting) and a log file
+# (long runs of similar lines, like the big files people really open).
+# Roughly one line in 50 contains "TODO", the term the find/replace
+# benchmarks look for.
+
+SIZES = {"1KB": 1024, "1MB": 1024 * 1024, "50MB": 50 * 1024 * 1024}
+KINDS = ("python", "log")
+EXTENSIONS = {"python": ".py", "log": ".log"}     # picks the lexer (lexers.py)
+SEARCH_TERM = "TODO"
+
+_WORDS = ("value", "result", "items", "count", "name", "total", "index", "data",
+          "buffer", "line", "offset", "parser", "token", "state", "config")
+
+
+def _python_block(rng, number):
+    a, b, c = rng.sample(_WORDS, 3)
+    block = [
+        f"def {a}_{number}({b}, {c}=None):",
+        f'    """Return the {a} for {b}, using {c} when it is given."""',
+        f"    # TODO: cache {a} between calls" if rng.random() < 0.2 else f"    # work out {a}",
+        f"    {a} = []",
+        f"    for {b}_item in range(len({b})):",
+        f"        if {c} is not None and {b}_item % {rng.randint(2, 9)} == 0:",
+        f"            {a}.append('{b}' + str({b}_item))",
+        f"        elif {b}_item > {rng.randint(10, 999)}:",
+        f'            {a}.append(f"{{{c}}}: {{{b}_item}}")',
+        f"    return {a}",
+        "",
+    ]
+    if rng.random() < 0.3:
+        block += [
+            f"class {a.title()}{number}:",
+            f"    {b} = {rng.randint(0, 10000)}",
+            "",
+            f"    def {c}(self):",
+            f"        return self.{b} * {rng.random():.3f}",
+            "",
+        ]
+    return "\n".join(block) + "\n"
+
+
+def _log_line(rng, number):
+    level = rng.choice(("INFO", "INFO", "INFO", "DEBUG", "WARNING", "ERROR"))
+    second = number % 86400
+    stamp = f"2026-01-{1 + number // 86400 % 28:02d}T{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+    message = f"request id={rng.getrandbits(32):08x} path=/api/{rng.choice(_WORDS)} took {rng.randint(1, 900)}ms"
+    if rng.random() < 0.02:
+        message += f" {SEARCH_TERM} retry budget exceeded"
+    return f"{stamp}.{rng.randint(0, 999):03d} {level:<7} worker-{rng.randint(1, 16)} {message}\n"
+
+
+# The text of a document of about `size` characters
+def generate(kind, size, seed=1234):
+    rng = random.Random(seed)
+    make = _python_block if kind == "python" else _log_line
+    # A pool of distinct pieces, repeated with new numbers, keeps the
+    # 50 MB documents quick to build
+    pool = [make(rng, number) for number in range(500)]
+    parts = []
+    total = 0
+    number = 0
+    while total < size:
+        piece = pool[number % len(pool)]
+        if kind == "python":
+            piece = piece.replace(f"_{number % len(pool)}(", f"_{number}(", 1)
+        parts.append(piece)
+        total += len(piece)
+        number += 1
+    return "".join(parts)[:size]
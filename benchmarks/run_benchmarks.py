@@ -0,0 +1,398 @@
+import argparse
+import json
+import mmap
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# --- EDITOR BENCHMARKS ---
+# Times the editor's hot paths on synthetic documents (documents.py) and
+# writes the numbers to a JSON file, so runs on different commits can be
+# compared. Thresholds (thresholds.json) make the run fail when keystroke
+# latency gets worse than allowed.
+#
+# Three groups of benchmarks:
+#   startup    cold start of each editor in a fresh interpreter: the imports
+#              (anywhere) and, with a display, the window with an empty document
+#   headless   the document model, lexer, search, file I/O; runs anywhere
+#   tk         the same paths through a real Text widget (typing, status
+#              bar, highlighting, Find/Replace All, opening, tab switching);
+#              needs a display, e.g. `xvfb-run python benchmarks/run_benchmarks.py`
+#
+#   python benchmarks/run_benchmarks.py                    # 1KB and 1MB
+#   python benchmarks/run_benchmarks.py --sizes 1KB,1MB,50MB
+#   python benchmarks/run_benchmarks.py --compare benchmarks/results/old.json
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from documents import EXTENSIONS, KINDS, SEARCH_TERM, SIZES, generate
+from editor_core import create_text_widget, get_search_engine, status_message
+from doc_stats import count_words_in_chunks
+from file_io import atomic_write, iter_file_text
+from large_file import LARGE_FILE_THRESHOLD, LineIndex
+from python_lexer import PythonLexer
+from search import compile_pattern
+from text_buffer import TextBuffer
+
+REPEATS = 5             # runs of each whole-document benchmark
+KEYSTROKES = 200        # keys "typed" for the keystroke latency numbers
+LEX_LINES = 20000       # lines lexed (the highlighter works on what's visible)
+MAX_REGRESSION = 0.5    # with --compare: keystroke p95 may grow by 50% at most
+
+# Editor module, and what it takes to show an empty document once the
+# window is built
+EDITORS = {
+    "simple": ("SimpleTextEditor", ""),
+    "advanced": ("Advanced_TextEditor", "editor.create_editor_tab(); "),
+}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Results:
+    def __init__(self):
+        self.results = {}
+        self.skipped = {}
+
+    # `samples` are milliseconds
+    def add(self, name, samples):
+        self.results[name] = {
+            "median_ms": round(statistics.median(samples), 4),
+            "p95_ms": round(percentile(samples, 0.95), 4),
+            "max_ms": round(max(samples), 4),
+            "runs": len(samples),
+        }
+        print(f"  {name:<44} median {self.results[name]['median_ms']:>10.3f} ms"
+              f"   p95 {self.results[name]['p95_ms']:>10.3f} ms")
+
+    def skip(self, name, reason):
+        self.skipped[name] = reason
+        print(f"  {name:<44} skipped: {reason}")
+
+
+def timed(function, repeats=REPEATS):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+# --- Cold startup ---
+def run_python(code):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(HERE), check=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def run_startup(results, with_window):
+    print("startup:")
+    # The interpreter on its own, to tell it apart from the editor's share
+    results.add("startup_python", [run_python("pass") for _ in range(REPEATS)])
+    for name, (module, show_document) in EDITORS.items():
+        code = f"import {module} as editor"
+        results.add(f"startup_import.{name}", [run_python(code) for _ in range(REPEATS)])
+        if not with_window:
+            results.skip(f"startup_window.{name}", "no display")
+            continue
+        code += f"; root = editor.build_window(); {show_document}root.update(); root.destroy()"
+        results.add(f"startup_window.{name}", [run_python(code) for _ in range(REPEATS)])
+
+
+# --- Headless: no Tk needed ---
+def run_headless(results, kind, size_name, path, content, work_dir):
+    label = f"{kind}.{size_name}"
+    repeats = 1 if len(content) >= LARGE_FILE_THRESHOLD else REPEATS
+
+    def read_file():
+        for _ in iter_file_text(path):
+            pass
+    results.add(f"open_read.{label}", timed(read_file, repeats))
+
+    if len(content) >= LARGE_FILE_THRESHOLD:
+        # What large-file mode does instead of loading the text
+        def index_lines():
+            with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                LineIndex(data).build()
+        results.add(f"open_large_index.{label}", timed(index_lines, repeats))
+
+    buffer = TextBuffer(content)
+    results.add(f"buffer_load.{label}", timed(lambda: TextBuffer(content), repeats))
+
+    out_path = os.path.join(work_dir, "saved.txt")
+    results.add(f"save.{label}", timed(lambda: atomic_write(out_path, buffer.snapshot().iter_chunks()), repeats))
+
+    pattern = compile_pattern(SEARCH_TERM)
+    results.add(f"find.{label}",
+                timed(lambda: sum(1 for _ in pattern.finditer(buffer.get_text())), repeats))
+    results.add(f"word_count.{label}",
+                timed(lambda: count_words_in_chunks(buffer.iter_chunks()), repeats))
+
+    if kind == "python":
+        lines = buffer.get_lines(0, min(buffer.line_count, LEX_LINES))
+
+        def lex():
+            lexer = PythonLexer()
+            state = None
+            for line in lines:
+                _, state = lexer.tokenize_line(line, state)
+        results.add(f"lex_{LEX_LINES}_lines.{label}", timed(lex, repeats))
+
+    # One key: the buffer edit plus the offset -> "line.col" the status bar needs
+    middle = len(buffer) // 2
+    samples = []
+    for i in range(KEYSTROKES):
+        started = time.perf_counter()
+        buffer.insert(middle + i, "x")
+        buffer.offset_to_index(middle + i + 1)
+        samples.append((time.perf_counter() - started) * 1000)
+    results.add(f"keystroke_buffer.{label}", samples)
+
+
+# --- Through Tk ---
+# A document as the editors make it (editor_core.py); the path picks the
+# lexer, so logs go through the plain, no-op one
+def make_editor(parent, path, content=""):
+    # Filled like a rebuilt tab, so the text isn't one big undo step
+    return create_text_widget(parent, buffer=TextBuffer(content) if content else None, path=path)
+
+
+def run_tk(results, root, kind, size_name, path, content):
+    import tkinter as tk
+    from tkinter import ttk
+    from file_io import TextLoader
+    from large_file import LargeFileView
+    from tab_registry import DocumentState, TabRegistry
+
+    label = f"{kind}.{size_name}"
+    if len(content) >= LARGE_FILE_THRESHOLD:
+        # The editors open files this big in large-file mode
+        frame = tk.Frame(root)
+        frame.pack(expand=True, fill=tk.BOTH)
+        scrollbar = tk.Scrollbar(frame)
+        text = tk.Text(frame)
+        text.pack()
+        started = time.perf_counter()
+        view = LargeFileView(text, scrollbar, path)
+        root.update()
+        first_screen = (time.perf_counter() - started) * 1000
+        while not view.index.done:
+            root.update()
+        results.add(f"open_large_view.{label}", [first_screen])
+        results.add(f"open_large_indexed.{label}", [(time.perf_counter() - started) * 1000])
+        frame.destroy()
+        for name in ("keystroke", "update_status", "apply_syntax_highlighting",
+                     "find_text", "replace_all", "tab_switch"):
+            results.skip(f"{name}.{label}", "large-file mode, no Text widget")
+        return
+
+    # Open: stream the file in like the editors do
+    samples = []
+    for _ in range(REPEATS):
+        frame = tk.Frame(root)
+        frame.pack(expand=True, fill=tk.BOTH)
+        text = make_editor(frame, path)
+        loader = TextLoader(text, iter_file_text(path))
+        started = time.perf_counter()
+        loader.start()
+        while loader.active:
+            root.update()
+        samples.append((time.perf_counter() - started) * 1000)
+        frame.destroy()
+    results.add(f"open.{label}", samples)
+
+    frame = tk.Frame(root)
+    frame.pack(expand=True, fill=tk.BOTH)
+    text = make_editor(frame, path, content)
+    root.update()
+    text.mark_set("insert", f"{text.buffer.line_count // 2}.0")
+    text.see("insert")
+    root.update()
+
+    # Keystroke: the edit (with every listener), the status bar, the redraw
+    samples = []
+    for _ in range(KEYSTROKES):
+        started = time.perf_counter()
+        text.insert("insert", "x")
+        status_message(text)
+        root.update_idletasks()
+        samples.append((time.perf_counter() - started) * 1000)
+    results.add(f"keystroke.{label}", samples)
+
+    results.add(f"update_status.{label}", timed(lambda: status_message(text), KEYSTROKES))
+
+    def highlight():
+        # Everything dirty, as after a theme change; only the view is done now
+        highlighter = text.highlighter
+        highlighter.line_done = bytearray(len(highlighter.line_done))
+        highlighter.highlight_visible()
+        root.update_idletasks()
+    results.add(f"apply_syntax_highlighting.{label}", timed(highlight))
+
+    engine = get_search_engine(text)
+    results.add(f"find_text.{label}", timed(lambda: engine.find_all(SEARCH_TERM)))
+
+    # Replace All runs in steps between events: the total time and the
+    # longest the window went without handling events
+    engine.find_all(SEARCH_TERM)
+    gaps = []
+    started = time.perf_counter()
+    engine.replace_all("DONE")
+    while engine.replacing:
+        step = time.perf_counter()
+        root.update()
+        gaps.append((time.perf_counter() - step) * 1000)
+    results.add(f"replace_all.{label}", [(time.perf_counter() - started) * 1000])
+    results.add(f"replace_all_step.{label}", gaps or [0.0])
+    frame.destroy()
+
+    # Tab switching: more tabs than stay live, so some get rebuilt
+    notebook = ttk.Notebook(root)
+    notebook.pack(expand=True, fill=tk.BOTH)
+
+    # A parked tab is rebuilt from its buffer, as in build_text_widget()
+    def rebuild(doc):
+        doc.text = create_text_widget(doc.frame, buffer=doc.buffer, path=path)
+
+    registry = TabRegistry(notebook, materialize=rebuild, can_park=lambda doc: True)
+
+    frames = []
+    for number in range(registry.live_tabs + 2):
+        tab = tk.Frame(notebook)
+        notebook.add(tab, text=f"tab {number}")
+        doc = registry.add(tab, DocumentState(f"tab {number}"))
+        doc.text = make_editor(tab, path, content)
+        doc.buffer = doc.text.buffer
+        registry.touch(doc)
+        frames.append(tab)
+    samples = []
+    for number in range(len(frames) * 3):
+        started = time.perf_counter()
+        notebook.select(frames[number % len(frames)])
+        registry.on_tab_changed()
+        root.update_idletasks()
+        samples.append((time.perf_counter() - started) * 1000)
+    results.add(f"tab_switch.{label}", samples)
+    notebook.destroy()
+
+
+# --- Thresholds ---
+def check_thresholds(results, thresholds, baseline=None):
+    failures = []
+    for name, limits in thresholds.items():
+        measured = results.get(name)
+        if measured is None:
+            continue
+        for metric, limit in limits.items():
+            if measured[metric] > limit:
+                failures.append(f"{name}: {metric} {measured[metric]:.3f} ms > {limit} ms")
+    if baseline:
+        for name, measured in results.items():
+            old = baseline.get(name)
+            if name.startswith("keystroke") and old and old["p95_ms"] > 0:
+                growth = measured["p95_ms"] / old["p95_ms"] - 1
+                if growth > MAX_REGRESSION:
+                    failures.append(f"{name}: p95 {old['p95_ms']:.3f} -> {measured['p95_ms']:.3f} ms "
+                                    f"(+{growth:.0%}, allowed +{MAX_REGRESSION:.0%})")
+    return failures
+
+
+def print_comparison(results, baseline):
+    print("\nCompared with the baseline (median):")
+    for name, measured in sorted(results.items()):
+        old = baseline.get(name)
+        if old and old["median_ms"] > 0:
+            change = measured["median_ms"] / old["median_ms"] - 1
+            print(f"  {name:<44} {old['median_ms']:>10.3f} -> {measured['median_ms']:>10.3f} ms  ({change:+.0%})")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the editor's hot paths.")
+    parser.add_argument("--sizes", default="1KB,1MB", help="comma-separated, from " + ", ".join(SIZES))
+    parser.add_argument("--kinds", default=",".join(KINDS))
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="an earlier results file to compare with")
+    parser.add_argument("--thresholds", default=os.path.join(HERE, "thresholds.json"))
+    parser.add_argument("--headless", action="store_true", help="skip the Tk benchmarks")
+    args = parser.parse_args()
+
+    root = None
+    tk_skipped = "--headless given" if args.headless else None
+    if not args.headless:
+        import tkinter as tk
+        try:
+            root = tk.Tk()
+            root.geometry("800x600")
+        except tk.TclError as error:
+            tk_skipped = f"no display ({error})"
+
+    results = Results()
+    run_startup(results, with_window=root is not None)
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size_name in args.sizes.split(","):
+            for kind in args.kinds.split(","):
+                print(f"{kind} {size_name}:")
+                content = generate(kind, SIZES[size_name])
+                path = os.path.join(work_dir, f"{kind}-{size_name}{EXTENSIONS[kind]}")
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write(content)
+                run_headless(results, kind, size_name, path, content, work_dir)
+                if root is not None:
+                    run_tk(results, root, kind, size_name, path, content)
+                os.remove(path)
+    if root is not None:
+        root.destroy()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        print_comparison(results.results, baseline)
+    with open(args.thresholds, encoding="utf-8") as file:
+        thresholds = json.load(file)
+    failures = check_thresholds(results.results, thresholds, baseline)
+
+    commit = git_commit()
+    output = args.output or os.path.join(HERE, "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    report = {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "tk": "skipped: " + tk_skipped if tk_skipped else "ran",
+        "results": results.results,
+        "skipped": results.skipped,
+        "failures": failures,
+    }
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nResults written to {output}")
+
+    if failures:
+        print("\nThresholds exceeded:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
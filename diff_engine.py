@@ -0,0 +1,362 @@
+import queue
+import threading
+from collections import Counter, deque
+from concurrent.futures import wait
+
+from file_io import iter_file_text
+
+# --- DIFF ENGINE ---
+# Works out which lines differ between two texts (the tab and the file on
+# disk, or two tabs) for the Compare view (diff_view.py), and which lines a
+# reload has to replace (file_watch.py). difflib on the Tk thread took
+# seconds on 100k-line files and froze the window; this runs elsewhere and
+# is quicker to begin with:
+#
+#   - every line becomes a small number (equal lines get equal numbers), so
+#     the diff compares ints, and only ints are sent to other processes
+#   - the common start and end are skipped with slice compares (C speed)
+#   - lines that appear exactly once on each side anchor the rest (as in
+#     "patience diff"): the text between two anchors is diffed on its own.
+#     Anchors keep the diff readable (a moved brace doesn't pair up
+#     unrelated functions) and cut one big problem into many small ones
+#   - each piece is diffed with Myers' algorithm in linear space (the
+#     "middle snake" split of the 1986 paper, the one git and GNU diff use).
+#     A piece that is too different is given up on after DIFF_MAX_COST
+#     steps and shown as one replaced block
+#
+# Big comparisons are split into jobs for the same process pool Find in
+# Files uses; hunks are handed back in order as the jobs finish, so the
+# view can show the start of a long file long before the end is done.
+#
+#   job = DiffJob(widget, left.snapshot().get_text, lambda: read_file_text(path),
+#                 on_texts=show, on_hunks=add, on_done=finished)
+#   job.start()
+#
+# A hunk is (a_start, a_end, b_start, b_end): lines a_start..a_end-1 of the
+# left text (0-based) were replaced by lines b_start..b_end-1 of the right.
+# One side is empty for lines that were only added or only removed.
+
+DIFF_MAX_COST = 1000        # edits tried per split before a region counts as replaced
+POOL_MIN_LINES = 20000      # smaller diffs are worked out on the feeder thread
+JOB_LINES = 20000           # lines sent to a worker process at once
+JOBS_PER_WORKER = 2         # jobs in flight per worker process
+POLL_MS = 50                # how often the Tk thread picks up hunks
+
+
+def read_file_text(path, encoding="utf-8"):
+    return "".join(text for text, percent in iter_file_text(path, encoding))
+
+
+# --- Comparing sequences ---
+
+def common_prefix(a, b):
+    # Binary search with slice compares: runs at memcmp speed
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def common_suffix(a, b, limit):
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:len(a) - low] == b[len(b) - middle:len(b) - low]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+# Both lists of lines as lists of ints, equal lines getting equal ints
+def line_ids(a_lines, b_lines):
+    ids = {}
+    return ([ids.setdefault(line, len(ids)) for line in a_lines],
+            [ids.setdefault(line, len(ids)) for line in b_lines])
+
+
+# Where to split a[a0:a1] / b[b0:b1] so that each half can be diffed on its
+# own: (x, y), on the best path through the middle. None if no path within
+# `max_cost` edits was found. Both ranges are non-empty, and their first
+# and last items differ (the common start and end were trimmed)
+def _middle_snake(a, a0, a1, b, b0, b1, max_cost):
+    n = a1 - a0
+    m = b1 - b0
+    max_d = min((n + m + 1) // 2, max_cost)
+    offset = max_d
+    size = 2 * max_d + 2
+    forward = [-1] * size       # furthest x reached on each diagonal k = x - y
+    forward[offset + 1] = 0
+    backward = forward[:]       # the same, walking back from the end
+    delta = n - m
+    # With an odd delta the paths can only meet on a forward step
+    front = delta % 2 != 0
+    k1start = k1end = k2start = k2end = 0    # diagonals that ran off the edge
+    for d in range(max_d):
+        for k1 in range(-d + k1start, d + 1 - k1end, 2):
+            k1_offset = offset + k1
+            if k1 == -d or (k1 != d and forward[k1_offset - 1] < forward[k1_offset + 1]):
+                x1 = forward[k1_offset + 1]
+            else:
+                x1 = forward[k1_offset - 1] + 1
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[a0 + x1] == b[b0 + y1]:
+                x1 += 1
+                y1 += 1
+            forward[k1_offset] = x1
+            if x1 > n:
+                k1end += 2
+            elif y1 > m:
+                k1start += 2
+            elif front:
+                k2_offset = offset + delta - k1
+                if 0 <= k2_offset < size and backward[k2_offset] != -1 and x1 >= n - backward[k2_offset]:
+                    return a0 + x1, b0 + y1
+        for k2 in range(-d + k2start, d + 1 - k2end, 2):
+            k2_offset = offset + k2
+            if k2 == -d or (k2 != d and backward[k2_offset - 1] < backward[k2_offset + 1]):
+                x2 = backward[k2_offset + 1]
+            else:
+                x2 = backward[k2_offset - 1] + 1
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[a1 - 1 - x2] == b[b1 - 1 - y2]:
+                x2 += 1
+                y2 += 1
+            backward[k2_offset] = x2
+            if x2 > n:
+                k2end += 2
+            elif y2 > m:
+                k2start += 2
+            elif not front:
+                k1_offset = offset + delta - k2
+                if 0 <= k1_offset < size and forward[k1_offset] != -1:
+                    x1 = forward[k1_offset]
+                    if x1 >= n - x2:
+                        return a0 + x1, b0 + x1 - (k1_offset - offset)
+    return None
+
+
+# The hunks between a[a0:a1] and b[b0:b1], in order
+def diff_ids(a, b, a0=0, a1=None, b0=0, b1=None, max_cost=DIFF_MAX_COST):
+    a1 = len(a) if a1 is None else a1
+    b1 = len(b) if b1 is None else b1
+    if a0 < a1 and b0 < b1 and set(a[a0:a1]).isdisjoint(b[b0:b1]):
+        return [(a0, a1, b0, b1)]       # not a line in common
+    pieces = []
+    # Split in the middle until each part is only additions or removals.
+    # A stack instead of recursion: deep splits can't hit the recursion limit
+    stack = [(a0, a1, b0, b1)]
+    while stack:
+        a0, a1, b0, b1 = stack.pop()
+        while a0 < a1 and b0 < b1 and a[a0] == b[b0]:
+            a0 += 1
+            b0 += 1
+        while a0 < a1 and b0 < b1 and a[a1 - 1] == b[b1 - 1]:
+            a1 -= 1
+            b1 -= 1
+        if a0 == a1 or b0 == b1:
+            if a0 < a1 or b0 < b1:
+                pieces.append((a0, a1, b0, b1))
+            continue
+        split = _middle_snake(a, a0, a1, b, b0, b1, max_cost)
+        if split is None:
+            pieces.append((a0, a1, b0, b1))     # too different: one replaced block
+            continue
+        x, y = split
+        stack.append((x, a1, y, b1))
+        stack.append((a0, x, b0, y))    # popped first, so pieces come out in order
+    # A removal right next to an addition is one changed block
+    hunks = []
+    for piece in pieces:
+        if hunks and hunks[-1][1] == piece[0] and hunks[-1][3] == piece[2]:
+            hunks[-1] = (hunks[-1][0], piece[1], hunks[-1][2], piece[3])
+        else:
+            hunks.append(piece)
+    return hunks
+
+
+# Cut a / b into the regions that need diffing: [(a0, a1, b0, b1), ...] in
+# order. Everything between them is equal (the common start and end, and
+# the lines that are unique on both sides and still in the same order)
+def split_segments(a, b):
+    a0 = b0 = common_prefix(a, b)
+    end = common_suffix(a, b, min(len(a), len(b)) - a0)
+    a1 = len(a) - end
+    b1 = len(b) - end
+    count_a = Counter(a[a0:a1])
+    count_b = Counter(b[b0:b1])
+    unique_b = {line: j for j, line in enumerate(b[b0:b1], b0) if count_b[line] == 1}
+    anchors = [(i, unique_b[line]) for i, line in enumerate(a[a0:a1], a0)
+               if count_a[line] == 1 and line in unique_b]
+
+    # Keep the longest run of anchors that is in order on both sides
+    # (longest increasing subsequence, patience sorting)
+    tails = []      # tails[n]: anchor ending the best run of length n + 1
+    tail_js = []
+    links = []      # anchor before each anchor in its best run
+    for number, (i, j) in enumerate(anchors):
+        n = _bisect(tail_js, j)
+        links.append(tails[n - 1] if n else -1)
+        if n == len(tails):
+            tails.append(number)
+            tail_js.append(j)
+        else:
+            tails[n] = number
+            tail_js[n] = j
+    chain = []
+    number = tails[-1] if tails else -1
+    while number != -1:
+        chain.append(anchors[number])
+        number = links[number]
+    chain.reverse()
+
+    segments = []
+    for i, j in chain + [(a1, b1)]:
+        if a0 < i or b0 < j:
+            segments.append((a0, i, b0, j))
+        a0, b0 = i + 1, j + 1
+    return segments
+
+
+def _bisect(values, value):
+    low, high = 0, len(values)
+    while low < high:
+        middle = (low + high) // 2
+        if values[middle] < value:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+# Runs in a worker process (or on the feeder thread for small diffs).
+# `parts` is [(a0, b0, a_ids, b_ids), ...]: the lines of some segments,
+# with where they start. Returns their hunks, numbered in the whole text
+def diff_parts(parts):
+    hunks = []
+    for a0, b0, a, b in parts:
+        for start, end, b_start, b_end in diff_ids(a, b):
+            hunks.append((a0 + start, a0 + end, b0 + b_start, b0 + b_end))
+    return hunks
+
+
+# All hunks between two lists of lines, right here (for small texts, and
+# for file_watch, which already runs on its own thread)
+def diff_lines(a_lines, b_lines):
+    a, b = line_ids(a_lines, b_lines)
+    return diff_parts([(a0, b0, a[a0:a1], b[b0:b1]) for a0, a1, b0, b1 in split_segments(a, b)])
+
+
+# --- Comparing two documents in the background ---
+class DiffJob:
+    def __init__(self, widget, read_left, read_right, on_texts=None, on_hunks=None, on_done=None):
+        self.widget = widget            # only used for after() polling
+        # Called on the feeder thread: take a TextBuffer snapshot's get_text
+        # (snapshots are safe to read there) or read the file
+        self.read_left = read_left
+        self.read_right = read_right
+        self.on_texts = on_texts        # called with (left, right) once both are read
+        self.on_hunks = on_hunks        # called with [hunk, ...], in order, as they arrive
+        self.on_done = on_done          # called with (cancelled, error)
+        self.results = queue.Queue()
+        self.cancelled = threading.Event()
+        self.active = False
+        self._finished = False
+        self.error = None
+
+    def start(self):
+        self.active = True
+        threading.Thread(target=self._run, daemon=True).start()
+        self.widget.after(POLL_MS, self._poll)
+
+    def cancel(self):
+        self.cancelled.set()
+
+    # --- Tk thread: hand over what has arrived ---
+    def _poll(self):
+        if not self.widget.winfo_exists():
+            self.cancelled.set()
+            return
+        hunks = []
+        while True:
+            try:
+                kind, value = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if self.cancelled.is_set():
+                continue
+            if kind == "texts":
+                if self.on_texts:
+                    self.on_texts(*value)
+            else:
+                hunks += value
+        if hunks and self.on_hunks and not self.cancelled.is_set():
+            self.on_hunks(hunks)
+        if self._finished and self.results.empty():
+            self.active = False
+            if self.on_done:
+                self.on_done(self.cancelled.is_set(), self.error)
+            return
+        self.widget.after(POLL_MS, self._poll)
+
+    # --- Feeder thread ---
+    def _run(self):
+        try:
+            left = self.read_left()
+            right = self.read_right()
+            self.results.put(("texts", (left, right)))
+            a, b = line_ids(left.split("\n"), right.split("\n"))
+            del left, right
+            # Segments with lines on both sides need the diff; the others
+            # are plain additions or removals
+            jobs = []
+            job = []
+            size = 0
+            for a0, a1, b0, b1 in split_segments(a, b):
+                job.append((a0, b0, a[a0:a1], b[b0:b1]))
+                size += (a1 - a0) + (b1 - b0)
+                if size >= JOB_LINES:
+                    jobs.append(job)
+                    job = []
+                    size = 0
+            if job:
+                jobs.append(job)
+            if sum(len(part[2]) + len(part[3]) for job in jobs for part in job) < POOL_MIN_LINES:
+                # Quicker here than starting worker processes
+                for job in jobs:
+                    if self.cancelled.is_set():
+                        break
+                    self.results.put(("hunks", diff_parts(job)))
+            else:
+                self._run_in_pool(jobs)
+        except Exception as error:
+            self.error = error
+        finally:
+            self._finished = True
+
+    def _run_in_pool(self, jobs):
+        from find_in_files import make_pool     # brings in multiprocessing
+        pool, workers = make_pool()
+        pending = deque()
+        try:
+            for job in jobs:
+                if self.cancelled.is_set():
+                    break
+                pending.append(pool.submit(diff_parts, job))
+                # Keep the workers busy without queueing every job
+                while len(pending) >= workers * JOBS_PER_WORKER and not self.cancelled.is_set():
+                    self._collect(pending)
+            while pending and not self.cancelled.is_set():
+                self._collect(pending)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # Hand over the oldest job's hunks once it is done, so hunks stay in order
+    def _collect(self, pending):
+        finished, waiting = wait([pending[0]], timeout=0.1)
+        if finished:
+            self.results.put(("hunks", pending.popleft().result()))
@@ -0,0 +1,254 @@
+import bisect
+import tkinter as tk
+
+from diff_engine import DiffJob
+from editor_core import theme_colors
+from file_io import INSERT_SLICE
+from scheduler import EventScheduler
+
+# --- COMPARE VIEW ---
+# Two documents side by side with the lines that differ highlighted. The
+# diff runs in the background (diff_engine.py); the texts and the
+# differences show up as they arrive, and the window never stops
+# responding, even on files with hundreds of thousands of lines.
+#
+#   - highlight tags are only added for the differences on screen. Tagging
+#     every difference of a big file up front would take longer than the
+#     diff itself; the "tag" job tags the newly visible ones after each
+#     scroll, and starts over once many have piled up
+#   - the two sides scroll together: the side under the mouse leads, and
+#     the other one shows the matching line, worked out from the
+#     differences (lines added on one side push the other one down)
+#   - Next / Previous (Alt+Down / Alt+Up) jump between the differences
+#
+#   DiffView(root, "notes.txt (on disk)", read_disk, "notes.txt", read_tab, is_dark_mode)
+#
+# Only imported the first time something is compared.
+
+DIFF_COLORS = {
+    # (light mode, dark mode)
+    "removed": ("#ffd7d5", "#5a1e1e"),    # only on the left
+    "added": ("#d4f5d4", "#1e4a24"),      # only on the right
+    "changed": ("#fff1c2", "#4d4215"),    # on both sides, different
+}
+MAX_TAGGED_HUNKS = 500  # differences kept highlighted before starting over
+CONTEXT_LINES = 3       # lines shown above a difference jumped to
+DIFF_FONT = ("Courier", 12)
+
+
+def _line(index):
+    return int(index.split(".")[0])
+
+
+class DiffView:
+    def __init__(self, root, left_title, read_left, right_title, read_right, is_dark_mode=False):
+        self.hunks = []             # (a_start, a_end, b_start, b_end), see diff_engine.py
+        self.starts = ([], [])      # where each hunk starts on the left and on the right
+        self.tagged = set()         # hunks highlighted right now
+        self.complete = [0, 0]      # lines fully inserted into each side so far
+        self.texts = None
+        self.driver = 0             # the side that leads when scrolling
+        self.done = False
+
+        self.window = tk.Toplevel(root)
+        self.window.title(f"Compare: {left_title} ↔ {right_title}")
+        self.window.geometry("1100x650")
+
+        top = tk.Frame(self.window)
+        top.pack(fill=tk.X, padx=5, pady=5)
+        self.status = tk.StringVar(value="Reading…")
+        tk.Label(top, textvariable=self.status, anchor="w").pack(side=tk.LEFT)
+        tk.Button(top, text="Next ↓", command=lambda: self.jump(1)).pack(side=tk.RIGHT, padx=2)
+        tk.Button(top, text="Previous ↑", command=lambda: self.jump(-1)).pack(side=tk.RIGHT, padx=2)
+
+        theme = theme_colors(is_dark_mode)
+        mode = 1 if is_dark_mode else 0
+        panes = tk.Frame(self.window)
+        panes.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
+        self.panes = []
+        self.scrollbars = []
+        for side, title in enumerate((left_title, right_title)):
+            tk.Label(panes, text=title, anchor="w").grid(row=0, column=side * 2, columnspan=2, sticky="we")
+            text = tk.Text(panes, wrap=tk.NONE, font=DIFF_FONT, undo=False, bg=theme["bg"], fg=theme["fg"],
+                           selectbackground=theme["select_bg"],
+                           yscrollcommand=lambda first, last, side=side: self._on_scroll(side, first, last),
+                           xscrollcommand=lambda first, last, side=side: self._on_xscroll(side, first, last))
+            scroll = tk.Scrollbar(panes, command=lambda *args, side=side: self._scrollbar(side, *args))
+            text.grid(row=1, column=side * 2, sticky="nsew")
+            scroll.grid(row=1, column=side * 2 + 1, sticky="ns")
+            for kind, colors in DIFF_COLORS.items():
+                text.tag_configure(kind, background=colors[mode])
+            text.tag_raise("sel")
+            text.config(state=tk.DISABLED)      # read-only
+            # Whichever side the mouse is over leads the scrolling
+            for widget in (text, scroll):
+                widget.bind("<Enter>", lambda e, side=side: self._lead(side))
+            text.bind("<FocusIn>", lambda e, side=side: self._lead(side))
+            self.panes.append(text)
+            self.scrollbars.append(scroll)
+        panes.columnconfigure(0, weight=1)
+        panes.columnconfigure(2, weight=1)
+        panes.rowconfigure(1, weight=1)
+
+        self.scheduler = EventScheduler(self.window)
+        self.scheduler.register("load", self._load)
+        self.scheduler.register("tag", self._tag, delay_ms=0, priority=10)
+        self.window.bind("<Alt-Down>", lambda e: self.jump(1))
+        self.window.bind("<Alt-Up>", lambda e: self.jump(-1))
+        self.window.bind("<Escape>", lambda e: self.close())
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.job = DiffJob(self.window, read_left, read_right, on_texts=self._on_texts,
+                           on_hunks=self._on_hunks, on_done=self._on_done)
+        self.job.start()
+
+    def close(self):
+        self.job.cancel()
+        self.window.destroy()
+
+    # --- What the DiffJob hands over ---
+    def _on_texts(self, left, right):
+        self.texts = (left, right)
+        self.status.set("Comparing…")
+        self.scheduler.trigger("load")
+
+    def _on_hunks(self, hunks):
+        for hunk in hunks:
+            self.hunks.append(hunk)
+            self.starts[0].append(hunk[0])
+            self.starts[1].append(hunk[2])
+        self.status.set(f"{len(self.hunks)} differences so far…")
+        self.scheduler.trigger("tag")
+
+    def _on_done(self, cancelled, error):
+        self.done = True
+        if error:
+            self.status.set(f"Compare failed: {error}")
+        elif not self.hunks:
+            self.status.set("No differences")
+        else:
+            self.status.set(f"{len(self.hunks)} differences")
+
+    # --- Scheduler jobs ---
+    # Both texts go into the widgets a slice at a time, so a big file
+    # doesn't freeze the window while it goes in
+    def _load(self):
+        for side, content in enumerate(self.texts):
+            text = self.panes[side]
+            for start in range(0, len(content), INSERT_SLICE):
+                text.config(state=tk.NORMAL)
+                text.insert(tk.END, content[start:start + INSERT_SLICE])
+                text.config(state=tk.DISABLED)
+                # The last line in the widget may be cut off halfway
+                self.complete[side] = _line(text.index("end-1c")) - 1
+                self.scheduler.trigger("tag")
+                yield
+            self.complete[side] = content.count("\n") + 1
+        self.texts = None
+        self.scheduler.trigger("tag")
+
+    def _tag(self):
+        if len(self.tagged) > MAX_TAGGED_HUNKS:
+            for text in self.panes:
+                for kind in DIFF_COLORS:
+                    text.tag_remove(kind, "1.0", tk.END)
+            self.tagged.clear()
+        for side, text in enumerate(self.panes):
+            first = _line(text.index("@0,0")) - 1
+            last = _line(text.index(f"@0,{text.winfo_height()}")) - 1
+            starts = self.starts[side]
+            number = max(0, bisect.bisect_right(starts, first) - 1)
+            while number < len(self.hunks) and starts[number] <= last:
+                if number not in self.tagged:
+                    self._tag_hunk(number)
+                number += 1
+
+    def _tag_hunk(self, number):
+        a_start, a_end, b_start, b_end = self.hunks[number]
+        if a_end > self.complete[0] or b_end > self.complete[1]:
+            return      # not all in yet, tagged once it is
+        if a_start == a_end:
+            kind = "added"
+        elif b_start == b_end:
+            kind = "removed"
+        else:
+            kind = "changed"
+        # Up to the start of the next line: the highlight reaches the edge
+        if a_start < a_end:
+            self.panes[0].tag_add(kind, f"{a_start + 1}.0", f"{a_end + 1}.0")
+        if b_start < b_end:
+            self.panes[1].tag_add(kind, f"{b_start + 1}.0", f"{b_end + 1}.0")
+        self.tagged.add(number)
+
+    # --- Scrolling together ---
+    def _lead(self, side):
+        self.driver = side
+
+    def _scrollbar(self, side, *args):
+        self.driver = side
+        self.panes[side].yview(*args)
+
+    def _on_scroll(self, side, first, last):
+        self.scrollbars[side].set(first, last)
+        if side == self.driver:
+            text, other = self.panes[side], self.panes[1 - side]
+            line = self.matching_line(side, _line(text.index("@0,0")) - 1)
+            if _line(other.index("@0,0")) - 1 != line:
+                other.yview(f"{line + 1}.0")
+        self.scheduler.trigger("tag")
+
+    def _on_xscroll(self, side, first, last):
+        if side == self.driver:
+            self.panes[1 - side].xview_moveto(first)
+
+    # The line on the other side that goes with `line` (0-based) on `side`
+    def matching_line(self, side, line):
+        number = bisect.bisect_right(self.starts[side], line) - 1
+        if number < 0:
+            return line     # above the first difference
+        hunk = self.hunks[number]
+        start, end = hunk[2 * side], hunk[2 * side + 1]
+        other_start, other_end = hunk[2 - 2 * side], hunk[3 - 2 * side]
+        if line < end:
+            # Inside a changed block: the same way down the other block
+            return other_start + (line - start) * (other_end - other_start) // (end - start)
+        return other_end + (line - end)
+
+    # --- Next / Previous difference ---
+    def jump(self, step):
+        side = self.driver
+        text = self.panes[side]
+        starts = self.starts[side]
+        line = _line(text.index("@0,0")) - 1 + CONTEXT_LINES
+        if step > 0:
+            number = bisect.bisect_right(starts, line)
+        else:
+            number = bisect.bisect_left(starts, line) - 1
+        if 0 <= number < len(self.hunks):
+            text.yview(f"{max(0, starts[number] - CONTEXT_LINES) + 1}.0")
+        return "break"
+
+
+# A small list to pick one of `choices` (e.g. which tab to compare with);
+# on_pick is called with the position of the one picked
+def ask_choice(root, title, choices, on_pick):
+    box = tk.Toplevel(root)
+    box.title(title)
+    box.geometry("360x260")
+    box.transient(root)
+    choice_list = tk.Listbox(box, activestyle="none", exportselection=False)
+    choice_list.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
+    choice_list.insert(tk.END, *choices)
+    choice_list.selection_set(0)
+
+    def pick(event=None):
+        selection = choice_list.curselection()
+        if selection:
+            box.destroy()
+            on_pick(selection[0])
+
+    choice_list.bind("<Double-Button-1>", pick)
+    choice_list.bind("<Return>", pick)
+    box.bind("<Escape>", lambda e: box.destroy())
+    tk.Button(box, text="Compare", command=pick).pack(pady=5)
+    choice_list.focus_set()
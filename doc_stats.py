@@ -0,0 +1,105 @@
+# --- INCREMENTAL DOCUMENT STATISTICS ---
+# The status bar used to copy the whole document into Python and split it
+# into a list of words on every key release, just to show two numbers.
+#
+# DocumentStats counts everything once, then keeps the numbers up to date
+# from the insert/delete events reported by text_hooks.py. Only the edited
+# text and the single character on each side of it are looked at:
+#
+#   words after  = words in (before + inserted + after)
+#   words before = words in (before + after)
+#
+# Words further away are counted the same both times, so the difference is
+# the change in the total word count.
+#
+# The text itself is read from the document's TextBuffer (text_buffer.py),
+# not from the Tk widget.
+
+
+def _count_words(text):
+    return len(text.split())
+
+
+# Count words in a stream of chunks without joining them together
+def count_words_in_chunks(chunks):
+    words = 0
+    ends_in_word = False
+    for chunk in chunks:
+        if not chunk:
+            continue
+        words += _count_words(chunk)
+        # A word cut in half by the chunk boundary was counted twice
+        if ends_in_word and not chunk[0].isspace():
+            words -= 1
+        ends_in_word = not chunk[-1].isspace()
+    return words
+
+
+class DocumentStats:
+    def __init__(self, text_widget, hooks, buffer):
+        self.text = text_widget
+        self.buffer = buffer
+        self.chars = 0
+        self.words = 0
+        self.lines = 1
+        self.version = 0            # bumped on every edit
+        self._selection_cache = None
+        self.recount()
+        hooks.add_edit_listener(self.on_edit)
+
+    # Full count, only needed once (and after edits we can't follow)
+    def recount(self):
+        self.chars = len(self.buffer)
+        self.words = count_words_in_chunks(self.buffer.iter_chunks())
+        self.lines = self.buffer.line_count
+        self.version += 1
+
+    def _char_before(self, offset):
+        return self.buffer.get_text(offset - 1, offset) if offset > 0 else ""
+
+    def _char_at(self, offset):
+        # Past the end counts as the final newline Tk always keeps
+        return self.buffer.get_text(offset, offset + 1) or "\n"
+
+    def on_edit(self, event):
+        self.version += 1
+        if event.kind == "reset":
+            self.recount()
+            return
+
+        # The text around the edit, as it is NOW (after the edit)
+        before = self._char_before(event.offset)
+        if event.kind == "insert":
+            after = self._char_at(event.offset + len(event.text))
+            self.chars += len(event.text)
+            self.lines += event.text.count("\n")
+            self.words += _count_words(before + event.text + after) - _count_words(before + after)
+        else:
+            after = self._char_at(event.offset)
+            self.chars -= len(event.text)
+            self.lines -= event.text.count("\n")
+            self.words += _count_words(before + after) - _count_words(before + event.text + after)
+
+    # --- Selection statistics ---
+    # Returns (words, chars) for the current selection, or None if nothing
+    # is selected. The buffer is read in chunks, so a huge selection is
+    # never copied at once.
+    def selection_stats(self):
+        ranges = self.text.tag_ranges("sel")
+        if not ranges:
+            return None
+        first, last = self.text.index(ranges[0]), self.text.index(ranges[-1])
+
+        # Same selection on the same text as last time -> reuse the answer
+        key = (first, last, self.version)
+        if self._selection_cache and self._selection_cache[0] == key:
+            return self._selection_cache[1]
+
+        if first == "1.0" and self.text.compare(last, ">=", "end-1c"):
+            result = (self.words, self.chars)       # Select All
+        else:
+            start = self.buffer.index_to_offset(first)
+            end = self.buffer.index_to_offset(last)
+            result = (count_words_in_chunks(self.buffer.iter_chunks(start, end)), end - start)
+        self._selection_cache = (key, result)
+        return result
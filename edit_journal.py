@@ -0,0 +1,297 @@
+import json
+import os
+import queue
+import shutil
+import threading
+import uuid
+
+from file_io import atomic_write
+from session import compress_chunks, iter_compressed_text
+from text_buffer import TextBuffer
+
+# --- EDIT JOURNAL (CRASH RECOVERY) ---
+# A crash used to lose every unsaved change, and saving the whole document
+# every few seconds would cost as much as the document is big.
+#
+# Instead every open document gets a small write-ahead journal: each insert
+# or delete (reported by text_hooks.py) is appended to a log file as one
+# line, and a single writer thread fsyncs the logs in batches a few times a
+# second. So the disk work follows the typing, not the document size.
+#
+# The journal starts from a "base": the file on disk if the document is
+# unchanged from it, otherwise a compressed snapshot. When a log grows
+# bigger than the document, it is folded into a new snapshot and a new log
+# is started, so replaying never takes longer than reading the text twice.
+#
+# Files in ~/.cache/text-editor/journal-<app>/<id>/:
+#   meta.json        title, path, owning pid and the current generation/base
+#   snapshot-N.z     base text of generation N (when it isn't the file)
+#   log-N            the edits since that base, one JSON list per line
+#
+# meta.json is rewritten last, so after a crash it always points at a
+# complete base; a torn last log line is simply ignored.
+#
+#   journal = EditJournal(text, hooks, buffer, "advanced")
+#   journal.start(title, path, clean=True)      # after loading / saving
+#   ...
+#   for folder in find_orphans("advanced"): recover(folder)
+
+FSYNC_INTERVAL = 0.3                # seconds between batched fsyncs
+COMPACT_MIN_BYTES = 1024 * 1024     # logs smaller than this are never compacted
+
+
+def journal_root(app):
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache, "text-editor", f"journal-{app}")
+
+
+class EditJournal:
+    def __init__(self, text_widget, hooks, buffer, app):
+        self.text = text_widget
+        self.buffer = buffer
+        self.folder = os.path.join(journal_root(app), uuid.uuid4().hex)
+        self.active = False         # edits are only logged between start() and stop()
+        self.title = "Untitled"
+        self.path = None
+        self._base = None           # (path or None, snapshot) not written yet
+        self._written = False       # something is on disk for this journal
+        self._log_bytes = 0
+        hooks.add_edit_listener(self.on_edit)
+        text_widget.bind("<Destroy>", self._on_destroy, add="+")
+
+    # Begin a new base: the file at `path` if the text is unchanged from it
+    # (`clean`), otherwise the text as it is now.
+    #   - clean: nothing is written until the first edit, so documents that
+    #     are only read cost no disk work. What the journal held before (the
+    #     edits up to a save) is dropped, or a crash right after saving would
+    #     offer to "recover" the text that was just saved
+    #   - not clean (recovered or restored unsaved text): the base is written
+    #     right away, so the text survives a crash even if nothing is typed
+    def start(self, title, path=None, clean=True):
+        self.title = title
+        self.path = path
+        self._log_bytes = 0
+        self.active = True
+        if clean:
+            self._base = (path, self.buffer.snapshot())
+            if self._written:
+                self._written = False
+                _writer.put(self, "discard")
+        else:
+            self._base = None
+            self._written = True
+            _writer.put(self, "base", (title, path, None, self.buffer.snapshot()))
+
+    # Loading: the inserts aren't edits, start() again once they're done
+    def stop(self):
+        self.active = False
+
+    # The widget is gone (tab closed, or quitting after the session was saved)
+    def _on_destroy(self, event):
+        if event.widget is self.text:
+            self.discard()
+
+    def discard(self):
+        self.active = False
+        self._written = False
+        _writer.put(self, "discard")
+
+    # --- Follow edits ---
+    def on_edit(self, event):
+        if not self.active:
+            return
+        if event.kind == "reset":
+            # An edit we couldn't follow: the text as it is now is the new base
+            self.start(self.title, self.path, clean=False)
+            return
+        if self._base is not None:
+            base_path, snapshot = self._base
+            self._base = None
+            self._written = True
+            _writer.put(self, "base", (self.title, self.path, base_path, snapshot))
+        if event.kind == "insert":
+            record = json.dumps(["i", event.offset, event.text], ensure_ascii=False)
+        else:
+            record = json.dumps(["d", event.offset, event.offset + len(event.text)])
+        _writer.put(self, "edit", record)
+        self._log_bytes += len(record) + 1
+        # Fold the log into a snapshot once it outgrows the document, so the
+        # snapshot writes never add up to more than the log writes
+        if self._log_bytes > max(COMPACT_MIN_BYTES, len(self.buffer)):
+            self._log_bytes = 0
+            _writer.put(self, "base", (self.title, self.path, None, self.buffer.snapshot()))
+
+
+# --- The writer thread ---
+# One thread for all journals: it writes what has queued up, fsyncs every
+# log it touched, then waits a moment so the next batch can build up.
+class _JournalWriter:
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.flush_now = threading.Event()
+        self.thread = None
+        self.files = {}         # journal -> open log file
+        self.generations = {}   # journal -> current generation
+
+    def put(self, journal, op, data=None):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        self.queue.put((journal, op, data))
+
+    # Block until everything queued is on disk (used when quitting)
+    def drain(self):
+        if self.thread is not None:
+            self.flush_now.set()
+            self.queue.join()
+
+    def _run(self):
+        while True:
+            items = [self.queue.get()]
+            while True:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            touched = set()
+            for journal, op, data in items:
+                try:
+                    self._apply(journal, op, data, touched)
+                except OSError:
+                    pass        # a journal we can't write is only a lost safety net
+            for file in touched:
+                try:
+                    file.flush()
+                    os.fsync(file.fileno())
+                except (OSError, ValueError):
+                    pass
+            for _ in items:
+                self.queue.task_done()
+            self.flush_now.wait(FSYNC_INTERVAL)
+
+    def _apply(self, journal, op, data, touched):
+        if op == "edit":
+            file = self.files.get(journal)
+            if file is not None:
+                file.write(data + "\n")
+                touched.add(file)
+        elif op == "base":
+            self._new_base(journal, *data)
+        elif op == "discard":
+            file = self.files.pop(journal, None)
+            if file is not None:
+                file.close()
+            if self.generations.pop(journal, None) is not None:
+                shutil.rmtree(journal.folder, ignore_errors=True)
+
+    def _new_base(self, journal, title, path, base_path, snapshot):
+        folder = journal.folder
+        old = self.generations.get(journal)
+        generation = 0 if old is None else old + 1
+        os.makedirs(folder, exist_ok=True)
+        meta = {"title": title, "path": path, "pid": os.getpid(),
+                "generation": generation, "base": "file" if base_path else "snapshot"}
+        if base_path:
+            info = os.stat(base_path)
+            meta["mtime"], meta["size"] = info.st_mtime_ns, info.st_size
+        else:
+            atomic_write(os.path.join(folder, f"snapshot-{generation}.z"),
+                         compress_chunks(snapshot.iter_chunks()), binary=True)
+        file = open(os.path.join(folder, f"log-{generation}"), "w", encoding="utf-8")
+        # The switch to the new generation happens here
+        atomic_write(os.path.join(folder, "meta.json"), [json.dumps(meta)])
+        old_file = self.files.pop(journal, None)
+        if old_file is not None:
+            old_file.close()
+        self.files[journal] = file
+        self.generations[journal] = generation
+        if old is not None:
+            for name in (f"snapshot-{old}.z", f"log-{old}"):
+                try:
+                    os.remove(os.path.join(folder, name))
+                except OSError:
+                    pass
+
+
+_writer = _JournalWriter()
+
+
+def flush_journals():
+    _writer.drain()
+
+
+# --- Recovery on the next start ---
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True     # exists, but belongs to someone else
+    return True
+
+
+def _read_meta(folder):
+    try:
+        with open(os.path.join(folder, "meta.json"), encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+# Journals left behind by an editor that didn't quit normally, newest first
+def find_orphans(app):
+    root = journal_root(app)
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return []
+    found = []
+    for name in names:
+        folder = os.path.join(root, name)
+        meta = _read_meta(folder)
+        if meta is None:
+            shutil.rmtree(folder, ignore_errors=True)    # died before the first base
+        elif not _process_alive(meta["pid"]):
+            found.append((os.path.getmtime(folder), folder))
+    return [folder for _, folder in sorted(found, reverse=True)]
+
+
+# Replays a journal: (title, path, text), or None if there is nothing to
+# recover (no edits, or the file it was based on has changed since)
+def recover(folder):
+    meta = _read_meta(folder)
+    if meta is None:
+        return None
+    generation = meta["generation"]
+    try:
+        if meta["base"] == "file":
+            info = os.stat(meta["path"])
+            if (info.st_mtime_ns, info.st_size) != (meta["mtime"], meta["size"]):
+                return None
+            with open(meta["path"], encoding="utf-8", errors="replace") as file:
+                buffer = TextBuffer(file.read())
+        else:
+            snapshot = os.path.join(folder, f"snapshot-{generation}.z")
+            buffer = TextBuffer("".join(text for text, _ in iter_compressed_text(snapshot)))
+        edits = 0
+        with open(os.path.join(folder, f"log-{generation}"), encoding="utf-8") as log:
+            for line in log:
+                try:
+                    kind, first, second = json.loads(line)
+                except ValueError:
+                    break       # the line being written when it crashed
+                if kind == "i":
+                    buffer.insert(first, second)
+                else:
+                    buffer.delete(first, second)
+                edits += 1
+    except (OSError, ValueError, KeyError):
+        return None
+    if meta["base"] == "file" and edits == 0:
+        return None
+    return meta["title"], meta["path"], buffer.get_text()
+
+
+def discard_journal(folder):
+    shutil.rmtree(folder, ignore_errors=True)
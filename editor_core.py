@@ -0,0 +1,181 @@
+import tkinter as tk
+
+from doc_stats import DocumentStats
+from highlighter import SyntaxHighlighter
+from lexers import lexer_for_path
+from line_gutter import LineGutter
+from scheduler import EventScheduler
+from style_runs import StyleRuns
+from text_buffer import attach_buffer
+from text_hooks import get_hooks
+from undo_manager import UndoManager, format_bytes
+
+# --- EDITOR CORE ---
+# Everything a document needs, shared by SimpleTextEditor.py (one document)
+# and Advanced_TextEditor.py (one per tab), and by the benchmarks:
+#
+#   text = create_text_widget(frame, "advanced", on_status=update_status)
+#   text.buffer, text.scheduler, text.highlighter, text.stats,
+#   text.undo_manager, text.styles, text.journal, text.gutter, text.outline
+#   engine = get_search_engine(text)        # made on the first Find
+#   apply_theme(text, dark=True)
+#   use_lexer_for(text, "query.sql")         # after opening / saving a file
+#   status_text.set(status_message(text))
+#
+# Importing this module (or the editors) builds no window: the editors do
+# that in main(). Things only some sessions use (Find & Replace, Find in
+# Files, the Performance panel, file dialogs) are imported when first used,
+# and so are the journal and the outline (json, uuid, zlib, ast): with the
+# first text widget, not with the editor.
+
+EDITOR_FONT = ("Helvetica", 18)
+
+# Theme configurations
+dark_theme = {
+    "bg": "#1e1e1e",        # Background: dark gray
+    "fg": "#d4d4d4",        # Foreground (text): light gray
+    "cursor": "#ffffff",    # Cursor: white
+    "select_bg": "#264f78"  # Selection background: blue
+}
+light_theme = {
+    "bg": "#ffffff",        # Background: white
+    "fg": "#000000",        # Foreground: black
+    "cursor": "#000000",    # Cursor: black
+    "select_bg": "#0078d7"  # Selection: blue
+}
+
+
+def theme_colors(dark):
+    return dark_theme if dark else light_theme
+
+
+# Colors of the text widget, and of its highlighting if it has any
+def apply_theme(text_widget, dark):
+    theme = theme_colors(dark)
+    text_widget.config(
+        bg=theme["bg"],
+        fg=theme["fg"],
+        insertbackground=theme["cursor"],       # Cursor color
+        selectbackground=theme["select_bg"]     # Selection color
+    )
+    highlighter = getattr(text_widget, "highlighter", None)
+    if highlighter:
+        highlighter.configure_colors(dark)
+    gutter = getattr(text_widget, "gutter", None)
+    if gutter:
+        gutter.configure_colors(dark)
+
+
+# --- A TEXT WIDGET WITH ITS HELPERS ---
+# `app` names the crash-recovery journal folder (None: no journal).
+# `on_status` refreshes the status bar; it runs about once per frame (but at
+# least every 50 ms while keys are held down), highlighting after ~100 ms
+# of quiet. If `buffer` is given the widget is filled from it, as when a
+# parked tab comes back. `path` picks the highlighting language.
+def create_text_widget(parent, app=None, on_status=None, buffer=None, path=None, **options):
+    text_widget = tk.Text(
+        parent,
+        wrap=tk.WORD,
+        font=EDITOR_FONT,
+        undo=False,         # undo is handled by the UndoManager
+        **options
+    )
+    text_widget.pack(expand=True, fill=tk.BOTH)
+    if buffer is not None:
+        # Filled before the hooks go in, so this isn't seen as an edit
+        for chunk in buffer.iter_chunks():
+            text_widget.insert("end-1c", chunk)
+
+    # Track edits line by line so highlighting only redoes what changed
+    hooks = get_hooks(text_widget)
+    # The document lives in a TextBuffer, the widget is a view of it.
+    # Attached first because the listeners below read from it
+    text_widget.buffer = attach_buffer(text_widget, hooks, buffer)
+    # Key bursts collapse into one status update / one highlighting pass
+    text_widget.scheduler = EventScheduler(text_widget)
+    if on_status:
+        text_widget.scheduler.register("status", on_status, delay_ms=16, priority=10, max_wait_ms=50)
+    text_widget.highlighter = SyntaxHighlighter(text_widget, hooks, text_widget.buffer, text_widget.scheduler,
+                                                lexer_for_path(path))
+    # Word/char/line counts kept up to date from each edit
+    text_widget.stats = DocumentStats(text_widget, hooks, text_widget.buffer)
+    # Undo/redo history of small deltas, with a memory budget (undo_manager.py)
+    text_widget.undo_manager = UndoManager(text_widget, hooks, text_widget.buffer)
+    # Find & Replace matches (search.py); made on the first Find, so documents
+    # nobody searches don't pay for following every edit
+    text_widget.search_engine = None
+    # Font sizes as non-overlapping runs (see style_runs.py)
+    text_widget.styles = StyleRuns(text_widget, hooks, text_widget.buffer)
+    # Crash-recovery journal of every edit (see edit_journal.py), started
+    # by the editor once it knows the document's name
+    text_widget.journal = None
+    if app:
+        from edit_journal import EditJournal
+        text_widget.journal = EditJournal(text_widget, hooks, text_widget.buffer, app)
+    # Line numbers for the lines on screen only (see line_gutter.py)
+    text_widget.gutter = LineGutter(text_widget, hooks, text_widget.buffer, text_widget.scheduler, EDITOR_FONT)
+    # Classes and functions of Python documents, parsed in the background
+    # after typing stops (see outline.py)
+    from outline import OutlineIndex
+    text_widget.outline = OutlineIndex(text_widget, hooks, text_widget.buffer, text_widget.scheduler, path)
+
+    if on_status:
+        text_widget.bind("<KeyRelease>", lambda e: text_widget.scheduler.trigger("status", "highlight"))
+        text_widget.bind("<ButtonRelease-1>", lambda e: text_widget.scheduler.trigger("status"))
+        # Refresh selection counts when the selection changes (mouse or keyboard)
+        text_widget.bind("<<Selection>>", lambda e: text_widget.scheduler.trigger("status"))
+    else:
+        text_widget.bind("<KeyRelease>", lambda e: text_widget.scheduler.trigger("highlight"))
+    return text_widget
+
+
+# The file name decides the highlighting language (see lexers.py), and
+# whether the document has an outline; the lexer module is loaded with the
+# first file of its type
+def use_lexer_for(text_widget, path):
+    highlighter = getattr(text_widget, "highlighter", None)
+    if highlighter:
+        highlighter.set_lexer(lexer_for_path(path))
+    outline = getattr(text_widget, "outline", None)
+    if outline:
+        outline.set_path(path)
+
+
+def get_search_engine(text_widget):
+    if text_widget.search_engine is None:
+        from search import SearchEngine
+        text_widget.search_engine = SearchEngine(text_widget, text_widget.hooks, text_widget.buffer,
+                                                 text_widget.scheduler, text_widget.undo_manager)
+    return text_widget.search_engine
+
+
+# True while Replace All is still working through the document
+def is_replacing(text_widget):
+    engine = getattr(text_widget, "search_engine", None)
+    return engine is not None and engine.replacing
+
+
+# What is working through the document right now, or None. Replace All and
+# a reload (file_watch.py) both go in batches and keep the widget DISABLED
+# in between, so anything else that edits it then (New, Open, Undo...)
+# would be silently dropped by Tk
+def busy_with(text_widget):
+    if is_replacing(text_widget):
+        return "Replace All"
+    if getattr(text_widget, "reloader", None):
+        return "Reload"
+    return None
+
+
+# The status bar line for a document: cursor, counts, selection and the
+# memory the undo history uses
+def status_message(text_widget):
+    line, column = text_widget.index(tk.INSERT).split(".")
+    # Counts are maintained by doc_stats.py, no need to copy the document
+    stats = text_widget.stats
+    status = f"Line: {line} | Column: {column} | Words: {stats.words} | Chars: {stats.chars}"
+    selection = stats.selection_stats()
+    if selection:
+        status += f" | Selected: {selection[0]} words, {selection[1]} chars"
+    status += f" | Undo: {format_bytes(text_widget.undo_manager.memory_use())}"
+    return status
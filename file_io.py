@@ -0,0 +1,248 @@
+import codecs
+import io
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import tkinter as tk
+
+# --- BACKGROUND FILE LOADING ---
+# Opening a file used to read, decode and insert the whole thing in one go,
+# freezing the window until it was done. Now a worker thread reads and
+# decodes the file in chunks and hands them to the Tk thread through a queue.
+# The Tk thread inserts a bounded slice per tick, so the window stays
+# responsive and the first screenful shows up right away.
+#
+#   loader = TextLoader(text, iter_file_text(path), on_progress, on_done)
+#   loader.start()
+#   ...
+#   loader.cancel()     # e.g. when the user presses Escape
+#
+# --- BACKGROUND, ATOMIC SAVING ---
+# Saving works the other way round: a worker thread writes chunks of a
+# buffer snapshot to a temporary file next to the target, fsyncs it and
+# renames it over the target. A crash or a full disk half way through leaves
+# the original file untouched, and a slow disk never blocks the window.
+#
+#   saver = FileSaver(text, path, buffer.snapshot().iter_chunks(), on_done)
+#   saver.start()
+
+FIRST_READ = 16 * 1024          # small first read so something shows quickly
+MAX_READ = 1024 * 1024          # later reads grow up to this size
+INSERT_SLICE = 64 * 1024        # characters inserted into the widget at once
+TICK_BUDGET_MS = 12             # time spent inserting per tick
+TICK_MS = 1
+QUEUE_CHUNKS = 16               # decoded chunks waiting for the Tk thread
+SAVE_POLL_MS = 50               # how often the Tk thread checks on a save
+
+# The umask can only be read by setting it; done once here, before any
+# worker thread could create a file in between
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+# Yields (text, percent) for a file, decoded and with newlines translated
+# like open(path, "r") would do. Bytes that aren't valid `encoding` raise
+# UnicodeError: turning them into "\ufffd" would write the replacement
+# characters over the real ones on the next save
+def iter_file_text(path, encoding="utf-8"):
+    size = os.path.getsize(path) or 1
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(), translate=True)
+    read_size = FIRST_READ
+    done = 0
+    with open(path, "rb") as file:
+        while True:
+            data = file.read(read_size)
+            done += len(data)
+            try:
+                text = decoder.decode(data, final=not data)
+            except UnicodeDecodeError as error:
+                raise UnicodeError(f"This is not {encoding} text ({error.reason} near byte "
+                                   f"{done - len(data) + max(0, error.start)}).") from error
+            if text:
+                yield text, min(100, done * 100 // size)
+            if not data:
+                return
+            read_size = min(MAX_READ, read_size * 2)
+
+
+# Yields (text, percent) for a string that is already in memory
+def iter_string_text(content):
+    size = len(content) or 1
+    for start in range(0, len(content), INSERT_SLICE):
+        yield content[start:start + INSERT_SLICE], min(100, (start + INSERT_SLICE) * 100 // size)
+
+
+class TextLoader:
+    _DONE = object()
+
+    def __init__(self, text_widget, chunks, on_progress=None, on_done=None, in_thread=True):
+        self.text = text_widget
+        self.chunks = chunks
+        self.on_progress = on_progress  # called with 0..100
+        self.on_done = on_done          # called with (cancelled, error)
+        self.in_thread = in_thread      # False for in-memory strings
+        self.queue = queue.Queue(maxsize=QUEUE_CHUNKS)
+        self.cancelled = threading.Event()
+        self.error = None
+        self.active = False
+        self._pending = ""
+        self._percent = -1
+        self._job = None
+
+    def start(self):
+        self.active = True
+        # Loading isn't an edit the user should be able to undo, and typing
+        # in the middle of it would interleave with the inserts
+        self._undo = self.text.cget("undo")
+        self.text.config(undo=False, state=tk.DISABLED)
+        if self.in_thread:
+            threading.Thread(target=self._read, daemon=True).start()
+        self._job = self.text.after(TICK_MS, self._pump)
+
+    def cancel(self):
+        if self.active:
+            self.cancelled.set()
+            self._finish()
+
+    # --- Worker thread: read + decode ---
+    def _read(self):
+        try:
+            for item in self.chunks:
+                while not self.cancelled.is_set():
+                    try:
+                        self.queue.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+                if self.cancelled.is_set():
+                    return
+        except (OSError, UnicodeError) as error:
+            self.error = error
+        self.queue.put(self._DONE)
+
+    def _next_chunk(self):
+        if not self.in_thread:
+            return next(self.chunks, self._DONE)
+        return self.queue.get_nowait()
+
+    # --- Tk thread: insert a few slices per tick ---
+    def _pump(self):
+        self._job = None
+        if not self.active:
+            return
+        if not self.text.winfo_exists():
+            self.cancelled.set()     # Tab closed while loading
+            self.active = False
+            return
+
+        deadline = time.monotonic() + TICK_BUDGET_MS / 1000
+        self.text.config(state=tk.NORMAL)
+        try:
+            while time.monotonic() < deadline:
+                if not self._pending:
+                    try:
+                        item = self._next_chunk()
+                    except queue.Empty:
+                        break
+                    if item is self._DONE:
+                        self._finish()
+                        return
+                    self._pending, percent = item
+                    if percent != self._percent and self.on_progress:
+                        self._percent = percent
+                        self.on_progress(percent)
+                piece = self._pending[:INSERT_SLICE]
+                self._pending = self._pending[INSERT_SLICE:]
+                self.text.insert("end-1c", piece)
+        finally:
+            if self.active:
+                self.text.config(state=tk.DISABLED)
+        self._job = self.text.after(TICK_MS, self._pump)
+
+    def _finish(self):
+        self.active = False
+        if self._job is not None:
+            self.text.after_cancel(self._job)
+            self._job = None
+        self.text.config(state=tk.NORMAL, undo=self._undo)
+        self.text.edit_reset()
+        self.text.edit_modified(False)
+        if self.on_done:
+            self.on_done(self.cancelled.is_set(), self.error)
+
+
+# Write `chunks` (str, or bytes with binary=True) to `path` atomically:
+# temp file in the same folder -> flush + fsync -> rename over the target
+def atomic_write(path, chunks, encoding="utf-8", binary=False):
+    # Through a symlink the file it points to is saved; renaming over the
+    # link itself would turn it into a copy and leave the real file as it was
+    path = os.path.realpath(path)
+    folder = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix="." + os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        if binary:
+            file = os.fdopen(fd, "wb")
+        else:
+            file = os.fdopen(fd, "w", encoding=encoding)
+        with file:
+            for chunk in chunks:
+                file.write(chunk)
+            file.flush()
+            os.fsync(file.fileno())
+        # Keep the permissions of the file we are replacing. mkstemp makes
+        # the temp file private (0600): a new file gets the usual ones
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        else:
+            os.chmod(temp_path, 0o666 & ~_UMASK)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    # Make the rename itself durable (not possible on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class FileSaver:
+    def __init__(self, widget, path, chunks, on_done=None, encoding="utf-8", binary=False):
+        self.widget = widget        # only used for after() polling
+        self.path = path
+        self.chunks = chunks        # iterate a SNAPSHOT, the user keeps typing
+        self.on_done = on_done      # called with the error, or None on success
+        self.encoding = encoding
+        self.binary = binary
+        self.error = None
+        self.active = False
+        self._thread = None
+
+    def start(self):
+        self.active = True
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+        self.widget.after(SAVE_POLL_MS, self._poll)
+
+    def _write(self):
+        try:
+            atomic_write(self.path, self.chunks, self.encoding, self.binary)
+        except (OSError, UnicodeError, ValueError) as error:
+            # ValueError: a memory-mapped source was closed under us
+            self.error = error
+
+    def _poll(self):
+        if self._thread.is_alive():
+            self.widget.after(SAVE_POLL_MS, self._poll)
+            return
+        self.active = False
+        if self.on_done:
+            self.on_done(self.error)
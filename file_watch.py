@@ -0,0 +1,460 @@
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import threading
+import time
+import tkinter as tk
+
+from file_io import INSERT_SLICE, iter_file_text
+
+# --- WATCHING OPEN FILES FOR CHANGES BY OTHER PROGRAMS ---
+# If another program rewrote a file while it was open, saving used to write
+# over its changes without a word. One FileWatcher per window now keeps an
+# eye on the files of all open documents:
+#
+#   - on Linux the folders holding them are watched with inotify (called
+#     through ctypes). The kernel tells us when something in them changes,
+#     so nothing runs while nothing happens, however many tabs are open
+#   - files on network drives (inotify doesn't see changes made by other
+#     machines), and every file on other systems, are checked with os.stat
+#     in "sweeps": all of them in one go, on a worker thread, so a slow
+#     network drive never blocks the window. A sweep that finds nothing
+#     waits twice as long before the next one (1 s, 2 s, 4 s ... 30 s);
+#     a change, or check_now() (the window or a tab was activated), goes
+#     back to checking every second
+#
+# A file counts as changed when its (mtime, size, inode) signature differs
+# from the one recorded when the document was opened, saved or reloaded.
+# Our own saves are not reported: pause() before the save, update() after.
+#
+#   watcher = FileWatcher(root, on_change=file_changed)   # file_changed(key, path)
+#   watcher.watch(doc, path)        # any hashable key, e.g. the document
+#   watcher.changed(doc)            # before saving: changed since opened?
+#   watcher.forget(doc)             # tab closed
+#
+# --- RELOADING ---
+# FileReload reads the new version on a worker thread and works out which
+# lines changed (common start and end, then a line diff on the lines between,
+# see diff_engine.py).
+# Only those lines are replaced, a slice at a time between events, so the
+# cursor and scroll position stay where they were wherever the text didn't
+# change, and the reload is a single step on top of the undo history.
+
+SETTLE_MS = 200             # wait for a writer to finish before looking
+SWEEP_MIN_MS = 1000         # stat sweeps: fastest rate...
+SWEEP_MAX_MS = 30000        # ...and slowest, after a long quiet spell
+POLL_MS = 50                # checking on worker threads
+MAX_DIFF_LINES = 100000     # bigger changes are replaced as one block
+RELOAD_BATCH = 200          # changed regions applied per step
+
+# inotify (see "man 7 inotify")
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")    # wd, mask, cookie, name length
+
+# statfs() f_type of network file systems, where inotify misses changes
+# made on other machines
+REMOTE_FILESYSTEMS = {
+    0x6969,         # NFS
+    0x517B,         # SMB
+    0xFF534D42,     # CIFS
+    0xFE534D42,     # SMB2
+    0x65735546,     # FUSE (sshfs, ...)
+    0x5346414F,     # AFS
+}
+
+
+# (mtime, size, inode) of a file, or None if it doesn't exist (any more)
+def file_signature(path):
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return (info.st_mtime_ns, info.st_size, info.st_ino)
+
+
+# --- inotify through ctypes (Linux only) ---
+class _Inotify:
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._remove = libc.inotify_rm_watch
+        self._remove.argtypes = (ctypes.c_int, ctypes.c_int)
+        self._statfs = libc.statfs
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    # Watch descriptor of `folder`, or None if it can't be watched
+    def add(self, folder):
+        wd = self._add(self.fd, os.fsencode(folder), WATCH_MASK)
+        return wd if wd >= 0 else None
+
+    def remove(self, wd):
+        self._remove(self.fd, wd)
+
+    def is_remote(self, folder):
+        buffer = ctypes.create_string_buffer(256)   # struct statfs, f_type first
+        if self._statfs(os.fsencode(folder), buffer) != 0:
+            return False
+        return ctypes.c_long.from_buffer(buffer).value & 0xFFFFFFFF in REMOTE_FILESYSTEMS
+
+    # [(wd, mask, file name), ...] of the events waiting to be read
+    def read(self):
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = os.fsdecode(data[pos:pos + length].rstrip(b"\0"))
+            pos += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _Watched:
+    __slots__ = ("path", "signature", "seen", "paused", "swept")
+
+    def __init__(self, path, signature):
+        self.path = path
+        self.signature = signature  # what the document was loaded / saved from
+        self.seen = signature       # the last version we told the editor about
+        self.paused = False         # our own save is writing the file
+        self.swept = False          # checked by stat sweeps, not inotify
+
+
+class FileWatcher:
+    def __init__(self, widget, on_change):
+        self.widget = widget
+        self.on_change = on_change  # called with (key, path) on the Tk thread
+        self.files = {}             # key -> _Watched
+        self.folders = {}           # folder -> [watch descriptor, number of files]
+        self.by_wd = {}             # watch descriptor -> folder
+        self.sweep_ms = SWEEP_MIN_MS
+        self._dirty = set()         # folders inotify reported, not checked yet
+        self._settle_job = None
+        self._sweep_job = None
+        self._sweep_thread = None
+        self._last_sweep = 0
+        self.inotify = None
+        if sys.platform.startswith("linux"):
+            try:
+                self.inotify = _Inotify()
+                widget.tk.createfilehandler(self.inotify.fd, tk.READABLE, self._on_inotify)
+            except (OSError, AttributeError, tk.TclError):
+                self.inotify = None     # fall back to stat sweeps
+
+    # --- Documents ---
+    def watch(self, key, path, signature=None):
+        self.forget(key)
+        path = os.path.abspath(path)
+        watched = self.files[key] = _Watched(path, signature or file_signature(path))
+        folder = os.path.dirname(path)
+        if self.inotify and not self.inotify.is_remote(folder):
+            entry = self.folders.get(folder)
+            if entry is None:
+                wd = self.inotify.add(folder)
+                if wd is not None:
+                    entry = self.folders[folder] = [wd, 0]
+                    self.by_wd[wd] = folder
+            if entry is not None:
+                entry[1] += 1
+                return
+        watched.swept = True
+        self._schedule_sweep()
+
+    def forget(self, key):
+        watched = self.files.pop(key, None)
+        if watched is None or watched.swept:
+            return
+        folder = os.path.dirname(watched.path)
+        entry = self.folders[folder]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self.folders[folder]
+            del self.by_wd[entry[0]]
+            self.inotify.remove(entry[0])
+
+    # Around our own saves
+    def pause(self, key):
+        if key in self.files:
+            self.files[key].paused = True
+
+    def resume(self, key):
+        if key in self.files:
+            self.files[key].paused = False
+
+    # The document now matches the file (saved, reloaded, saved under a new name)
+    def update(self, key, path=None, signature=None):
+        watched = self.files.get(key)
+        if path is not None and (watched is None or os.path.abspath(path) != watched.path):
+            self.watch(key, path, signature)
+        elif watched is not None:
+            watched.signature = watched.seen = signature or file_signature(watched.path)
+            watched.paused = False
+
+    # Has the file changed since the document was loaded or saved?
+    def changed(self, key):
+        watched = self.files.get(key)
+        return watched is not None and file_signature(watched.path) != watched.signature
+
+    def _check(self, key, watched, signature):
+        if watched.paused or signature == watched.seen:
+            return False
+        watched.seen = signature
+        self.on_change(key, watched.path)
+        return True
+
+    # --- inotify: the kernel says something in a folder changed ---
+    def _on_inotify(self, fd, mask):
+        for wd, event_mask, name in self.inotify.read():
+            if event_mask & IN_Q_OVERFLOW:
+                self._dirty.update(self.folders)    # events were lost
+            elif not event_mask & IN_IGNORED and wd in self.by_wd:
+                self._dirty.add(self.by_wd[wd])
+        # A program writing a file makes many events, look once it's done
+        if self._dirty and self._settle_job is None:
+            self._settle_job = self.widget.after(SETTLE_MS, self._check_dirty)
+
+    def _check_dirty(self):
+        self._settle_job = None
+        folders, self._dirty = self._dirty, set()
+        for key, watched in list(self.files.items()):
+            if not watched.swept and os.path.dirname(watched.path) in folders:
+                self._check(key, watched, file_signature(watched.path))
+
+    # --- stat sweeps, with backoff ---
+    # Called often (every time the window gets the focus), so at most one
+    # sweep a second
+    def check_now(self):
+        if time.monotonic() - self._last_sweep < SWEEP_MIN_MS / 1000:
+            return
+        self.sweep_ms = SWEEP_MIN_MS
+        if self._sweep_job is not None:
+            self.widget.after_cancel(self._sweep_job)
+            self._sweep_job = None
+        self._start_sweep()
+
+    def _schedule_sweep(self):
+        if self._sweep_job is None and self._sweep_thread is None:
+            self._sweep_job = self.widget.after(self.sweep_ms, self._start_sweep)
+
+    def _start_sweep(self):
+        self._sweep_job = None
+        if self._sweep_thread is not None:
+            return      # the last sweep is still waiting for a slow drive
+        keys = [key for key, watched in self.files.items() if watched.swept]
+        if not keys:
+            return
+        self._last_sweep = time.monotonic()
+        paths = [self.files[key].path for key in keys]
+        results = {}
+        self._sweep_thread = threading.Thread(
+            target=lambda: results.update((path, file_signature(path)) for path in paths), daemon=True)
+        self._sweep_thread.start()
+        self.widget.after(POLL_MS, self._poll_sweep, keys, results)
+
+    def _poll_sweep(self, keys, results):
+        if self._sweep_thread.is_alive():
+            self.widget.after(POLL_MS, self._poll_sweep, keys, results)
+            return
+        self._sweep_thread = None
+        found = False
+        for key in keys:
+            watched = self.files.get(key)
+            if watched is not None and watched.path in results:
+                found = self._check(key, watched, results[watched.path]) or found
+        self.sweep_ms = SWEEP_MIN_MS if found else min(SWEEP_MAX_MS, self.sweep_ms * 2)
+        self._schedule_sweep()
+
+    def close(self):
+        if self.inotify:
+            self.widget.tk.deletefilehandler(self.inotify.fd)
+            self.inotify.close()
+            self.inotify = None
+
+
+# --- Working out what changed ---
+
+def _split_lines(text):
+    lines = text.split("\n")
+    last = lines.pop()
+    lines = [line + "\n" for line in lines]
+    if last:
+        lines.append(last)
+    return lines
+
+
+# The edits that turn `old` into `new`: [(start, end, replacement), ...]
+# with offsets in `old`, in order, whole lines at a time
+def changed_regions(old, new):
+    # Only needed once a file is reloaded (runs on the reload's thread)
+    from diff_engine import common_prefix, common_suffix, diff_lines
+    if old == new:
+        return []
+    start = common_prefix(old, new)
+    end_length = common_suffix(old, new, min(len(old), len(new)) - start)
+    # Widen both ends to whole lines
+    start = old.rfind("\n", 0, start) + 1
+    old_end = len(old) - end_length
+    if old_end > 0 and old[old_end - 1] != "\n":
+        newline = old.find("\n", old_end)
+        old_end = len(old) if newline == -1 else newline + 1
+    new_end = len(new) - (len(old) - old_end)
+    old_lines = _split_lines(old[start:old_end])
+    new_lines = _split_lines(new[start:new_end])
+    if len(old_lines) > MAX_DIFF_LINES or len(new_lines) > MAX_DIFF_LINES:
+        return [(start, old_end, new[start:new_end])]
+
+    # Offsets of each old line, then the changed line ranges (diff_engine.py)
+    offsets = [start]
+    for line in old_lines:
+        offsets.append(offsets[-1] + len(line))
+    regions = []
+    for i1, i2, j1, j2 in diff_lines(old_lines, new_lines):
+        regions.append((offsets[i1], offsets[i2], "".join(new_lines[j1:j2])))
+    return regions
+
+
+# --- Reloading a document from disk ---
+class FileReload:
+    def __init__(self, text_widget, path, on_done=None, encoding="utf-8"):
+        self.text = text_widget
+        self.path = path
+        self.on_done = on_done      # called with (error, signature of what was read)
+        self.encoding = encoding
+        self.active = False
+        self._thread = None
+        self._result = None
+        self._version = None
+        text_widget.scheduler.register("reload", self._apply_job)
+
+    def start(self):
+        self.active = True
+        buffer = self.text.buffer
+        self._version = buffer.version
+        snapshot = buffer.snapshot()
+        self._thread = threading.Thread(target=self._read, args=(snapshot,), daemon=True)
+        self._thread.start()
+        self.text.after(POLL_MS, self._poll)
+
+    # --- Worker thread: read the file and compare ---
+    def _read(self, snapshot):
+        try:
+            # Read again if the file changed while we were reading it
+            for attempt in range(3):
+                signature = file_signature(self.path)
+                new = "".join(text for text, percent in iter_file_text(self.path, self.encoding))
+                if file_signature(self.path) == signature:
+                    break
+            self._result = (None, signature, changed_regions(snapshot.get_text(), new))
+        except (OSError, UnicodeError) as error:
+            self._result = (error, None, None)
+
+    def _poll(self):
+        if not self.text.winfo_exists():
+            self.active = False
+            return
+        if self._thread.is_alive():
+            self.text.after(POLL_MS, self._poll)
+            return
+        error, signature, regions = self._result
+        if error:
+            self._finish(error, None)
+        elif self.text.buffer.version != self._version:
+            self.start()    # typed while we were reading: compare again
+        else:
+            self._signature = signature
+            self._regions = regions
+            # From here on the offsets must not move: no typing until the
+            # reload is in (the same way Replace All works, see search.py)
+            self.text.config(state=tk.DISABLED)
+            self.text.scheduler.trigger("reload")
+
+    # --- Tk thread: apply the changes, a few at a time ---
+    def _apply_job(self):
+        return self._apply(self._regions)
+
+    def _apply(self, regions):
+        text = self.text
+        buffer = text.buffer
+        undo_manager = getattr(text, "undo_manager", None)
+        if undo_manager:
+            undo_manager.begin_group()      # the whole reload is one undo step
+        done = 0
+        try:
+            # Back to front, so the offsets of the regions still to do hold
+            for start, end, replacement in reversed(regions):
+                text.config(state=tk.NORMAL)
+                index = buffer.offset_to_index(start)
+                if end > start:
+                    text.delete(index, buffer.offset_to_index(end))
+                # Big replacements go in a slice at a time
+                for pos in range(0, len(replacement), INSERT_SLICE):
+                    text.config(state=tk.NORMAL)
+                    text.insert(buffer.offset_to_index(start + pos), replacement[pos:pos + INSERT_SLICE])
+                    if len(replacement) > INSERT_SLICE:
+                        text.config(state=tk.DISABLED)
+                        yield
+                text.config(state=tk.DISABLED)
+                done += 1
+                if done % RELOAD_BATCH == 0:
+                    yield
+        finally:
+            if undo_manager:
+                undo_manager.end_group()
+            if text.winfo_exists():
+                text.config(state=tk.NORMAL)
+        self._finish(None, self._signature)
+
+    def _finish(self, error, signature):
+        self.active = False
+        if not error:
+            self.text.edit_modified(False)      # the document matches the file again
+        if self.on_done:
+            self.on_done(error, signature)
+
+
+# --- The bar at the top of a tab that says its file changed ---
+# `parent` is the tab's frame (or the window); `actions` are (label, command)
+# buttons. Returns the bar, which removes itself when a button is used.
+def show_change_bar(parent, message, actions):
+    old = getattr(parent, "change_bar", None)
+    if old is not None and old.winfo_exists():
+        old.destroy()
+    bar = tk.Frame(parent, bg="#fff4ce", padx=6, pady=3)
+    # Above everything else in the tab
+    children = parent.pack_slaves()
+    if children:
+        bar.pack(side=tk.TOP, fill=tk.X, before=children[0])
+    else:
+        bar.pack(side=tk.TOP, fill=tk.X)
+    tk.Label(bar, text=message, bg="#fff4ce", fg="black", anchor="w").pack(side=tk.LEFT)
+
+    def run(command):
+        bar.destroy()
+        parent.change_bar = None
+        command()
+
+    for label, command in reversed(actions):
+        tk.Button(bar, text=label, command=lambda command=command: run(command)).pack(side=tk.RIGHT, padx=2)
+    parent.change_bar = bar
+    return bar
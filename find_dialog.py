@@ -0,0 +1,158 @@
+import re
+import tkinter as tk
+from tkinter import messagebox
+
+from editor_core import get_search_engine
+
+# --- FIND & REPLACE WINDOW ---
+# Shared by both editors, and only imported the first time it is opened.
+# Normal documents are searched by their SearchEngine (search.py); large
+# files (large_file.py) jump from match to match on the mapped file.
+#
+# While the window is open the Text widget keeps it in text.find_window, so
+# the tab isn't parked (its widget destroyed) under it (see can_park in
+# Advanced_TextEditor.py).
+
+
+def open_find_replace(root, text):
+    large_view = getattr(text, "large_view", None)
+    engine = None if large_view else get_search_engine(text)
+
+    find_window = tk.Toplevel(root)
+    find_window.title("Find & Replace")
+    find_window.geometry("460x190")
+    find_window.resizable(False, False)
+    text.find_window = find_window
+    # --- Find row ---
+    tk.Label(find_window, text="Find:").grid(row=0, column=0, padx=5, pady=5, sticky="e")
+    find_entry = tk.Entry(find_window, width=30)
+    find_entry.grid(row=0, column=1, padx=5, pady=5)
+    # --- Replace row ---
+    tk.Label(find_window, text="Replace:").grid(row=1, column=0, padx=5, pady=5, sticky="e")
+    replace_entry = tk.Entry(find_window, width=30)
+    replace_entry.grid(row=1, column=1, padx=5, pady=5)
+
+    # --- Options row ---
+    match_case = tk.BooleanVar(value=True)      # "Cat" does not find "cat"
+    whole_word = tk.BooleanVar(value=False)     # "cat" does not find "cats"
+    use_regex = tk.BooleanVar(value=False)      # treat Find as a regular expression
+    options = tk.Frame(find_window)
+    options.grid(row=2, column=0, columnspan=3)
+    tk.Checkbutton(options, text="Match case", variable=match_case).pack(side=tk.LEFT)
+    tk.Checkbutton(options, text="Whole word", variable=whole_word).pack(side=tk.LEFT)
+    tk.Checkbutton(options, text="Regex", variable=use_regex).pack(side=tk.LEFT)
+
+    # --- Match count, e.g. "3 of 120" ---
+    count_text = tk.StringVar()
+    tk.Label(find_window, textvariable=count_text).grid(row=3, column=1)
+
+    def show_count(current, count):
+        if count == 0:
+            count_text.set("No matches")
+        elif current < 0:
+            count_text.set(f"{count} matches")
+        else:
+            count_text.set(f"{current + 1} of {count}")
+
+    searched = [None]   # the (term, options) the engine last searched for
+
+    # Search the whole document. Returns True if there is something to
+    # navigate. The same search isn't repeated
+    def run_search():
+        search_term = find_entry.get()
+        key = (search_term, use_regex.get(), whole_word.get(), match_case.get())
+        if key == searched[0] and engine.pattern is not None:
+            return True
+        try:
+            engine.find_all(search_term, regex=key[1], whole_word=key[2], match_case=key[3])
+        except re.error as error:
+            messagebox.showerror("Find", f"Invalid regular expression:\n{error}", parent=find_window)
+            return False
+        searched[0] = key
+        return engine.pattern is not None
+
+    def find_large(search_term):
+        # Large files: jump to the next match, searched on the mapped file
+        text.tag_remove("found", "1.0", tk.END)
+        def show_match(line, column=0, length=0):
+            if line is None:
+                messagebox.showinfo("Find", f"'{search_term}' was not found.", parent=find_window)
+                return
+            window_line = line - large_view.window_first + 1
+            text.tag_add("found", f"{window_line}.{column}", f"{window_line}.{column + length}")
+            text.mark_set(tk.INSERT, f"{window_line}.{column + length}")
+            text.tag_config("found", background="yellow", foreground="black")
+        large_view.find_next(search_term, show_match)
+
+    # --- Find All button: one pass over the buffer, only the matches on
+    # screen get highlighted ---
+    def find_text():
+        if large_view:
+            if find_entry.get(): find_large(find_entry.get())
+            return
+        searched[0] = None      # always search again
+        run_search()
+
+    def find_next_match():
+        if large_view:
+            find_text()
+        elif run_search():
+            engine.find_next()
+
+    def find_previous_match():
+        if not large_view and run_search():
+            engine.find_previous()
+
+    # --- Replace All button ---
+    def replace_all():
+        search_term = find_entry.get()
+        replace_term = replace_entry.get()
+        if large_view:
+            messagebox.showinfo("Replace All", "Replace All is not available for large files.", parent=find_window)
+            return
+        if getattr(text, "reloader", None):
+            messagebox.showinfo("Replace All", "The file is being reloaded, try again in a moment.",
+                                parent=find_window)
+            return
+        if search_term and run_search():
+            # Only the matches that change are replaced, a batch per idle
+            # tick, as one undo step (see search.py)
+            try:
+                started = engine.replace_all(replace_term, regex=use_regex.get(),
+                                             on_done=lambda count: count_text.set(f"Replaced {count}"))
+            except re.error as error:
+                messagebox.showerror("Replace All", f"Invalid replacement:\n{error}", parent=find_window)
+                return
+            if started:
+                count_text.set(f"Replacing {engine.count} matches…")
+
+    # Closing the window removes the highlights
+    def close():
+        if engine:
+            engine.on_results = None
+            engine.clear()
+        if getattr(text, "find_window", None) is find_window:
+            text.find_window = None
+        find_window.destroy()
+
+    # The tab was closed: the window has nothing left to search
+    def text_destroyed(event):
+        if event.widget is text and find_window.winfo_exists():
+            find_window.destroy()
+
+    if engine:
+        engine.on_results = show_count
+    # --- Buttons ---
+    tk.Button(find_window, text="Find All", command=find_text).grid(row=0, column=2, padx=5)
+    tk.Button(find_window, text="Replace All", command=replace_all).grid(row=1, column=2, padx=5)
+    buttons = tk.Frame(find_window)
+    buttons.grid(row=4, column=0, columnspan=3, pady=10)
+    tk.Button(buttons, text="Previous", command=find_previous_match).pack(side=tk.LEFT, padx=5)
+    tk.Button(buttons, text="Next", command=find_next_match).pack(side=tk.LEFT, padx=5)
+    tk.Button(buttons, text="Close", command=close).pack(side=tk.LEFT, padx=5)
+    # Enter = next match, Shift+Enter = previous match
+    find_entry.bind("<Return>", lambda e: find_next_match())
+    find_entry.bind("<Shift-Return>", lambda e: find_previous_match())
+    find_window.protocol("WM_DELETE_WINDOW", close)
+    text.bind("<Destroy>", text_destroyed, add="+")
+    find_entry.focus_set()
@@ -0,0 +1,222 @@
+import mmap
+import multiprocessing
+import os
+import queue
+import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from search import compile_pattern
+
+# --- FIND IN FILES ---
+# Searches every file below a folder. A feeder thread walks the tree and
+# hands batches of paths to a pool of worker processes (one per core). Each
+# worker memory-maps its files and runs a compiled bytes regex over them, so
+# files are never read into Python strings. Files that look binary (a NUL
+# byte near the start) are skipped.
+#
+# Hits come back to the Tk thread through a queue and are shown as they
+# arrive; cancel() stops the walk and drops the batches not started yet.
+#
+#   search = FileSearch(root, folder, "TODO", on_hits=show, on_done=finished)
+#   search.start()
+#   ...
+#   search.cancel()
+
+SKIP_DIRS = {".git", ".hg", ".svn", "__pycache__", "node_modules", ".venv", "venv"}
+SNIFF_BYTES = 8192          # bytes checked for NUL to spot binary files
+BATCH_FILES = 64            # paths sent to a worker at once
+BATCHES_PER_WORKER = 4      # batches in flight per worker process
+MAX_HITS_PER_FILE = 1000
+MAX_LINE_CHARS = 200        # longer lines are cut in the result list
+POLL_MS = 50                # how often the Tk thread picks up results
+MAX_RESULTS_PER_POLL = 200  # files handed to on_hits per poll
+MAX_SHOWN_HITS = 10000      # rows in the result list, the rest are only counted
+
+
+# Worker processes compile each pattern once
+_patterns = {}
+
+
+def _compiled(source, flags):
+    key = (source, flags)
+    if key not in _patterns:
+        _patterns[key] = re.compile(source, flags)
+    return _patterns[key]
+
+
+def _is_binary(data):
+    return b"\0" in data[:SNIFF_BYTES]
+
+
+# Hits in one file: [(line number (1-based), column, line text)]
+def search_file(path, pattern):
+    try:
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if _is_binary(data):
+                    return []
+                hits = []
+                line = 1
+                counted_to = 0
+                for match in pattern.finditer(data):
+                    start = match.start()
+                    if match.end() == start:
+                        continue
+                    # Count newlines only since the previous hit
+                    line += data[counted_to:start].count(b"\n")
+                    counted_to = start
+                    line_start = data.rfind(b"\n", 0, start) + 1
+                    line_end = data.find(b"\n", start)
+                    if line_end == -1:
+                        line_end = len(data)
+                    column = len(data[line_start:start].decode("utf-8", errors="replace"))
+                    line_text = data[line_start:min(line_end, line_start + MAX_LINE_CHARS * 4)]
+                    line_text = line_text.decode("utf-8", errors="replace").rstrip("\r")
+                    hits.append((line, column, line_text[:MAX_LINE_CHARS]))
+                    if len(hits) >= MAX_HITS_PER_FILE:
+                        break
+                return hits
+    except (OSError, ValueError):
+        return []       # unreadable, vanished, or can't be mapped
+
+
+# Runs in a worker process: (files searched, [(path, hits)] for the files
+# that have hits)
+def search_batch(paths, source, flags):
+    pattern = _compiled(source, flags)
+    results = []
+    for path in paths:
+        hits = search_file(path, pattern)
+        if hits:
+            results.append((path, hits))
+    return len(paths), results
+
+
+def iter_files(folder):
+    for dirpath, dirnames, filenames in os.walk(folder):
+        dirnames[:] = [name for name in dirnames if name not in SKIP_DIRS]
+        for name in filenames:
+            yield os.path.join(dirpath, name)
+
+
+# The find options as a bytes pattern the workers can compile
+def bytes_pattern(term, regex=False, whole_word=False, match_case=True):
+    pattern = compile_pattern(term, regex, whole_word, match_case)
+    return pattern.pattern.encode("utf-8"), pattern.flags & (re.IGNORECASE | re.MULTILINE)
+
+
+def make_pool():
+    # Workers are fresh interpreters ("spawn"): forking a process that runs
+    # Tk and worker threads can deadlock the child. The editors only build
+    # their window in main(), so re-importing them in a worker is cheap and
+    # opens nothing.
+    return ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")), os.cpu_count() or 1
+
+
+class FileSearch:
+    def __init__(self, widget, folder, term, regex=False, whole_word=False, match_case=True,
+                 on_hits=None, on_done=None, paths=None):
+        self.widget = widget            # only used for after() polling
+        self.folder = folder
+        # Files to search instead of walking the folder, or a function that
+        # returns them (or None for all), called on the feeder thread: an
+        # index lookup that stats the whole tree mustn't hold up the window
+        self.paths = paths
+        # re.error for a bad regex is raised here, before anything starts
+        self.source, self.flags = bytes_pattern(term, regex, whole_word, match_case)
+        self.on_hits = on_hits          # called with [(path, hits)] as they arrive
+        self.on_done = on_done          # called with (cancelled, error)
+        self.results = queue.Queue()
+        self.cancelled = threading.Event()
+        self.files_searched = 0
+        self.active = False
+        self._finished = False
+        self.error = None
+
+    def start(self):
+        self.active = True
+        threading.Thread(target=self._run, daemon=True).start()
+        self.widget.after(POLL_MS, self._poll)
+
+    def cancel(self):
+        self.cancelled.set()
+
+    # --- Tk thread: hand over what has arrived ---
+    def _poll(self):
+        if not self.widget.winfo_exists():
+            self.cancelled.set()
+            return
+        items = []
+        while len(items) < MAX_RESULTS_PER_POLL:
+            try:
+                items.append(self.results.get_nowait())
+            except queue.Empty:
+                break
+        if items and self.on_hits and not self.cancelled.is_set():
+            self.on_hits(items)
+        if self._finished and self.results.empty():
+            self.active = False
+            if self.on_done:
+                self.on_done(self.cancelled.is_set(), self.error)
+            return
+        self.widget.after(POLL_MS, self._poll)
+
+    # --- Feeder thread ---
+    def _run(self):
+        paths = self.paths
+        if callable(paths):
+            try:
+                paths = paths()
+            except Exception:
+                paths = None    # the index is no help, search everything
+        # A handful of files (e.g. narrowed down by an index) are quicker
+        # to search right here than to hand to a pool
+        if paths is not None and len(paths) <= BATCH_FILES:
+            try:
+                count, results = search_batch(paths, self.source, self.flags)
+                self.files_searched = count
+                for item in results:
+                    self.results.put(item)
+            except Exception as error:
+                self.error = error
+            self._finished = True
+            return
+
+        pool, workers = make_pool()
+        pending = set()
+        batch = []
+        try:
+            if paths is None:
+                paths = iter_files(self.folder)
+            for path in paths:
+                if self.cancelled.is_set():
+                    break
+                batch.append(path)
+                if len(batch) < BATCH_FILES:
+                    continue
+                pending.add(pool.submit(search_batch, batch, self.source, self.flags))
+                batch = []
+                # Keep the workers busy without queueing the whole tree
+                while len(pending) >= workers * BATCHES_PER_WORKER and not self.cancelled.is_set():
+                    pending = self._collect(pending, FIRST_COMPLETED)
+            if batch and not self.cancelled.is_set():
+                pending.add(pool.submit(search_batch, batch, self.source, self.flags))
+            while pending and not self.cancelled.is_set():
+                pending = self._collect(pending, FIRST_COMPLETED)
+        except Exception as error:
+            self.error = error
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._finished = True
+
+    def _collect(self, pending, return_when):
+        finished, pending = wait(pending, timeout=0.1, return_when=return_when)
+        for future in finished:
+            count, results = future.result()
+            self.files_searched += count
+            for item in results:
+                self.results.put(item)
+        return pending
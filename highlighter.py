@@ -0,0 +1,178 @@
+from lexers import lexer_for_path
+
+# --- INCREMENTAL SYNTAX HIGHLIGHTER ---
+# The old approach removed every "keyword" tag and re-searched the whole
+# document for all ~35 keywords on each key release. That gets slower the
+# bigger the file is.
+#
+# This highlighter remembers, per line, whether the line is already
+# highlighted and what the lexer state was at the start of the line. Edits
+# only mark the touched lines as dirty, so a keystroke re-highlights the
+# dirty lines that are on screen, and everything else is done a few hundred
+# lines at a time while the editor is idle.
+#
+# Tokens are cached per (line content, start state). If an edit changes the
+# state at the end of a line (e.g. opening a triple-quoted string) the next
+# line becomes dirty too; as soon as a line ends in the same state as before,
+# the lines after it are left alone.
+#
+# The work is driven by the editor's EventScheduler (scheduler.py):
+#   "highlight"      -> ~100 ms after typing stops, redo dirty lines on screen
+#                       and then continue through the file in small batches
+#   "highlight_view" -> right after scrolling, redo dirty lines on screen
+#
+# The language comes from lexers.py; set_lexer() switches it when a file is
+# opened or saved under a new name. Documents whose lexer has no tags (plain
+# text, logs) skip all of the above.
+
+HIGHLIGHT_DELAY_MS = 100 # quiet time after typing before highlighting
+VIEW_DELAY_MS = 16       # roughly one frame after a scroll
+IDLE_BATCH_LINES = 200   # lines highlighted per background step
+TOKEN_CACHE_SIZE = 50000 # cached lines before the cache is emptied
+MAX_LEXED_LINE = 10000   # longer lines (minified JSON...) are left uncolored
+
+TAG_COLORS = {
+    # tag:      (light mode, dark mode)
+    "keyword": ("blue", "orange"),
+    "string":  ("#a31515", "#ce9178"),
+    "comment": ("#008000", "#6a9955"),
+    "number":  ("#098658", "#b5cea8"),
+    "key":     ("#0451a5", "#9cdcfe"),
+}
+
+
+class SyntaxHighlighter:
+    def __init__(self, text_widget, hooks, buffer, scheduler, lexer=None):
+        self.text = text_widget
+        self.buffer = buffer
+        self.lexer = lexer or lexer_for_path(None)
+        line_count = self._line_count()
+        # line_done[i] == 1 means line i+1 is highlighted and up to date
+        self.line_done = bytearray(line_count)
+        # line_states[i] is the lexer state at the start of line i+1
+        self.line_states = [None] * line_count
+        # (line text, start state) -> (tokens, end state)
+        self.token_cache = {}
+        self.scheduler = scheduler
+        scheduler.register("highlight", self.update, delay_ms=HIGHLIGHT_DELAY_MS)
+        scheduler.register("highlight_view", self.highlight_visible, delay_ms=VIEW_DELAY_MS)
+        hooks.add_edit_listener(self.on_edit)
+        hooks.add_view_listener(self.on_view_change)
+
+    def _line_count(self):
+        return self.buffer.line_count
+
+    # --- Keep the per-line state in sync with edits ---
+    def on_edit(self, event):
+        if event.kind == "reset":
+            line_count = self._line_count()
+            self.line_done = bytearray(line_count)
+            self.line_states = [None] * line_count
+            return
+        first = event.start_line - 1
+        added = event.text.count("\n")
+        if event.kind == "insert":
+            # New lines start out dirty, their state is fixed up when the
+            # line above them is highlighted
+            self.line_done[first + 1:first + 1] = bytes(added)
+            self.line_states[first + 1:first + 1] = [None] * added
+        else:
+            del self.line_done[first + 1:first + 1 + added]
+            del self.line_states[first + 1:first + 1 + added]
+        if first < len(self.line_done):
+            self.line_done[first] = 0
+
+    def on_view_change(self, first, last):
+        # Scrolling into an area the background pass has not reached yet
+        if self.lexer.tags and self.line_done.find(0) != -1:
+            self.scheduler.trigger("highlight_view")
+
+    # A new language: drop the old colors and start over
+    def set_lexer(self, lexer):
+        if type(lexer) is type(self.lexer):
+            return
+        for tag in self.lexer.tags:
+            self.text.tag_remove(tag, "1.0", "end")
+        self.lexer = lexer
+        self.token_cache.clear()
+        line_count = self._line_count()
+        self.line_done = bytearray(line_count)
+        self.line_states = [None] * line_count
+        self.scheduler.trigger("highlight")
+
+    # --- Scheduler jobs ---
+    def update(self):
+        if not self.lexer.tags:
+            return None     # nothing to color
+        self.highlight_visible()
+        # Returning a generator lets the scheduler finish the rest of the
+        # file in small steps (and drop it if another edit comes in)
+        return self.background_pass()
+
+    def highlight_visible(self):
+        first, last = self.visible_lines()
+        self.highlight_lines(first, last)
+
+    def configure_colors(self, is_dark_mode):
+        for tag, (light, dark) in TAG_COLORS.items():
+            self.text.tag_config(tag, foreground=dark if is_dark_mode else light)
+
+    def visible_lines(self):
+        first = int(self.text.index("@0,0").split(".")[0])
+        last = int(self.text.index(f"@0,{self.text.winfo_height()}").split(".")[0])
+        return first, last
+
+    def tokenize(self, line, state):
+        key = (line, state)
+        cached = self.token_cache.get(key)
+        if cached is None:
+            if len(line) > MAX_LEXED_LINE:
+                return [], state
+            if len(self.token_cache) >= TOKEN_CACHE_SIZE:
+                self.token_cache.clear()
+            cached = self.token_cache[key] = self.lexer.tokenize_line(line, state)
+        return cached
+
+    # Re-highlight the dirty lines between first..last (1-based, inclusive)
+    def highlight_lines(self, first, last):
+        last = min(last, len(self.line_done))
+        if not self.lexer.tags or first > last or self.line_done.find(0, first - 1, last) == -1:
+            return
+
+        lines = self.buffer.get_lines(first - 1, last)
+        ranges = {tag: [] for tag in self.lexer.tags}
+        cleared = []        # [first, last] runs of lines whose tags are redone
+        for index in range(first - 1, last):
+            if self.line_done[index]:
+                continue
+            line_no = index + 1
+            tokens, end_state = self.tokenize(lines[index - first + 1], self.line_states[index])
+            for start, end, tag in tokens:
+                ranges[tag].append(f"{line_no}.{start}")
+                ranges[tag].append(f"{line_no}.{end}")
+            self.line_done[index] = 1
+            if cleared and cleared[-1][1] == line_no - 1:
+                cleared[-1][1] = line_no
+            else:
+                cleared.append([line_no, line_no])
+
+            # State changed at the end of this line: the next one must be redone
+            if index + 1 < len(self.line_states) and self.line_states[index + 1] != end_state:
+                self.line_states[index + 1] = end_state
+                self.line_done[index + 1] = 0
+
+        for tag in self.lexer.tags:
+            for run_first, run_last in cleared:
+                self.text.tag_remove(tag, f"{run_first}.0", f"{run_last}.end")
+            # One Tk call for all ranges of a tag instead of one call per match
+            if ranges[tag]:
+                self.text.tag_add(tag, *ranges[tag])
+
+    # --- Background pass over the rest of the file ---
+    def background_pass(self):
+        while True:
+            start = self.line_done.find(0)
+            if start == -1:
+                return      # Whole file is highlighted
+            self.highlight_lines(start + 1, start + IDLE_BATCH_LINES)
+            yield
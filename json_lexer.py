@@ -0,0 +1,24 @@
+import re
+
+# --- JSON LINE LEXER ---
+# Same interface as python_lexer.py. JSON strings can't span lines, so
+# there is no state to carry from one line to the next: it is always None.
+# Object keys (a string followed by ":") get their own tag.
+
+TOKEN_PATTERN = re.compile(
+    r"""
+      (?P<key>"(?:\\.|[^"\\])*"(?=\s*:))
+    | (?P<string>"(?:\\.|[^"\\])*"?)
+    | (?P<number>-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b)
+    | (?P<keyword>\b(?:true|false|null)\b)
+    """,
+    re.VERBOSE,
+)
+
+
+class JsonLexer:
+    tags = ("key", "string", "number", "keyword")
+
+    def tokenize_line(self, line, state=None):
+        return [(match.start(), match.end(), match.lastgroup)
+                for match in TOKEN_PATTERN.finditer(line)], None
@@ -0,0 +1,346 @@
+import mmap
+import os
+import queue
+import re
+import threading
+import tkinter as tk
+from array import array
+from bisect import bisect_right
+from itertools import islice
+
+# --- LARGE FILE MODE ---
+# Files above LARGE_FILE_THRESHOLD are not read into memory at all. The file
+# is memory-mapped, a background thread builds an index of where lines start,
+# and the Text widget only ever holds a window of WINDOW_LINES lines around
+# the part you are looking at. Scrolling near the edge of the window loads the
+# next window; the scrollbar, "Go to Line" and Find work on the whole file.
+#
+# The view opens read-only. After enable_editing(), changes made in the
+# window are "spilled" into an overlay when the window moves, and saving
+# writes the mapped file with the overlay applied.
+
+LARGE_FILE_THRESHOLD = 50 * 1024 * 1024   # bytes
+WINDOW_LINES = 3000         # lines materialized in the Text widget
+WINDOW_MARGIN = 300         # move the window when this close to its edge
+INDEX_STEP = 1024           # remember where every 1024th line starts
+SCAN_CHUNK = 4 * 1024 * 1024
+POLL_MS = 100
+
+NEWLINE = re.compile(rb"\n")
+
+
+def is_large_file(path):
+    try:
+        return os.path.getsize(path) >= LARGE_FILE_THRESHOLD
+    except OSError:
+        return False
+
+
+# --- Line index (built on a worker thread) ---
+class LineIndex:
+    def __init__(self, data):
+        self.data = data
+        self.checkpoints = array("Q", [0])  # start offset of line 0, STEP, 2*STEP...
+        self.lines_seen = 0                  # newlines found so far
+        self.scanned = 0                     # bytes scanned so far
+        self.done = False
+        self.cancelled = False
+
+    def build(self):
+        try:
+            self._scan()
+        except ValueError:
+            pass    # The mapping was closed because the tab was closed
+
+    def _scan(self):
+        data = self.data
+        size = len(data)
+        pos = 0
+        next_line = INDEX_STEP
+        while pos < size and not self.cancelled:
+            end = min(size, pos + SCAN_CHUNK)
+            count = data[pos:end].count(b"\n")
+            if self.lines_seen + count >= next_line:
+                # Jump straight to the newlines we need, the regex engine
+                # skips over the others without Python code in between
+                matches = NEWLINE.finditer(data, pos, end)
+                consumed = 0
+                while self.lines_seen + count >= next_line:
+                    wanted = next_line - self.lines_seen - consumed
+                    match = next(islice(matches, wanted - 1, None))
+                    consumed += wanted
+                    self.checkpoints.append(match.end())
+                    next_line += INDEX_STEP
+            self.lines_seen += count
+            pos = end
+            self.scanned = pos
+        self.done = not self.cancelled
+
+    # Known number of lines (a guess while the index is still being built)
+    def line_count(self):
+        if self.done:
+            return self.lines_seen + 1
+        if self.scanned == 0:
+            return 1
+        return max(self.lines_seen + 1, int(self.lines_seen * len(self.data) / self.scanned))
+
+    def line_offset(self, line):
+        checkpoint = min(line // INDEX_STEP, len(self.checkpoints) - 1)
+        pos = self.checkpoints[checkpoint]
+        remaining = line - checkpoint * INDEX_STEP
+        if remaining > 0:
+            match = next(islice(NEWLINE.finditer(self.data, pos), remaining - 1, None), None)
+            if match is None:
+                return len(self.data)
+            pos = match.end()
+        return pos
+
+    def line_of_offset(self, offset):
+        checkpoint = bisect_right(self.checkpoints, offset) - 1
+        start = self.checkpoints[checkpoint]
+        return checkpoint * INDEX_STEP + self.data[start:offset].count(b"\n")
+
+
+class LargeFileView:
+    def __init__(self, text_widget, scrollbar, path, on_progress=None):
+        self.text = text_widget
+        self.scrollbar = scrollbar
+        self.path = path
+        self.on_progress = on_progress      # called with a 0..100 percentage
+        self.editable = False
+        self.dirty = False                  # overlay has unsaved changes
+        self.version = 0                    # bumped whenever the overlay changes
+        self._materializing = False
+        # overlay: first line -> (end line, replacement text) for edited ranges
+        self.overlay = {}
+        self.window_first = 0
+        self.window_last = 0
+        self._rewindow_job = None
+        self._search_results = queue.Queue()
+        self._search_thread = None
+
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.index = LineIndex(self.data)
+        # Edited lines are written back with the file's own line breaks
+        first_break = self.data.find(b"\n")
+        self.newline = "\r\n" if first_break > 0 and self.data[first_break - 1] == ord("\r") else "\n"
+        threading.Thread(target=self.index.build, daemon=True).start()
+
+        text_widget.config(yscrollcommand=self._on_text_scroll, undo=False)
+        scrollbar.config(command=self._on_scrollbar)
+        text_widget.bind("<Destroy>", self._on_destroy, add="+")
+        self._poll_index()
+
+    # --- Materializing a window of lines ---
+    # "\r\n" becomes "\n" like iter_file_text does for normal files. A lone
+    # "\r" is left alone: the line index only counts "\n"
+    def _read_lines(self, first, last):
+        start = self.index.line_offset(first)
+        end = self.index.line_offset(last) if last < self.index.line_count() else len(self.data)
+        return self.data[start:end].decode("utf-8", errors="replace").replace("\r\n", "\n")
+
+    def _window_text(self, first, last):
+        parts = []
+        line = first
+        for head in sorted(h for h in self.overlay if first <= h < last):
+            if head > line:
+                parts.append(self._read_lines(line, head))
+            end, replacement = self.overlay[head]
+            parts.append(replacement)
+            line = end
+        if line < last:
+            parts.append(self._read_lines(line, last))
+        text = "".join(parts)
+        # Drop the line break that belongs to the line after the window
+        if last < self.index.line_count() and text.endswith("\n"):
+            text = text[:-1]
+        return text
+
+    # Grow [first, last) so it never cuts an edited range in half
+    def _snap_to_overlay(self, first, last):
+        for head, (end, _) in self.overlay.items():
+            if head < first < end:
+                first = head
+            if head < last < end:
+                last = end
+        return first, last
+
+    def materialize(self, first):
+        self._spill_edits()
+        total = self.index.line_count()
+        first = max(0, min(first, total - 1))
+        last = min(total, first + WINDOW_LINES)
+        first, last = self._snap_to_overlay(first, last)
+        content = self._window_text(first, last)
+
+        # Replacing the window is not a user edit, don't let it look like one
+        self._materializing = True
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", content)
+        self.text.edit_modified(False)
+        self._materializing = False
+        if not self.editable:
+            self.text.config(state=tk.DISABLED)
+        self.window_first, self.window_last = first, last
+
+    # --- Edits go into the overlay when the window moves ---
+    def enable_editing(self):
+        self.editable = True
+        self.text.config(state=tk.NORMAL)
+
+    def _spill_edits(self):
+        if not self.editable or not self.text.edit_modified():
+            return
+        first, last = self.window_first, self.window_last
+        for head in [h for h in self.overlay if first <= h < last]:
+            del self.overlay[head]
+        content = self.text.get("1.0", "end-1c")
+        if last < self.index.line_count():
+            content += "\n"     # keep the line break before the next window
+        self.overlay[first] = (last, content)
+        self.text.edit_modified(False)
+        self.dirty = True
+        self.version += 1
+
+    @property
+    def is_dirty(self):
+        if self._materializing:
+            return False
+        return self.dirty or (self.editable and self.text.edit_modified())
+
+    def mark_saved(self):
+        self.dirty = False
+        self.text.edit_modified(False)
+
+    # Bytes of the whole file with the overlay applied, for saving. The
+    # overlay is copied here on the Tk thread, so the chunks can then be
+    # written out by a worker thread while the user keeps scrolling
+    def iter_chunks(self):
+        self._spill_edits()
+        return self._overlaid_chunks(dict(self.overlay))
+
+    def _overlaid_chunks(self, overlay):
+        pos = 0
+        for head in sorted(overlay):
+            end, replacement = overlay[head]
+            start = self.index.line_offset(head)
+            for chunk_start in range(pos, start, SCAN_CHUNK):
+                yield self.data[chunk_start:min(start, chunk_start + SCAN_CHUNK)]
+            yield replacement.replace("\n", self.newline).encode("utf-8")
+            pos = self.index.line_offset(end) if end < self.index.line_count() else len(self.data)
+        for chunk_start in range(pos, len(self.data), SCAN_CHUNK):
+            yield self.data[chunk_start:chunk_start + SCAN_CHUNK]
+
+    # --- Scrolling ---
+    def _visible_window_lines(self):
+        top = int(self.text.index("@0,0").split(".")[0]) - 1
+        bottom = int(self.text.index(f"@0,{self.text.winfo_height()}").split(".")[0])
+        return top, bottom
+
+    # Display lines in the window vs. source lines can differ when the
+    # overlay changed the number of lines, so scale between the two
+    def _to_global(self, window_line):
+        display_lines = max(1, int(self.text.index("end-1c").split(".")[0]))
+        span = self.window_last - self.window_first
+        return self.window_first + window_line * span // display_lines
+
+    def _on_text_scroll(self, first, last):
+        total = self.index.line_count()
+        top, bottom = self._visible_window_lines()
+        global_top = self._to_global(top)
+        global_bottom = self._to_global(bottom)
+        self.scrollbar.set(global_top / total, min(1.0, global_bottom / total))
+
+        display_lines = int(self.text.index("end-1c").split(".")[0])
+        near_top = top < WINDOW_MARGIN and self.window_first > 0
+        near_bottom = bottom > display_lines - WINDOW_MARGIN and self.window_last < total
+        if (near_top or near_bottom) and self._rewindow_job is None:
+            self._rewindow_job = self.text.after_idle(self._rewindow)
+
+    def _rewindow(self):
+        self._rewindow_job = None
+        top, _ = self._visible_window_lines()
+        self.goto_line(self._to_global(top), move_cursor=False)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.goto_line(int(float(amount) * self.index.line_count()), move_cursor=False)
+        else:
+            self.text.yview_scroll(int(amount), unit)
+
+    # Show `line` (0-based) at the top of the view
+    def goto_line(self, line, move_cursor=True):
+        line = max(0, min(line, self.index.line_count() - 1))
+        inside = self.window_first + WINDOW_MARGIN <= line < self.window_last - WINDOW_MARGIN
+        at_edges = (self.window_first == 0 and line < self.window_last) or \
+                   (self.window_last >= self.index.line_count() and line >= self.window_first)
+        if not (inside or at_edges):
+            self.materialize(line - WINDOW_LINES // 2)
+        window_line = line - self.window_first + 1
+        self.text.yview(f"{window_line}.0")
+        if move_cursor:
+            self.text.mark_set(tk.INSERT, f"{window_line}.0")
+
+    def current_line(self):
+        window_line = int(self.text.index(tk.INSERT).split(".")[0]) - 1
+        return self._to_global(window_line)
+
+    # --- Search on the mapped file (worker thread) ---
+    # Finds the next match after the cursor; on_found(line, column, length)
+    # is called on the Tk thread, or with None when there is no match.
+    def find_next(self, term, on_found):
+        if self._search_thread and self._search_thread.is_alive():
+            return
+        pattern = re.compile(re.escape(term.encode("utf-8")))
+        start = self.index.line_offset(self.current_line() + 1)
+
+        def search():
+            match = pattern.search(self.data, start) or pattern.search(self.data, 0, start)
+            self._search_results.put(match.span() if match else None)
+
+        self._search_thread = threading.Thread(target=search, daemon=True)
+        self._search_thread.start()
+        self._poll_search(term, on_found)
+
+    def _poll_search(self, term, on_found):
+        try:
+            span = self._search_results.get_nowait()
+        except queue.Empty:
+            self.text.after(POLL_MS // 2, self._poll_search, term, on_found)
+            return
+        if span is None:
+            on_found(None)
+            return
+        line = self.index.line_of_offset(span[0])
+        line_start = self.index.line_offset(line)
+        column = len(self.data[line_start:span[0]].decode("utf-8", errors="replace"))
+        self.goto_line(line)
+        on_found(line, column, len(term))
+
+    # --- Progress while the index is being built ---
+    def _poll_index(self):
+        if not self.text.winfo_exists():
+            return
+        if self.window_last == 0 and (self.index.done or self.index.lines_seen >= WINDOW_LINES):
+            self.materialize(0)     # first screen as soon as we can
+        if self.on_progress:
+            size = len(self.data) or 1
+            self.on_progress(100 if self.index.done else self.index.scanned * 100 // size)
+        if not self.index.done:
+            self.text.after(POLL_MS, self._poll_index)
+        else:
+            self._on_text_scroll(0, 1)
+
+    def close(self):
+        self.index.cancelled = True
+        try:
+            self.data.close()
+        except BufferError:
+            pass    # A search thread still holds a slice, let GC close it
+        self.file.close()
+
+    def _on_destroy(self, event):
+        if event.widget is self.text:
+            self.close()
@@ -0,0 +1,60 @@
+import importlib
+import os
+
+# --- LEXER REGISTRY ---
+# Which lexer highlights a document is decided by its file extension. Each
+# lexer lives in its own module with its compiled grammar, and a module is
+# only imported when the first file of its type is opened (or saved under
+# that name). Every lexer has the same shape, so highlighter.py runs all of
+# them through the same incremental pipeline:
+#
+#   tags                              -> the tags it produces
+#   tokenize_line(line, state)        -> ([(start, end, tag), ...], end state)
+#
+# Files with no lexer (.txt, .log, ...) get PlainLexer, which produces no
+# tags, so highlighting them costs nothing. Untitled documents are still
+# highlighted as Python, as they always were.
+#
+#   lexer = lexer_for_path("data.json")
+
+PYTHON_LEXER = ("python_lexer", "PythonLexer")
+
+# extension -> (module, class)
+LEXERS = {
+    ".py": PYTHON_LEXER,
+    ".pyw": PYTHON_LEXER,
+    ".pyi": PYTHON_LEXER,
+    ".json": ("json_lexer", "JsonLexer"),
+    ".jsonl": ("json_lexer", "JsonLexer"),
+    ".geojson": ("json_lexer", "JsonLexer"),
+    ".sql": ("sql_lexer", "SqlLexer"),
+}
+UNTITLED_LEXER = PYTHON_LEXER
+
+_classes = {}   # (module, class) -> the loaded class
+
+
+class PlainLexer:
+    tags = ()
+
+    def tokenize_line(self, line, state=None):
+        return [], None
+
+
+# (module, class) of the lexer for `path`, None for plain text. Also tells
+# other helpers what language a document is in (outline.py)
+def lexer_spec(path):
+    if path is None:
+        return UNTITLED_LEXER
+    return LEXERS.get(os.path.splitext(path)[1].lower())
+
+
+def lexer_for_path(path):
+    spec = lexer_spec(path)
+    if spec is None:
+        return PlainLexer()
+    lexer_class = _classes.get(spec)
+    if lexer_class is None:
+        module_name, class_name = spec
+        lexer_class = _classes[spec] = getattr(importlib.import_module(module_name), class_name)
+    return lexer_class()
@@ -0,0 +1,122 @@
+import tkinter as tk
+from tkinter import font as tkfont
+
+# --- LINE NUMBER GUTTER ---
+# The usual way to show line numbers is a second Text widget refilled with
+# "1\n2\n3..." up to text.index("end") on every key and every scroll. That
+# work grows with the length of the file, so long files start to lag.
+#
+# This gutter is a Canvas that only draws the numbers of the lines that are
+# on screen right now:
+#   - the first visible line comes from text.index("@0,0")
+#   - each line's position comes from text.dlineinfo(), so wrapped lines
+#     and bigger font sizes line up with the text
+#   - the number of lines (for the gutter width) is read from the document's
+#     TextBuffer, whose line index is kept up to date from each edit
+# So a redraw costs the same for a 10-line file as for a million-line one.
+#
+# Edits, scrolling and resizing only trigger the "gutter" job of the
+# editor's EventScheduler (scheduler.py). It runs when Tk is idle, just
+# before the screen is repainted, so however many edits and scroll steps
+# came in, the numbers are redrawn once per frame. Canvas items are reused,
+# and a view that looks the same as last time isn't touched at all.
+#
+#   text.gutter = LineGutter(text, hooks, text.buffer, text.scheduler, font)
+#   text.gutter.configure_colors(is_dark_mode)
+
+GUTTER_PADDING = 8      # pixels left and right of the numbers
+MIN_DIGITS = 2          # room for at least "99", so small files don't jitter
+
+GUTTER_COLORS = {
+    # (light mode, dark mode)
+    "bg": ("#f3f3f3", "#252526"),
+    "fg": ("#8a8a8a", "#858585"),
+}
+
+
+class LineGutter:
+    def __init__(self, text_widget, hooks, buffer, scheduler, font):
+        self.text = text_widget
+        self.buffer = buffer
+        self.scheduler = scheduler
+        self.font = tkfont.Font(font=font)
+        self.ascent = self.font.metrics("ascent")
+        self.digits = 0
+        self.drawn = []         # (line, y) pairs currently on the canvas
+        self.items = []         # canvas text items, reused between redraws
+
+        self.canvas = tk.Canvas(text_widget.master, width=0, highlightthickness=0, bd=0)
+        # Left of the text, whatever was packed before it
+        self.canvas.pack(side=tk.LEFT, fill=tk.Y, before=text_widget)
+        self.configure_colors(False)
+        self.set_width()
+
+        scheduler.register("gutter", self.redraw, delay_ms=0, priority=20)
+        hooks.add_edit_listener(lambda event: scheduler.trigger("gutter"))
+        hooks.add_view_listener(lambda first, last: scheduler.trigger("gutter"))
+        text_widget.bind("<Configure>", lambda e: scheduler.trigger("gutter"), add="+")
+        text_widget.bind("<Destroy>", self._on_destroy, add="+")
+
+    def configure_colors(self, is_dark_mode):
+        mode = 1 if is_dark_mode else 0
+        self.canvas.config(bg=GUTTER_COLORS["bg"][mode])
+        self.canvas.itemconfig("number", fill=GUTTER_COLORS["fg"][mode])
+        self.fg = GUTTER_COLORS["fg"][mode]
+
+    # Wide enough for the biggest line number, only resized when the
+    # number of digits changes
+    def set_width(self):
+        digits = max(MIN_DIGITS, len(str(self.buffer.line_count)))
+        if digits == self.digits:
+            return False
+        self.digits = digits
+        self.canvas.config(width=self.font.measure("9" * digits) + 2 * GUTTER_PADDING)
+        return True
+
+    def visible_lines(self):
+        # (line number, y of the text's first row) for each line that starts
+        # on screen. A wrapped line whose start is scrolled off gets no number
+        first = line = int(self.text.index("@0,0").split(".")[0])
+        last = self.buffer.line_count
+        lines = []
+        while line <= last:
+            info = self.text.dlineinfo(f"{line}.0")
+            if info is None:
+                if line > first:
+                    break       # below the bottom of the view (or not shown)
+            else:
+                x, y, width, height, baseline = info
+                # Numbers sit on the same baseline as the text
+                lines.append((line, y + baseline - self.ascent))
+            line += 1
+        return lines
+
+    # --- Scheduler job ---
+    def redraw(self):
+        resized = self.set_width()
+        lines = self.visible_lines()
+        if lines == self.drawn and not resized:
+            return
+        self.drawn = lines
+        x = int(self.canvas.cget("width")) - GUTTER_PADDING
+        canvas = self.canvas
+        for i, (line, y) in enumerate(lines):
+            if i < len(self.items):
+                canvas.coords(self.items[i], x, y)
+                canvas.itemconfig(self.items[i], text=line)
+            else:
+                self.items.append(canvas.create_text(x, y, text=line, anchor="ne", font=self.font,
+                                                     fill=self.fg, tags="number"))
+        # Fewer lines on screen than last time
+        for item in self.items[len(lines):]:
+            canvas.delete(item)
+        del self.items[len(lines):]
+
+    # A parked tab drops its Text widget, the gutter goes with it
+    def _on_destroy(self, event):
+        if event.widget is not self.text:
+            return
+        try:
+            self.canvas.destroy()
+        except tk.TclError:
+            pass    # the whole window is closing
@@ -0,0 +1,291 @@
+import ast
+import heapq
+import re
+import threading
+
+from lexers import PYTHON_LEXER, lexer_spec
+
+# --- OUTLINE (SYMBOL INDEX) ---
+# The classes and functions of a Python document, with their line numbers,
+# for the Outline panel and the "Go to Symbol" box (outline_panel.py).
+#
+# The document is parsed with `ast` on a worker thread, ~half a second
+# after typing stops, from a snapshot of the TextBuffer (O(1) to take, and
+# never changed by later edits). Parsing is done per top-level block: the
+# text is cut at every line that starts in column 0 ("def ...", "class ...",
+# "x = 1"), and each block's symbols are remembered by the block's text. An
+# edit inside one function therefore only re-parses that function; blocks
+# that only moved up or down get their line numbers shifted.
+#
+# While the document doesn't parse (in the middle of typing "def f(") the
+# last good outline is kept, and `error` says on which line parsing failed.
+#
+#   text.outline = OutlineIndex(text, hooks, text.buffer, text.scheduler, path)
+#   text.outline.listeners.append(show)     # show(outline), after each parse
+#   text.outline.symbols                    # [Symbol, ...] in document order
+
+OUTLINE_DELAY_MS = 500  # quiet time after typing before parsing
+POLL_MS = 50            # how often the editor checks for a finished parse
+
+# Lines in column 0 that carry on the block above them
+CONTINUATIONS = ("else", "elif", "except", "finally", ")", "]", "}")
+
+
+class Symbol:
+    __slots__ = ("name", "qualname", "kind", "line", "depth")
+
+    def __init__(self, name, qualname, kind, line, depth):
+        self.name = name            # "save"
+        self.qualname = qualname    # "FileSaver.save"
+        self.kind = kind            # "class" or "def"
+        self.line = line            # 1-based, like Tk
+        self.depth = depth          # 0 for top level, 1 for methods...
+
+
+# --- Parsing (runs on the worker thread) ---
+
+# Where a triple-quoted string that is still open at the end of `line`
+# started: '"""', "'''", or None. `quote` is the one open before the line
+def _open_quote(line, quote):
+    if '"""' not in line and "'''" not in line:
+        return quote
+    pos = 0
+    while True:
+        if quote is None:
+            starts = [p for p in (line.find('"""', pos), line.find("'''", pos)) if p != -1]
+            if not starts:
+                return None
+            pos = min(starts)
+            quote = line[pos:pos + 3]
+        else:
+            pos = line.find(quote, pos)
+            if pos == -1:
+                return quote
+            quote = None
+        pos += 3
+
+
+# Split the source into top-level blocks: [(first line (0-based), text), ...]
+def split_blocks(source):
+    blocks = []
+    lines = source.split("\n")
+    start = 0
+    decorated = False   # the current block so far is only decorators
+    quote = None        # inside a multi-line string (a docstring...)
+    for number, line in enumerate(lines):
+        if quote is None and line and line[0] not in " \t#" and not line.startswith(CONTINUATIONS):
+            if number > start and not decorated:
+                blocks.append((start, "\n".join(lines[start:number])))
+                start = number
+            decorated = line.startswith("@")
+        quote = _open_quote(line, quote)
+    blocks.append((start, "\n".join(lines[start:])))
+    return blocks
+
+
+# Classes and functions in a parsed block, with lines relative to the block
+def _collect(node, prefix, depth, found):
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            qualname = prefix + child.name
+            kind = "class" if isinstance(child, ast.ClassDef) else "def"
+            found.append((child.name, qualname, kind, child.lineno - 1, depth))
+            _collect(child, qualname + ".", depth + 1, found)
+        elif not isinstance(child, ast.expr):
+            # if / try / with / for bodies can define things too
+            _collect(child, prefix, depth, found)
+    return found
+
+
+def _parse_block(text, cache):
+    if text not in cache:
+        try:
+            cache[text] = _collect(ast.parse(text), "", 0, [])
+        except (SyntaxError, ValueError):
+            cache[text] = None
+    return cache[text]
+
+
+# Returns (symbols, None), or (None, line of the syntax error). `cache` maps
+# block text -> symbols from the previous parse, and is updated in place
+def parse_outline(source, cache):
+    blocks = split_blocks(source)
+    used = {}
+    symbols = []
+    i = 0
+    while i < len(blocks):
+        first, text = blocks[i]
+        found = used[text] = _parse_block(text, cache)
+        # A block that doesn't parse on its own may just be cut in the wrong
+        # place (a bracket left open over column-0 lines): join it with the
+        # next 1, 3, 7, 15... blocks until it parses, or the end is reached
+        j = i + 1
+        step = 1
+        while found is None and j < len(blocks):
+            end = min(len(blocks), j + step)
+            text = "\n".join([text] + [block for start, block in blocks[j:end]])
+            found = _parse_block(text, {})
+            j = end
+            step *= 2
+        if found is None:
+            # A real syntax error. The blocks parsed so far stay cached
+            cache.update(used)
+            try:
+                ast.parse(blocks[i][1])
+            except SyntaxError as error:
+                return None, first + (error.lineno or 1)
+            except ValueError:
+                pass
+            return None, first + 1
+        used[text] = found
+        for name, qualname, kind, line, depth in found:
+            symbols.append(Symbol(name, qualname, kind, first + line + 1, depth))
+        i = j
+    # Keep only the blocks that still exist, so the cache can't grow forever
+    cache.clear()
+    cache.update(used)
+    return symbols, None
+
+
+# --- Keep the outline of one document up to date ---
+class OutlineIndex:
+    def __init__(self, text_widget, hooks, buffer, scheduler, path=None):
+        self.text = text_widget
+        self.buffer = buffer
+        self.scheduler = scheduler
+        self.symbols = []       # the last good outline
+        self.error = None       # line that failed to parse, None if it parsed
+        self.listeners = []     # called with this index after each parse
+        self.enabled = False    # only Python documents have an outline
+        self._cache = {}        # block text -> symbols, worker thread only
+        self._thread = None     # parse in progress
+        self._result = None
+        self._again = False     # edited while parsing, parse again after
+        self._poll_job = None
+        scheduler.register("outline", self.update, delay_ms=OUTLINE_DELAY_MS)
+        hooks.add_edit_listener(self.on_edit)
+        text_widget.bind("<Destroy>", self._on_destroy, add="+")
+        self.set_path(path)
+
+    # Opening or saving under a new name can turn the outline on or off
+    def set_path(self, path):
+        enabled = lexer_spec(path) == PYTHON_LEXER
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        if enabled:
+            self.scheduler.trigger("outline")
+        else:
+            self.scheduler.cancel("outline")
+            self.symbols = []
+            self.error = None
+            self._notify()
+
+    # A parked tab comes back with the outline it had
+    def restore(self, symbols):
+        if self.enabled and not self.symbols:
+            self.symbols = symbols
+            self._notify()
+
+    def on_edit(self, event):
+        if self.enabled:
+            self.scheduler.trigger("outline")
+
+    # --- Scheduler job ---
+    def update(self):
+        if not self.enabled:
+            return
+        if self._thread is not None:
+            self._again = True
+            return
+        snapshot = self.buffer.snapshot()
+        self._thread = threading.Thread(target=self._parse, args=(snapshot,), daemon=True)
+        self._thread.start()
+        self._poll_job = self.text.after(POLL_MS, self._poll)
+
+    def _parse(self, snapshot):
+        self._result = parse_outline(snapshot.get_text(), self._cache)
+
+    def _poll(self):
+        if self._thread.is_alive():
+            self._poll_job = self.text.after(POLL_MS, self._poll)
+            return
+        self._poll_job = None
+        self._thread = None
+        symbols, error = self._result
+        self._result = None
+        if self.enabled:
+            if symbols is not None:
+                self.symbols = symbols
+            self.error = error
+            self._notify()
+        if self._again:
+            self._again = False
+            self.update()
+
+    def _notify(self):
+        for listener in self.listeners:
+            listener(self)
+
+    def _on_destroy(self, event):
+        if event.widget is self.text and self._poll_job is not None:
+            self.text.after_cancel(self._poll_job)
+            self._poll_job = None
+
+
+# --- Fuzzy matching for "Go to Symbol" ---
+# The letters of the query must appear in order ("fsave" finds
+# "FileSaver.save"). One regex search per name finds the matches in C;
+# only names that match get scored in Python. Matches on word starts and
+# runs of letters score higher, shorter names win ties.
+
+def fuzzy_pattern(query):
+    letters = [re.escape(char) for char in query.lower() if not char.isspace()]
+    return re.compile(".*?".join(f"({letter})" for letter in letters)) if letters else None
+
+
+# Score of one name, None if it doesn't match. `lower` is name.lower()
+def fuzzy_score(pattern, query, name, lower):
+    match = pattern.search(lower)
+    if match is None:
+        return None
+    score = 0
+    previous = -2
+    for group in range(1, match.lastindex + 1):
+        pos = match.start(group)
+        if pos == previous + 1:
+            score += 5      # run of letters
+        elif pos == 0 or name[pos - 1] in "._" or (name[pos].isupper() and name[pos - 1].islower()):
+            score += 8      # start of a word: "fs" on FileSaver
+        else:
+            score -= 1
+        previous = pos
+    # The symbol's own name counts more than its class
+    own = lower.rsplit(".", 1)[-1]
+    if own == query:
+        score += 100
+    elif own.startswith(query):
+        score += 40
+    return score - len(name) * 0.01
+
+
+# Every match of `query` in `entries` [(name, name.lower()), ...] as
+# [(score, position in entries), ...]. `among` limits the search to those
+# positions: when a letter is added, only the previous matches can match
+def fuzzy_matches(query, entries, among=None):
+    pattern = fuzzy_pattern(query)
+    if pattern is None:
+        return [(0, i) for i in (range(len(entries)) if among is None else among)]
+    query = "".join(query.lower().split())
+    matches = []
+    for i in (range(len(entries)) if among is None else among):
+        name, lower = entries[i]
+        score = fuzzy_score(pattern, query, name, lower)
+        if score is not None:
+            matches.append((score, i))
+    return matches
+
+
+# The `limit` best matches, best first (earlier entries win ties)
+def best_matches(matches, limit):
+    return heapq.nlargest(limit, matches, key=lambda match: (match[0], -match[1]))
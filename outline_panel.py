@@ -0,0 +1,172 @@
+import tkinter as tk
+
+from outline import best_matches, fuzzy_matches
+from scheduler import EventScheduler
+
+# --- OUTLINE PANEL AND "GO TO SYMBOL" BOX ---
+# Both show what outline.py found; they are only imported the first time
+# one of them is opened.
+#
+#   panel = OutlinePanel(root, notebook, on_pick=show_symbol)
+#   panel.show(text)        # follow another document (e.g. on tab change)
+#   open_goto_symbol(root, [(title, symbols, doc), ...], on_pick=jump)
+
+MAX_SHOWN = 100         # matches listed in the Go to Symbol box
+RANK_SLICE = 2000       # names scored per step (see rank below)
+
+
+# --- SIDE PANEL: the outline of the current document ---
+# A Listbox, not a Treeview: the whole outline goes in with a single call,
+# which stays quick with thousands of symbols.
+class OutlinePanel:
+    def __init__(self, parent, before, on_pick):
+        self.on_pick = on_pick      # called with the Symbol that was clicked
+        self.outline = None         # the OutlineIndex being shown
+        self.symbols = []
+        self.rows = []
+
+        self.frame = tk.Frame(parent)
+        self.frame.pack(side=tk.RIGHT, fill=tk.Y, before=before)
+        self.status = tk.StringVar()
+        tk.Label(self.frame, textvariable=self.status, anchor="w", wraplength=260,
+                 justify=tk.LEFT).pack(fill=tk.X, padx=5)
+        scroll = tk.Scrollbar(self.frame)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox = tk.Listbox(self.frame, width=34, yscrollcommand=scroll.set, font=("Courier", 11),
+                                  activestyle="none")
+        self.listbox.pack(expand=True, fill=tk.BOTH)
+        scroll.config(command=self.listbox.yview)
+        self.listbox.bind("<Double-Button-1>", self._pick)
+        self.listbox.bind("<Return>", self._pick)
+
+    def show(self, text):
+        outline = getattr(text, "outline", None)
+        if outline is self.outline:
+            return
+        if self.outline is not None:
+            self.outline.listeners.remove(self.refresh)
+        self.outline = outline
+        if outline is not None:
+            outline.listeners.append(self.refresh)
+        self.refresh(outline)
+
+    # Called by the OutlineIndex after every parse
+    def refresh(self, outline):
+        if outline is None or not outline.enabled:
+            self.symbols = []
+            self.status.set("No outline for this document")
+        else:
+            self.symbols = outline.symbols
+            if outline.error:
+                self.status.set(f"Syntax error on line {outline.error}, showing the last good outline")
+            else:
+                self.status.set(f"{len(self.symbols)} symbols")
+        rows = [f"{symbol.line:>5} {'  ' * symbol.depth}{symbol.kind} {symbol.name}" for symbol in self.symbols]
+        # Only touch the list when something changed
+        if rows != self.rows:
+            self.rows = rows
+            top = self.listbox.yview()[0]
+            self.listbox.delete(0, tk.END)
+            self.listbox.insert(tk.END, *rows)
+            self.listbox.yview_moveto(top)
+
+    def _pick(self, event=None):
+        selection = self.listbox.curselection()
+        if selection:
+            self.on_pick(self.symbols[selection[0]])
+
+    def close(self):
+        if self.outline is not None:
+            self.outline.listeners.remove(self.refresh)
+        self.frame.destroy()
+
+
+# --- GO TO SYMBOL (Ctrl+P) ---
+# Fuzzy search over the symbols of every open document. `sources` is a list
+# of (document title, symbols, owner); the current document should come
+# first, its symbols win ties. on_pick(owner, symbol) does the jump.
+def open_goto_symbol(root, sources, on_pick):
+    entries = []    # (qualname, lowercase qualname), what the query is matched on
+    items = []      # (symbol, title, owner) for the same positions
+    for title, symbols, owner in sources:
+        for symbol in symbols:
+            entries.append((symbol.qualname, symbol.qualname.lower()))
+            items.append((symbol, title, owner))
+
+    box = tk.Toplevel(root)
+    box.title("Go to Symbol")
+    box.geometry("560x360")
+    box.transient(root)
+    query_entry = tk.Entry(box)
+    query_entry.pack(fill=tk.X, padx=5, pady=5)
+    status = tk.StringVar()
+    tk.Label(box, textvariable=status, anchor="w").pack(fill=tk.X, padx=5)
+    result_list = tk.Listbox(box, font=("Courier", 11), activestyle="none", exportselection=False)
+    result_list.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
+
+    shown = []              # positions in `items` of the listed rows
+    last = [None, None]     # the last query that was fully ranked, and its matches
+
+    # Ranking runs as a scheduler job that returns a generator, so a few
+    # thousand names are scored per step and typing is never held up; a new
+    # key drops the half-done ranking (see scheduler.py). When a letter is
+    # added, only the matches of the shorter query are scored again
+    def rank():
+        query = query_entry.get()
+        among = None
+        if last[0] is not None and query.startswith(last[0]):
+            among = [position for score, position in last[1]]
+        positions = range(len(entries)) if among is None else among
+        matches = []
+        for start in range(0, len(positions), RANK_SLICE):
+            matches += fuzzy_matches(query, entries, positions[start:start + RANK_SLICE])
+            yield
+        last[:] = query, matches
+        show(best_matches(matches, MAX_SHOWN), len(matches))
+
+    def show(best, count):
+        shown[:] = [position for score, position in best]
+        result_list.delete(0, tk.END)
+        rows = []
+        for position in shown:
+            symbol, title, owner = items[position]
+            rows.append(f"{symbol.kind} {symbol.qualname}  ({title}:{symbol.line})")
+        result_list.insert(tk.END, *rows)
+        if shown:
+            result_list.selection_set(0)
+        more = f", first {MAX_SHOWN} listed" if count > MAX_SHOWN else ""
+        status.set(f"{count} of {len(entries)} symbols{more}")
+
+    scheduler = EventScheduler(box)
+    scheduler.register("rank", rank)
+
+    def move(step):
+        if not shown:
+            return "break"
+        selection = result_list.curselection()
+        row = max(0, min(len(shown) - 1, (selection[0] if selection else -1) + step))
+        result_list.selection_clear(0, tk.END)
+        result_list.selection_set(row)
+        result_list.see(row)
+        return "break"
+
+    def pick(event=None):
+        selection = result_list.curselection()
+        if not selection:
+            return
+        symbol, title, owner = items[shown[selection[0]]]
+        box.destroy()
+        on_pick(owner, symbol)
+
+    def on_key(event):
+        if event.keysym not in ("Up", "Down", "Return"):
+            scheduler.trigger("rank")
+
+    query_entry.bind("<KeyRelease>", on_key)
+    query_entry.bind("<Down>", lambda e: move(1))
+    query_entry.bind("<Up>", lambda e: move(-1))
+    query_entry.bind("<Return>", pick)
+    result_list.bind("<Double-Button-1>", pick)
+    box.bind("<Escape>", lambda e: box.destroy())
+    query_entry.focus_set()
+    scheduler.trigger("rank")
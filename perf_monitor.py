@@ -0,0 +1,288 @@
+import os
+import sys
+import threading
+import time
+import tkinter as tk
+from bisect import bisect_left
+from collections import deque
+
+# --- PERFORMANCE MONITOR ---
+# When the editor feels slow, this tells which handler is to blame.
+#
+# Every Tk callback (key and mouse bindings, menu commands, <<Modified>>,
+# <<NotebookTabChanged>>, after() timers) goes through tkinter.CallWrapper.
+# While the monitor is on, CallWrapper.__call__ is swapped for a version
+# that times the call and adds it to a per-handler histogram; scheduler jobs
+# (scheduler.py) are timed under their job name. When it's off, the original
+# __call__ is put back, so it costs nothing.
+#
+# Stalls: a heartbeat timer on the Tk thread ticks every HEARTBEAT_MS and a
+# watchdog thread checks that it keeps ticking. If it stops for STALL_MS, the
+# watchdog notes which handler was running and the Tk thread's Python stack
+# at that moment.
+#
+#   monitor.enable(root)        # or start the editor with TEXT_EDITOR_PERF=1
+#   open_panel(root)            # View -> Performance
+#   monitor.dump("perf.json")
+
+HEARTBEAT_MS = 50
+STALL_MS = 200          # the Tk thread not ticking this long is a stall
+MAX_STALLS = 100        # stalls kept (the oldest are dropped)
+STACK_FRAMES = 8        # frames of the Tk thread's stack kept per stall
+PANEL_REFRESH_MS = 1000
+
+# Histogram buckets grow by a fourth of an octave (about 19%) from 0.01 ms
+# to about 10 minutes, so percentiles are within a few percent
+BUCKET_BOUNDS = [0.01 * 2 ** (i / 4) for i in range(104)]
+
+
+class Histogram:
+    __slots__ = ("counts", "calls", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.counts[bisect_left(BUCKET_BOUNDS, ms)] += 1
+        self.calls += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    # Found by spreading the calls evenly across the bucket it falls in
+    def percentile(self, fraction):
+        wanted = fraction * self.calls
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= wanted:
+                low = BUCKET_BOUNDS[index - 1] if index else 0.0
+                high = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max_ms
+                return min(low + (high - low) * (wanted - seen) / count, self.max_ms)
+            seen += count
+        return self.max_ms
+
+
+# A readable name for a callback: "save_file", "SyntaxHighlighter.update",
+# "<lambda> (Advanced_TextEditor.py:135)"
+def callback_name(function):
+    # after() wraps the real callback in a local "callit" function
+    if getattr(function, "__name__", "") == "callit" and function.__closure__:
+        for cell in function.__closure__:
+            inner = cell.cell_contents
+            if callable(inner):
+                function = inner
+                break
+    function = getattr(function, "__func__", function)
+    name = getattr(function, "__qualname__", None) or repr(function)
+    if "<lambda>" in name or "<locals>" in name:
+        code = getattr(function, "__code__", None)
+        if code:
+            name = f"{name.split('.')[-1]} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return name
+
+
+class PerfMonitor:
+    def __init__(self):
+        self.enabled = False
+        self.histograms = {}        # handler name -> Histogram
+        self.stalls = deque(maxlen=MAX_STALLS)
+        self.current = None         # handler running on the Tk thread right now
+        self._original_call = None
+        self._root = None
+        self._heartbeat = None
+        self._last_beat = 0.0
+        self._open_stall = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._tk_thread = None
+
+    # --- Switching on and off ---
+    def enable(self, root):
+        if self.enabled:
+            return
+        self.enabled = True
+        self._root = root
+        self._tk_thread = threading.get_ident()
+        self._original_call = original = tk.CallWrapper.__call__
+        monitor = self
+
+        def timed_call(wrapper, *args):
+            name = getattr(wrapper, "perf_name", None)
+            if name is None:
+                name = wrapper.perf_name = callback_name(wrapper.func)
+            if name == "PerfMonitor._beat":
+                return original(wrapper, *args)
+            return monitor.call(name, original, wrapper, *args)
+
+        tk.CallWrapper.__call__ = timed_call
+        self._last_beat = time.monotonic()
+        self._beat()
+        self._stop.clear()
+        threading.Thread(target=self._watch, daemon=True).start()
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        tk.CallWrapper.__call__ = self._original_call
+        self._stop.set()
+        if self._heartbeat is not None:
+            try:
+                self._root.after_cancel(self._heartbeat)
+            except tk.TclError:
+                pass
+            self._heartbeat = None
+
+    def reset(self):
+        self.histograms = {}
+        self.stalls.clear()
+
+    # --- Timing ---
+    # Run function(*args), timing it under `name`
+    def call(self, name, function, *args):
+        previous = self.current
+        self.current = name
+        started = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.current = previous
+            self.record(name, (time.perf_counter() - started) * 1000)
+
+    def record(self, name, ms):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.add(ms)
+
+    # --- Stall detection ---
+    def _beat(self):
+        now = time.monotonic()
+        with self._lock:
+            stall = self._open_stall
+            if stall is not None:
+                stall["duration_ms"] = round((now - self._last_beat) * 1000 - HEARTBEAT_MS, 1)
+                self._open_stall = None
+        self._last_beat = now
+        if self.enabled:
+            self._heartbeat = self._root.after(HEARTBEAT_MS, self._beat)
+
+    def _watch(self):
+        import traceback
+        while not self._stop.wait(HEARTBEAT_MS / 1000):
+            late = (time.monotonic() - self._last_beat) * 1000 - HEARTBEAT_MS
+            with self._lock:
+                if late < STALL_MS or self._open_stall is not None:
+                    continue
+                frame = sys._current_frames().get(self._tk_thread)
+                stack = traceback.format_stack(frame)[-STACK_FRAMES:] if frame else []
+                self._open_stall = {
+                    "time": time.strftime("%H:%M:%S"),
+                    "handler": self.current or "(Tk: drawing or layout)",
+                    "duration_ms": None,        # filled in when the heartbeat is back
+                    "stack": [line.rstrip() for line in stack],
+                }
+                self.stalls.append(self._open_stall)
+
+    # --- Reports ---
+    def report(self):
+        rows = []
+        for name, histogram in self.histograms.items():
+            rows.append({
+                "handler": name,
+                "calls": histogram.calls,
+                "p50_ms": round(histogram.percentile(0.50), 2),
+                "p95_ms": round(histogram.percentile(0.95), 2),
+                "p99_ms": round(histogram.percentile(0.99), 2),
+                "max_ms": round(histogram.max_ms, 2),
+                "total_ms": round(histogram.total_ms, 1),
+            })
+        rows.sort(key=lambda row: -row["total_ms"])
+        return rows
+
+    def dump(self, path):
+        import json
+        data = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "handlers": self.report(),
+                "stalls": list(self.stalls)}
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+
+
+monitor = PerfMonitor()
+
+
+def enable_from_environment(root):
+    if os.environ.get("TEXT_EDITOR_PERF"):
+        monitor.enable(root)
+
+
+# --- View -> Performance ---
+def open_panel(root):
+    from tkinter import filedialog, messagebox, ttk
+    panel = tk.Toplevel(root)
+    panel.title("Performance")
+    panel.geometry("760x480")
+
+    controls = tk.Frame(panel)
+    controls.pack(fill=tk.X, padx=5, pady=5)
+    enabled = tk.BooleanVar(value=monitor.enabled)
+
+    def toggle():
+        if enabled.get():
+            monitor.enable(root)
+        else:
+            monitor.disable()
+
+    def save_report():
+        path = filedialog.asksaveasfilename(parent=panel, defaultextension=".json",
+                                            filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+        if path:
+            try:
+                monitor.dump(path)
+            except OSError as error:
+                messagebox.showerror("Performance", f"Could not save the report:\n{error}", parent=panel)
+
+    tk.Checkbutton(controls, text="Measure handlers", variable=enabled, command=toggle).pack(side=tk.LEFT)
+    tk.Button(controls, text="Reset", command=lambda: (monitor.reset(), refresh())).pack(side=tk.LEFT, padx=5)
+    tk.Button(controls, text="Save Report…", command=save_report).pack(side=tk.LEFT)
+
+    columns = ("calls", "p50", "p95", "p99", "max", "total")
+    table = ttk.Treeview(panel, columns=columns, height=12)
+    table.heading("#0", text="Handler")
+    table.column("#0", width=300)
+    for column in columns:
+        table.heading(column, text=column if column == "calls" else f"{column} ms")
+        table.column(column, width=70, anchor=tk.E)
+    table.pack(expand=True, fill=tk.BOTH, padx=5)
+
+    tk.Label(panel, text="Stalls (newest first):", anchor="w").pack(fill=tk.X, padx=5)
+    stall_list = tk.Listbox(panel, height=6, font=("Courier", 10))
+    stall_list.pack(fill=tk.X, padx=5, pady=5)
+
+    def show_stall(event=None):
+        selection = stall_list.curselection()
+        stalls = list(reversed(monitor.stalls))
+        if selection and selection[0] < len(stalls):
+            stall = stalls[selection[0]]
+            messagebox.showinfo("Stall", "\n".join(stall["stack"]) or "No Python code was running.",
+                                parent=panel)
+
+    def refresh():
+        if not panel.winfo_exists():
+            return
+        table.delete(*table.get_children())
+        for row in monitor.report():
+            table.insert("", tk.END, text=row["handler"],
+                         values=(row["calls"], row["p50_ms"], row["p95_ms"], row["p99_ms"],
+                                 row["max_ms"], row["total_ms"]))
+        stall_list.delete(0, tk.END)
+        for stall in reversed(monitor.stalls):
+            duration = f"{stall['duration_ms']} ms" if stall["duration_ms"] is not None else "still stalled"
+            stall_list.insert(tk.END, f"{stall['time']}  {duration:>14}  {stall['handler']}")
+        panel.after(PANEL_REFRESH_MS, refresh)
+
+    stall_list.bind("<Double-Button-1>", show_stall)
+    refresh()
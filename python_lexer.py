@@ -0,0 +1,62 @@
+import keyword
+import re
+
+# --- PYTHON LINE LEXER ---
+# Splits ONE line into (start_col, end_col, tag) tokens with a single pass of
+# a compiled regex alternation. Triple-quoted strings can span several lines,
+# so the lexer also takes the "state" at the start of the line and returns the
+# state at its end:
+#   None    -> normal code
+#   '"""'   -> inside a """ string
+#   "'''"   -> inside a ''' string
+
+TOKEN_PATTERN = re.compile(
+    r"""
+      (?P<comment>\#.*)
+    | (?P<triple>(?<![\w])[rRbBuUfF]{0,2}(?:\"\"\"|'''))
+    | (?P<string>(?<![\w])[rRbBuUfF]{0,2}(?:'(?:\\.|[^'\\])*'?|"(?:\\.|[^"\\])*"?))
+    | (?P<keyword>\b(?:""" + "|".join(keyword.kwlist) + r""")\b)
+    """,
+    re.VERBOSE,
+)
+
+# Finds the end of a triple-quoted string (skipping escaped characters)
+TRIPLE_END = {
+    '"""': re.compile(r'(?:\\.|[^\\])*?"""'),
+    "'''": re.compile(r"(?:\\.|[^\\])*?'''"),
+}
+
+
+class PythonLexer:
+    tags = ("keyword", "string", "comment")
+
+    def tokenize_line(self, line, state=None):
+        tokens = []
+        pos = 0
+
+        # 1. Finish a triple-quoted string left open by a previous line
+        if state is not None:
+            end = TRIPLE_END[state].match(line)
+            if end is None:
+                return [(0, len(line), "string")] if line else [], state
+            tokens.append((0, end.end(), "string"))
+            pos = end.end()
+
+        # 2. Scan the rest of the line in one pass
+        while True:
+            match = TOKEN_PATTERN.search(line, pos)
+            if match is None:
+                return tokens, None
+            kind = match.lastgroup
+            if kind == "triple":
+                quote = match.group()[-3:]
+                end = TRIPLE_END[quote].match(line, match.end())
+                if end is None:
+                    # String continues on the next line
+                    tokens.append((match.start(), len(line), "string"))
+                    return tokens, quote
+                tokens.append((match.start(), end.end(), "string"))
+                pos = end.end()
+            else:
+                tokens.append((match.start(), match.end(), kind))
+                pos = match.end()
@@ -0,0 +1,157 @@
+import sys
+import time
+import types
+
+from perf_monitor import monitor
+
+# --- DEBOUNCED EVENT SCHEDULER ---
+# Key handlers used to do all of their work on every <KeyRelease>. With key
+# auto-repeat that work piles up behind the input. Instead, handlers are
+# registered here once and "triggered" from the bindings:
+#
+#   scheduler.register("status", update_status, delay_ms=16, priority=10)
+#   scheduler.trigger("status")
+#
+# Triggering the same job again before its delay has passed just pushes the
+# deadline back, so a burst of keys runs the job once. All pending jobs share
+# a single Tk timer.
+#
+# A job may return a generator for long-running work. The generator is stepped
+# a little at a time between events, and is thrown away if the job is
+# triggered again (a newer edit makes the old work pointless).
+#
+# While the performance monitor (perf_monitor.py) is on, every job run and
+# generator step is timed under the job's name.
+
+STEP_BUDGET_MS = 8      # time given to background generators per tick
+
+
+def _now_ms():
+    return time.monotonic() * 1000
+
+
+class _Job:
+    __slots__ = ("name", "callback", "delay_ms", "priority", "max_wait_ms",
+                 "due", "first_trigger", "task")
+
+    def __init__(self, name, callback, delay_ms, priority, max_wait_ms):
+        self.name = name
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self.priority = priority        # higher runs first
+        self.max_wait_ms = max_wait_ms  # run at least this often during bursts
+        self.due = None                 # time the job should run, None = idle
+        self.first_trigger = None
+        self.task = None                # in-flight generator, if any
+
+
+class EventScheduler:
+    def __init__(self, widget):
+        self.widget = widget
+        self.jobs = {}
+        self._timer = None
+        self._timer_due = None
+        self._runner = None
+        widget.bind("<Destroy>", self._on_destroy, add="+")
+
+    def register(self, name, callback, delay_ms=0, priority=0, max_wait_ms=None):
+        self.jobs[name] = _Job(name, callback, delay_ms, priority, max_wait_ms)
+
+    # Ask for one or more jobs to run once things have been quiet long enough
+    def trigger(self, *names):
+        now = _now_ms()
+        for name in names:
+            job = self.jobs[name]
+            job.task = None             # newer request, drop in-flight work
+            if job.due is None:
+                job.first_trigger = now
+            job.due = now + job.delay_ms
+            if job.max_wait_ms is not None:
+                job.due = min(job.due, job.first_trigger + job.max_wait_ms)
+        self._reschedule()
+
+    def cancel(self, name):
+        job = self.jobs[name]
+        job.due = None
+        job.task = None
+
+    def _reschedule(self):
+        pending = [job.due for job in self.jobs.values() if job.due is not None]
+        if not pending:
+            return
+        due = min(pending)
+        if self._timer is not None:
+            if self._timer_due <= due:
+                return      # Existing timer fires early enough
+            self.widget.after_cancel(self._timer)
+        delay = max(0, int(due - _now_ms()))
+        self._timer_due = due
+        if delay == 0:
+            self._timer = self.widget.after_idle(self._fire)
+        else:
+            self._timer = self.widget.after(delay, self._fire)
+
+    def _fire(self):
+        self._timer = None
+        now = _now_ms()
+        ready = [job for job in self.jobs.values() if job.due is not None and job.due <= now + 1]
+        ready.sort(key=lambda job: -job.priority)
+        for job in ready:
+            job.due = None
+            # One failing job mustn't stop the others (or the timer for
+            # the jobs still to come)
+            try:
+                if monitor.enabled:
+                    result = monitor.call(f"job: {job.name}", job.callback)
+                else:
+                    result = job.callback()
+            except Exception:
+                self._report_error()
+                continue
+            if isinstance(result, types.GeneratorType):
+                job.task = result
+        if any(job.task is not None for job in self.jobs.values()):
+            self._start_runner()
+        self._reschedule()
+
+    # --- Step in-flight generators without blocking input ---
+    def _start_runner(self):
+        if self._runner is None:
+            self._runner = self.widget.after(1, self._run_tasks)
+
+    def _run_tasks(self):
+        self._runner = None
+        deadline = _now_ms() + STEP_BUDGET_MS
+        busy = sorted((job for job in self.jobs.values() if job.task is not None),
+                      key=lambda job: -job.priority)
+        for job in busy:
+            while job.task is not None and _now_ms() < deadline:
+                try:
+                    if monitor.enabled:
+                        monitor.call(f"job: {job.name} (step)", next, job.task)
+                    else:
+                        next(job.task)
+                except StopIteration:
+                    job.task = None
+                except Exception:
+                    job.task = None     # the rest of this work is dropped
+                    self._report_error()
+            if _now_ms() >= deadline:
+                break
+        if any(job.task is not None for job in self.jobs.values()):
+            self._start_runner()
+
+    # Shown the way Tk shows an error in any other callback
+    def _report_error(self):
+        self.widget._root().report_callback_exception(*sys.exc_info())
+
+    def _on_destroy(self, event):
+        if event.widget is not self.widget:
+            return
+        for job_id in (self._timer, self._runner):
+            if job_id is not None:
+                self.widget.after_cancel(job_id)
+        self._timer = self._runner = None
+        for job in self.jobs.values():
+            job.due = None
+            job.task = None
@@ -0,0 +1,236 @@
+import re
+import tkinter as tk
+from array import array
+from bisect import bisect_left
+
+# --- FIND ENGINE ---
+# The old Find All called text.search over and over and tagged every match.
+# Searching for "e" in a big file made hundreds of thousands of tag ranges,
+# and Tk slowed down on every redraw after that.
+#
+# The SearchEngine runs one compiled regular expression over the document
+# text (read from the TextBuffer) and keeps the match offsets in two arrays.
+# Only the matches on screen (plus a small margin) are tagged; scrolling
+# re-tags the new part of the view. Next/Previous walk the arrays, so the
+# match count and navigation don't depend on the number of tags.
+#
+# Modes: literal or regex, whole word, match case.
+#
+#   engine.find_all("foo", whole_word=True)  -> number of matches
+#   engine.find_next() / engine.find_previous()
+#   engine.replace_all("bar", on_done)
+#
+# Replace All doesn't rewrite the document. It works out the matches once,
+# then replaces them one by one from the end of the file backwards (so the
+# offsets before each match stay valid), a small batch per idle tick. Only
+# matches whose text actually changes are touched, so tags, marks, the cursor
+# and the scroll position survive, and the whole thing is one undo step.
+
+MATCH_TAG = "found"             # all matches near the view
+CURRENT_TAG = "found_current"   # the match the cursor is on
+MAX_TAGGED = 1000               # never tag more matches than this at once
+VIEW_MARGIN_LINES = 50          # lines above/below the view that get tagged
+VIEW_DELAY_MS = 16
+REFRESH_DELAY_MS = 300          # re-run the search this long after typing stops
+REPLACE_BATCH = 50              # replacements between checks of the time budget
+
+
+# Turn the Find options into a compiled pattern (re.error for bad regexes)
+def compile_pattern(term, regex=False, whole_word=False, match_case=True):
+    source = term if regex else re.escape(term)
+    if whole_word:
+        # \b doesn't work for terms that start/end with punctuation
+        source = rf"(?<!\w)(?:{source})(?!\w)"
+    flags = re.MULTILINE
+    if not match_case:
+        flags |= re.IGNORECASE
+    return re.compile(source, flags)
+
+
+class SearchEngine:
+    def __init__(self, text_widget, hooks, buffer, scheduler, undo_manager=None):
+        self.text = text_widget
+        self.buffer = buffer
+        self.scheduler = scheduler
+        self.undo_manager = undo_manager    # Replace All is one step in it
+        self.pattern = None
+        self.starts = array("q")    # match start offsets, in order
+        self.ends = array("q")
+        self.current = -1           # index of the selected match
+        self.stale = False          # the text changed since the last search
+        self.on_results = None      # called with (current, count) after changes
+        self.replacing = False      # a Replace All is running, input is blocked
+        text_widget.tag_config(MATCH_TAG, background="yellow", foreground="black")
+        text_widget.tag_config(CURRENT_TAG, background="orange", foreground="black")
+        text_widget.tag_raise(CURRENT_TAG, MATCH_TAG)
+        scheduler.register("search_view", self.tag_visible, delay_ms=VIEW_DELAY_MS)
+        scheduler.register("search_refresh", self.refresh, delay_ms=REFRESH_DELAY_MS)
+        scheduler.register("replace_all", self._replace_job)
+        self._replace_task = None
+        hooks.add_edit_listener(self.on_edit)
+        hooks.add_view_listener(self.on_view_change)
+
+    @property
+    def count(self):
+        return len(self.starts)
+
+    def find_all(self, term, regex=False, whole_word=False, match_case=True):
+        self.pattern = compile_pattern(term, regex, whole_word, match_case) if term else None
+        self.current = -1
+        self.refresh()
+        return self.count
+
+    # Scan the whole document in one pass
+    def refresh(self):
+        self.starts = array("q")
+        self.ends = array("q")
+        self.stale = False
+        if self.pattern is not None:
+            for match in self.pattern.finditer(self.buffer.get_text()):
+                start, end = match.span()
+                if start != end:    # a regex like "a*" also matches nothing
+                    self.starts.append(start)
+                    self.ends.append(end)
+        if self.current >= self.count:
+            self.current = -1
+        self.tag_visible()
+        self._report()
+
+    def clear(self):
+        self.pattern = None
+        self.starts = array("q")
+        self.ends = array("q")
+        self.current = -1
+        self.scheduler.cancel("search_refresh")
+        self.text.tag_remove(MATCH_TAG, "1.0", tk.END)
+        self.text.tag_remove(CURRENT_TAG, "1.0", tk.END)
+
+    # --- Keeping up with edits and scrolling ---
+    def on_edit(self, event):
+        if self.pattern is not None and not self.replacing:
+            self.stale = True
+            self.scheduler.trigger("search_refresh")
+
+    def on_view_change(self, first, last):
+        if self.pattern is not None and not self.stale:
+            self.scheduler.trigger("search_view")
+
+    # Tag the matches in and around the visible lines, at most MAX_TAGGED
+    def tag_visible(self):
+        self.text.tag_remove(MATCH_TAG, "1.0", tk.END)
+        self.text.tag_remove(CURRENT_TAG, "1.0", tk.END)
+        if not self.starts:
+            return
+        top = int(self.text.index("@0,0").split(".")[0]) - 1
+        bottom = int(self.text.index(f"@0,{self.text.winfo_height()}").split(".")[0])
+        view_start = self.buffer.line_start(top - VIEW_MARGIN_LINES)
+        view_end = self.buffer.line_start(bottom + VIEW_MARGIN_LINES)
+
+        first = bisect_left(self.ends, view_start + 1)
+        last = min(bisect_left(self.starts, view_end), first + MAX_TAGGED)
+        ranges = []
+        for i in range(first, last):
+            ranges.append(self.buffer.offset_to_index(self.starts[i]))
+            ranges.append(self.buffer.offset_to_index(self.ends[i]))
+        if ranges:
+            self.text.tag_add(MATCH_TAG, *ranges)
+        if 0 <= self.current < self.count:
+            self.text.tag_add(CURRENT_TAG, *self._indexes(self.current))
+
+    # --- Next / Previous ---
+    def find_next(self):
+        if self.stale:
+            self.refresh()
+        if not self.starts:
+            return -1
+        i = bisect_left(self.starts, self._cursor())
+        return self._select(i if i < self.count else 0)    # wrap around
+
+    def find_previous(self):
+        if self.stale:
+            self.refresh()
+        if not self.starts:
+            return -1
+        cursor = self._cursor()
+        # The cursor sits at the end of the selected match, step over it
+        if 0 <= self.current < self.count and self.ends[self.current] == cursor:
+            cursor = self.starts[self.current]
+        i = bisect_left(self.starts, cursor) - 1
+        return self._select(i if i >= 0 else self.count - 1)
+
+    def _cursor(self):
+        return self.buffer.index_to_offset(self.text.index(tk.INSERT))
+
+    def _indexes(self, i):
+        return (self.buffer.offset_to_index(self.starts[i]),
+                self.buffer.offset_to_index(self.ends[i]))
+
+    def _select(self, i):
+        self.current = i
+        start, end = self._indexes(i)
+        self.text.mark_set(tk.INSERT, end)
+        self.text.see(start)
+        self.tag_visible()
+        self._report()
+        return i
+
+    def _report(self):
+        if self.on_results:
+            self.on_results(self.current, self.count)
+
+    # --- Replace All ---
+    # `replacement` is literal text, or a template like r"\1" when the
+    # pattern came from a regex search (a bad template raises re.error).
+    # on_done(count) runs when the last replacement is in.
+    def replace_all(self, replacement, regex=False, on_done=None):
+        if self.pattern is None or self.replacing:
+            return False
+        # A reload (file_watch.py) is putting new text in: our offsets would be stale
+        if getattr(self.text, "reloader", None):
+            return False
+        # Work out every change up front: (start, end, new text)
+        changes = []
+        for match in self.pattern.finditer(self.buffer.get_text()):
+            if match.end() == match.start():
+                continue
+            new = match.expand(replacement) if regex else replacement
+            if new != match.group():
+                changes.append((match.start(), match.end(), new))
+
+        # From here on the offsets must not move under us: no typing until
+        # the last batch is in
+        self.replacing = True
+        self.text.config(state=tk.DISABLED)
+        self._replace_task = self._apply_changes(changes, on_done)
+        self.scheduler.trigger("replace_all")
+        return True
+
+    # Hands the batches to the scheduler, which steps them between events
+    def _replace_job(self):
+        task, self._replace_task = self._replace_task, None
+        return task
+
+    def _apply_changes(self, changes, on_done):
+        text = self.text
+        # All the replacements are undone in one step
+        if self.undo_manager:
+            self.undo_manager.begin_group()
+        try:
+            for batch_end in range(len(changes), 0, -REPLACE_BATCH):
+                # The widget is only editable while a batch is applied
+                text.config(state=tk.NORMAL)
+                for start, end, new in reversed(changes[max(0, batch_end - REPLACE_BATCH):batch_end]):
+                    text.replace(self.buffer.offset_to_index(start),
+                                 self.buffer.offset_to_index(end), new)
+                text.config(state=tk.DISABLED)
+                yield
+        finally:
+            self.replacing = False
+            if self.undo_manager:
+                self.undo_manager.end_group()
+            if text.winfo_exists():
+                text.config(state=tk.NORMAL)
+        self.current = -1
+        self.refresh()
+        if on_done:
+            on_done(len(changes))
@@ -0,0 +1,142 @@
+import codecs
+import json
+import os
+import zlib
+
+from file_io import atomic_write
+
+# --- SESSIONS ---
+# On exit the editor writes down which tabs were open, where the cursor and
+# view were, the font sizes, and the text of documents with unsaved
+# changes. On the next start the tabs come back right away, but a file is
+# only read when its tab is first selected, so starting up costs the same
+# with 3 tabs as with 30.
+#
+# Files written to ~/.cache/text-editor/session-<name>/:
+#   session.json     the tab list (small)
+#   unsaved-N.z      zlib-compressed text of a modified document
+#
+#   save_session("advanced", entries, selected=2)
+#   entries, selected = load_session("advanced")     # or None
+
+SESSION_VERSION = 1
+READ_SIZE = 256 * 1024
+
+
+def session_dir(name):
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache, "text-editor", f"session-{name}")
+
+
+# --- What is stored per tab ---
+# A dict that json can write. "buffer" (a TextBuffer with unsaved text) is
+# taken out and written to its own file before the JSON is saved.
+def document_entry(doc):
+    text = doc.text
+    entry = {
+        "title": doc.title,
+        "path": doc.path,
+        "kind": doc.kind,
+        "cursor": doc.cursor,
+        "top": doc.top,
+        "styles": doc.styles,
+        "unsaved": doc.pending,     # still not loaded since the last session
+        "buffer": None,
+    }
+    large_view = getattr(text, "large_view", None)
+    if large_view:
+        # The widget only shows a window of the file: remember the line
+        entry["cursor"] = entry["top"] = f"{large_view.current_line() + 1}.0"
+    elif text is not None:
+        if getattr(text, "loader", None):
+            return entry            # half loaded, the file on disk is the truth
+        entry["cursor"] = text.index("insert")
+        entry["top"] = text.index("@0,0")
+        styles = getattr(text, "styles", None)
+        entry["styles"] = styles.serialize() if styles else None
+    # Large-file edits live in the view's overlay and aren't kept
+    if doc.kind == "text" and doc.buffer is not None:
+        entry["unsaved"] = None
+        if doc.is_modified() or not doc.path:
+            entry["buffer"] = doc.buffer.snapshot()
+    return entry
+
+
+def compress_chunks(chunks):
+    compressor = zlib.compressobj(1)    # fast; text still shrinks a lot
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def save_session(name, entries, selected=0):
+    folder = session_dir(name)
+    os.makedirs(folder, exist_ok=True)
+    # Tabs never opened since the last session keep their old file
+    used = {entry["unsaved"] for entry in entries
+            if entry.get("buffer") is None and entry.get("unsaved")}
+    number = 0
+    tabs = []
+    for entry in entries:
+        entry = dict(entry)
+        buffer = entry.pop("buffer", None)
+        if buffer is not None and len(buffer):
+            while f"unsaved-{number}.z" in used:
+                number += 1
+            entry["unsaved"] = f"unsaved-{number}.z"
+            atomic_write(os.path.join(folder, entry["unsaved"]),
+                         compress_chunks(buffer.iter_chunks()), binary=True)
+        elif buffer is not None:
+            entry["unsaved"] = None
+        if entry["unsaved"]:
+            used.add(entry["unsaved"])
+        tabs.append(entry)
+
+    data = {"version": SESSION_VERSION, "selected": selected, "tabs": tabs}
+    atomic_write(os.path.join(folder, "session.json"), [json.dumps(data)])
+
+    # Unsaved text nobody points to any more
+    for file_name in os.listdir(folder):
+        if file_name.startswith("unsaved-") and file_name not in used:
+            try:
+                os.remove(os.path.join(folder, file_name))
+            except OSError:
+                pass
+
+
+# Returns (entries, selected index), or None if there is no usable session
+def load_session(name):
+    try:
+        with open(os.path.join(session_dir(name), "session.json"), encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != SESSION_VERSION or not data.get("tabs"):
+        return None
+    return data["tabs"], data.get("selected", 0)
+
+
+def unsaved_path(name, file_name):
+    return os.path.join(session_dir(name), file_name)
+
+
+# Yields (text, percent) from a file written with compress_chunks, for TextLoader
+def iter_compressed_text(path):
+    size = os.path.getsize(path) or 1
+    decompressor = zlib.decompressobj()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    done = 0
+    with open(path, "rb") as file:
+        while True:
+            data = file.read(READ_SIZE)
+            done += len(data)
+            if not data:
+                text = decoder.decode(decompressor.flush(), final=True)
+                if text:
+                    yield text, 100
+                return
+            text = decoder.decode(decompressor.decompress(data))
+            if text:
+                yield text, min(100, done * 100 // size)
@@ -0,0 +1,65 @@
+import re
+
+# --- SQL LINE LEXER ---
+# Same interface as python_lexer.py. Keywords are matched in any case.
+# /* block comments */ can span several lines, so the state is:
+#   None    -> normal SQL
+#   "/*"    -> inside a block comment
+
+KEYWORDS = (
+    "add", "all", "alter", "and", "as", "asc", "begin", "between", "by", "case", "check",
+    "column", "commit", "constraint", "create", "cross", "default", "delete", "desc",
+    "distinct", "drop", "else", "end", "exists", "foreign", "from", "full", "group",
+    "having", "if", "in", "index", "inner", "insert", "into", "is", "join", "key", "left",
+    "like", "limit", "not", "null", "offset", "on", "or", "order", "outer", "primary",
+    "references", "returning", "right", "rollback", "select", "set", "table", "then",
+    "transaction", "union", "unique", "update", "using", "values", "view", "when",
+    "where", "with",
+)
+
+TOKEN_PATTERN = re.compile(
+    r"""
+      (?P<comment>--.*)
+    | (?P<block>/\*)
+    | (?P<string>'(?:''|[^'])*'?)
+    | (?P<number>\b\d+(?:\.\d+)?\b)
+    | (?P<keyword>\b(?:""" + "|".join(KEYWORDS) + r""")\b)
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+
+BLOCK_END = re.compile(r".*?\*/")
+
+
+class SqlLexer:
+    tags = ("keyword", "string", "comment", "number")
+
+    def tokenize_line(self, line, state=None):
+        tokens = []
+        pos = 0
+
+        # 1. Finish a block comment left open by a previous line
+        if state is not None:
+            end = BLOCK_END.match(line)
+            if end is None:
+                return [(0, len(line), "comment")] if line else [], state
+            tokens.append((0, end.end(), "comment"))
+            pos = end.end()
+
+        # 2. Scan the rest of the line in one pass
+        while True:
+            match = TOKEN_PATTERN.search(line, pos)
+            if match is None:
+                return tokens, None
+            kind = match.lastgroup
+            if kind == "block":
+                end = BLOCK_END.match(line, match.end())
+                if end is None:
+                    # Comment continues on the next line
+                    tokens.append((match.start(), len(line), "comment"))
+                    return tokens, "/*"
+                tokens.append((match.start(), end.end(), "comment"))
+                pos = end.end()
+            else:
+                tokens.append((match.start(), match.end(), kind))
+                pos = match.end()
@@ -0,0 +1,163 @@
+from bisect import bisect_left, bisect_right
+
+# --- STYLE RUNS (FONT SIZES) ---
+# Changing the font size used to add a new "size_N" tag over the selection
+# without removing the older ones, so resizing the same text again and again
+# stacked more and more overlapping tags that Tk had to sort out on every
+# redraw.
+#
+# StyleRuns keeps the formatting as a sorted list of non-overlapping runs
+#   (start offset, end offset, size)
+# where neighbouring runs with the same size are merged. Setting a size only
+# touches the widget where the size really changes: the old tag is removed
+# from those pieces and the new one added, so every character carries at
+# most one size tag.
+#
+# The runs follow edits (via text_hooks.py) the same way Tk moves tags:
+# text typed inside a run becomes part of it, text typed at its edge doesn't.
+#
+#   styles.set_size(start, end, 20)     # offsets from the TextBuffer
+#   saved = styles.serialize()          # [[start, end, size], ...]
+#   styles.restore(saved)
+
+TAG_PREFIX = "size_"
+
+
+def size_tag(size):
+    return f"{TAG_PREFIX}{size}"
+
+
+class StyleRuns:
+    def __init__(self, text_widget, hooks, buffer, font_family="Helvetica"):
+        self.text = text_widget
+        self.buffer = buffer
+        self.font_family = font_family
+        self.starts = []
+        self.ends = []
+        self.sizes = []
+        hooks.add_edit_listener(self.on_edit)
+
+    def __len__(self):
+        return len(self.starts)
+
+    # --- Follow edits ---
+    def on_edit(self, event):
+        if event.kind == "reset":
+            self.reload_from_tags()
+            return
+        length = len(event.text)
+        offset = event.offset
+        if event.kind == "insert":
+            # Runs after the insert move; a run around it grows
+            for i in range(bisect_right(self.ends, offset), len(self.starts)):
+                if self.starts[i] >= offset:
+                    self.starts[i] += length
+                self.ends[i] += length
+            return
+
+        end = offset + length
+        for i in range(bisect_right(self.ends, offset), len(self.starts)):
+            self.starts[i] = self._after_delete(self.starts[i], offset, end)
+            self.ends[i] = self._after_delete(self.ends[i], offset, end)
+        self._drop_empty_and_merge()
+
+    @staticmethod
+    def _after_delete(position, start, end):
+        if position <= start:
+            return position
+        if position >= end:
+            return position - (end - start)
+        return start
+
+    def _drop_empty_and_merge(self):
+        starts, ends, sizes = [], [], []
+        for start, end, size in zip(self.starts, self.ends, self.sizes):
+            if start >= end:
+                continue
+            if ends and ends[-1] == start and sizes[-1] == size:
+                ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+                sizes.append(size)
+        self.starts, self.ends, self.sizes = starts, ends, sizes
+
+    # --- Changing formatting ---
+    # Give [start, end) the font size `size` (None = back to the default)
+    def set_size(self, start, end, size):
+        if start >= end:
+            return
+        first = bisect_right(self.ends, start)
+        last = bisect_left(self.starts, end)
+
+        # The pieces of [start, end) that change, and what they were before
+        changes = []
+        position = start
+        for i in range(first, last):
+            run_start = max(start, self.starts[i])
+            run_end = min(end, self.ends[i])
+            if position < run_start and size is not None:
+                changes.append((position, run_start, None))     # unstyled gap
+            if self.sizes[i] != size:
+                changes.append((run_start, run_end, self.sizes[i]))
+            position = run_end
+        if position < end and size is not None:
+            changes.append((position, end, None))
+
+        # Replace the runs in the model: keep the parts outside [start, end)
+        new_runs = []
+        if first < last and self.starts[first] < start:
+            new_runs.append((self.starts[first], start, self.sizes[first]))
+        if size is not None:
+            new_runs.append((start, end, size))
+        if first < last and self.ends[last - 1] > end:
+            new_runs.append((end, self.ends[last - 1], self.sizes[last - 1]))
+        self.starts[first:last] = [run[0] for run in new_runs]
+        self.ends[first:last] = [run[1] for run in new_runs]
+        self.sizes[first:last] = [run[2] for run in new_runs]
+        self._drop_empty_and_merge()
+
+        # Apply only the difference to the widget
+        if size is not None:
+            self._configure(size)
+        for piece_start, piece_end, old_size in changes:
+            first_index = self.buffer.offset_to_index(piece_start)
+            last_index = self.buffer.offset_to_index(piece_end)
+            if old_size is not None:
+                self.text.tag_remove(size_tag(old_size), first_index, last_index)
+            if size is not None:
+                self.text.tag_add(size_tag(size), first_index, last_index)
+
+    def _configure(self, size):
+        self.text.tag_config(size_tag(size), font=(self.font_family, size))
+
+    # --- Saving and restoring ---
+    def serialize(self):
+        return [[start, end, size] for start, end, size in zip(self.starts, self.ends, self.sizes)]
+
+    def restore(self, runs):
+        self.clear()
+        for start, end, size in runs:
+            self.set_size(start, end, size)
+
+    def clear(self):
+        for size in set(self.sizes):
+            self.text.tag_remove(size_tag(size), "1.0", "end")
+        self.starts, self.ends, self.sizes = [], [], []
+
+    # Rebuild the runs from the widget's tags (after edits we couldn't follow)
+    def reload_from_tags(self):
+        runs = []
+        for tag in self.text.tag_names():
+            if not tag.startswith(TAG_PREFIX):
+                continue
+            size = int(tag[len(TAG_PREFIX):])
+            ranges = self.text.tag_ranges(tag)
+            for i in range(0, len(ranges), 2):
+                runs.append((self.buffer.index_to_offset(str(ranges[i])),
+                             self.buffer.index_to_offset(str(ranges[i + 1])), size))
+        runs.sort()
+        self.starts = [run[0] for run in runs]
+        self.ends = [run[1] for run in runs]
+        self.sizes = [run[2] for run in runs]
+        self._drop_empty_and_merge()
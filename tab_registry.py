@@ -0,0 +1,137 @@
+from collections import OrderedDict
+
+# --- TAB / DOCUMENT REGISTRY ---
+# Every open tab used to own a full tk.Text with its contents, and finding
+# the Text of a tab meant searching the tab frame's children each time.
+#
+# The registry maps each notebook tab id to a small DocumentState. The
+# document text itself lives in the state's TextBuffer, so a tab doesn't
+# need a Text widget to exist. Only the selected tab and the few most
+# recently used ones keep a live widget; older ones are "parked": their
+# cursor, scroll position and font sizes are remembered and the widget is
+# destroyed. Selecting a parked tab builds a new widget from the buffer and
+# puts everything back where it was.
+#
+#   registry = TabRegistry(notebook, materialize=build_text, can_park=is_idle)
+#   registry.add(frame, DocumentState(title, path))
+#   registry.current().text     # live Text of the selected tab
+
+LIVE_TABS = 4       # tabs that keep their Text widget (the selected one included)
+
+
+class DocumentState:
+    __slots__ = ("frame", "title", "path", "encoding", "buffer", "text",
+                 "dirty", "cursor", "top", "styles", "kind", "pending", "symbols")
+
+    def __init__(self, title="Untitled", path=None, encoding="utf-8", kind="text"):
+        self.frame = None       # the notebook page
+        self.title = title
+        self.path = path
+        self.encoding = encoding
+        self.kind = kind        # "text", or "large" for a memory-mapped file
+        self.buffer = None      # TextBuffer, None until the text is loaded
+        self.text = None        # live tk.Text, None while parked
+        self.dirty = False      # unsaved changes (only kept while parked)
+        self.cursor = "1.0"     # insert mark, saved when parked
+        self.top = "1.0"        # first visible index, saved when parked
+        self.styles = None      # font-size runs (style_runs.py), saved when parked
+        self.pending = None     # unsaved text from the last session, not read in yet
+        self.symbols = None     # outline (outline.py), saved when parked
+
+    @property
+    def is_live(self):
+        return self.text is not None
+
+    def is_modified(self):
+        if self.text is None:
+            return self.dirty
+        large_view = getattr(self.text, "large_view", None)
+        return large_view.is_dirty if large_view else bool(self.text.edit_modified())
+
+
+class TabRegistry:
+    def __init__(self, notebook, materialize, can_park=None, live_tabs=LIVE_TABS):
+        self.notebook = notebook
+        self.materialize = materialize  # called with a parked DocumentState
+        self.can_park = can_park        # called with a live DocumentState
+        self.live_tabs = live_tabs
+        self.docs = {}                  # tab id -> DocumentState
+        self.recent = OrderedDict()     # tab ids with a live widget, oldest first
+
+    def add(self, frame, doc):
+        doc.frame = frame
+        self.docs[str(frame)] = doc
+        return doc
+
+    def remove(self, tab_id):
+        self.recent.pop(str(tab_id), None)
+        return self.docs.pop(str(tab_id), None)
+
+    def get(self, tab_id):
+        return self.docs.get(str(tab_id))
+
+    def current(self):
+        tab_id = self.notebook.select()
+        return self.docs.get(str(tab_id)) if tab_id else None
+
+    def live_docs(self):
+        return [doc for doc in self.docs.values() if doc.text is not None]
+
+    # --- Selection: bring the tab back, park the oldest ones ---
+    def on_tab_changed(self, event=None):
+        doc = self.current()
+        if doc is None:
+            return
+        if doc.text is None:
+            # A document that was never loaded (restored from a session) is
+            # read in by materialize(), which restores it once the text is in
+            loaded = doc.buffer is not None
+            self.materialize(doc)
+            if loaded:
+                self.restore(doc)
+        self.touch(doc)
+
+    def touch(self, doc):
+        tab_id = str(doc.frame)
+        self.recent.pop(tab_id, None)
+        self.recent[tab_id] = True
+        self._park_old()
+
+    def _park_old(self):
+        selected = str(self.notebook.select())
+        for tab_id in list(self.recent):
+            if len(self.recent) <= self.live_tabs:
+                break
+            doc = self.docs.get(tab_id)
+            if doc is None or doc.text is None:
+                self.recent.pop(tab_id, None)
+            elif tab_id != selected and (self.can_park is None or self.can_park(doc)):
+                self.park(doc)
+
+    def park(self, doc):
+        text = doc.text
+        doc.cursor = text.index("insert")
+        doc.top = text.index("@0,0")
+        doc.dirty = doc.is_modified()
+        doc.buffer = text.buffer
+        styles = getattr(text, "styles", None)
+        doc.styles = styles.serialize() if styles else None
+        outline = getattr(text, "outline", None)
+        doc.symbols = outline.symbols if outline else None
+        doc.text = None
+        self.recent.pop(str(doc.frame), None)
+        text.destroy()
+
+    def restore(self, doc):
+        text = doc.text
+        if text is None:
+            return
+        styles = getattr(text, "styles", None)
+        if doc.styles and styles is not None:
+            styles.restore(doc.styles)
+        outline = getattr(text, "outline", None)
+        if doc.symbols and outline is not None:
+            outline.restore(doc.symbols)
+        text.edit_modified(doc.dirty)
+        text.mark_set("insert", doc.cursor)
+        text.yview(doc.top)
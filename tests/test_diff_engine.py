@@ -0,0 +1,158 @@
+import random
+import time
+
+import diff_engine
+from diff_engine import DiffJob, diff_ids, diff_lines, line_ids, split_segments
+
+
+def apply_hunks(a, b, hunks):
+    # Rebuild b from a: lines outside the hunks must be equal on both sides
+    result = []
+    position = 0
+    for a_start, a_end, b_start, b_end in hunks:
+        assert a_start >= position
+        result += a[position:a_start]
+        result += b[b_start:b_end]
+        position = a_end
+    return result + a[position:]
+
+
+def check(a, b, hunks):
+    assert apply_hunks(a, b, hunks) == b
+    # The lines kept on both sides line up, too
+    a_position = b_position = 0
+    for a_start, a_end, b_start, b_end in hunks:
+        assert a_start - a_position == b_start - b_position
+        assert a[a_position:a_start] == b[b_position:b_start]
+        a_position, b_position = a_end, b_end
+
+
+def edit_distance(a, b):
+    # Lines removed + lines added by the shortest edit (plain LCS table)
+    table = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) - 1, -1, -1):
+        for j in range(len(b) - 1, -1, -1):
+            if a[i] == b[j]:
+                table[i][j] = table[i + 1][j + 1] + 1
+            else:
+                table[i][j] = max(table[i + 1][j], table[i][j + 1])
+    return len(a) + len(b) - 2 * table[0][0]
+
+
+def cost(hunks):
+    return sum((a_end - a_start) + (b_end - b_start) for a_start, a_end, b_start, b_end in hunks)
+
+
+def random_pair(rng, size, alphabet):
+    a = [rng.choice(alphabet) for _ in range(rng.randrange(size))]
+    b = list(a)
+    for _ in range(rng.randrange(6)):
+        position = rng.randrange(len(b) + 1)
+        if b and rng.random() < 0.5:
+            del b[position:position + rng.randrange(1, 4)]
+        else:
+            b[position:position] = [rng.choice(alphabet) for _ in range(rng.randrange(1, 4))]
+    return a, b
+
+
+def test_simple_hunks():
+    a = ["one", "two", "three", "four"]
+    b = ["one", "2", "three", "four", "five"]
+    assert diff_lines(a, b) == [(1, 2, 1, 2), (4, 4, 4, 5)]
+    assert diff_lines(a, a) == []
+    assert diff_lines([], ["x"]) == [(0, 0, 0, 1)]
+    assert diff_lines(["x"], []) == [(0, 1, 0, 0)]
+
+
+def test_diff_ids_is_shortest():
+    rng = random.Random(3)
+    for _ in range(300):
+        a, b = random_pair(rng, 15, "abc")
+        hunks = diff_ids(a, b)
+        check(a, b, hunks)
+        assert cost(hunks) == edit_distance(a, b)
+
+
+def test_diff_lines_rebuilds_the_other_side():
+    rng = random.Random(4)
+    for _ in range(300):
+        a, b = random_pair(rng, 40, ["x", "y", "z", "{", "}", "unique"])
+        a = [f"{line}{i}" if line == "unique" else line for i, line in enumerate(a)]
+        check(a, b, diff_lines(a, b))
+
+
+def test_too_different_is_one_replaced_block():
+    a = list(range(0, 400, 2)) + ["same"]
+    b = list(range(1, 400, 2)) + ["same"]
+    a[::7] = b[::7]
+    hunks = diff_ids(a, b, max_cost=5)
+    check(a, b, hunks)
+    assert hunks == [(1, 200, 1, 200)]
+    check(a, b, diff_ids(a, b))
+
+
+def test_unique_lines_anchor_the_segments():
+    a, b = line_ids(["def f():", "}", "x", "def g():", "}"],
+                    ["def f():", "}", "y", "def g():", "}"])
+    assert split_segments(a, b) == [(2, 3, 2, 3)]
+    # A moved line can't pull everything after it out of place
+    a, b = line_ids(["a", "b", "c", "d"], ["b", "c", "d", "a"])
+    segments = split_segments(a, b)
+    assert segments == [(0, 1, 0, 0), (4, 4, 3, 4)]
+
+
+class FakeWidget:
+    def __init__(self):
+        self.timers = []
+
+    def after(self, delay, callback):
+        self.timers.append(callback)
+
+    def winfo_exists(self):
+        return True
+
+    def run(self, timeout=30):
+        end = time.monotonic() + timeout
+        while self.timers and time.monotonic() < end:
+            self.timers.pop(0)()
+            time.sleep(0.01)
+        assert not self.timers, "the job never finished"
+
+
+def run_job(left, right):
+    widget = FakeWidget()
+    seen = {"hunks": []}
+    job = DiffJob(widget, lambda: left, lambda: right,
+                  on_texts=lambda *texts: seen.update(texts=texts),
+                  on_hunks=seen["hunks"].extend,
+                  on_done=lambda cancelled, error: seen.update(done=(cancelled, error)))
+    job.start()
+    widget.run()
+    return seen
+
+
+def numbered_texts(count):
+    a = [f"line {i}" for i in range(count)]
+    b = list(a)
+    for i in range(count - 10, 0, -count // 7):
+        b[i] = "changed"
+        del b[i + 3]
+        b.insert(i + 5, "added")
+    return a, b
+
+
+def test_diff_job_hands_over_texts_and_hunks():
+    a, b = numbered_texts(300)
+    seen = run_job("\n".join(a), "\n".join(b))
+    assert seen["done"] == (False, None)
+    assert seen["texts"] == ("\n".join(a), "\n".join(b))
+    assert seen["hunks"] == diff_lines(a, b)
+
+
+def test_diff_job_in_the_pool_keeps_hunks_in_order(monkeypatch):
+    monkeypatch.setattr(diff_engine, "POOL_MIN_LINES", 10)
+    monkeypatch.setattr(diff_engine, "JOB_LINES", 2)
+    a, b = numbered_texts(1000)
+    seen = run_job("\n".join(a), "\n".join(b))
+    assert seen["done"] == (False, None)
+    assert seen["hunks"] == diff_lines(a, b)
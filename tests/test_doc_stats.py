@@ -0,0 +1,79 @@
+import random
+
+from doc_stats import DocumentStats, count_words_in_chunks
+from text_buffer import TextBuffer
+from text_hooks import EditEvent
+
+
+class FakeHooks:
+    def __init__(self):
+        self.listeners = []
+
+    def add_edit_listener(self, listener):
+        self.listeners.append(listener)
+
+    def edit(self, buffer, kind, offset, text=None, end=None):
+        if kind == "insert":
+            buffer.insert(offset, text)
+        else:
+            text = buffer.get_text(offset, end)
+            buffer.delete(offset, end)
+        event = EditEvent(kind, "1.0", "1.0", text)
+        event.offset = offset
+        for listener in self.listeners:
+            listener(event)
+
+
+def make_stats(content):
+    buffer = TextBuffer(content)
+    hooks = FakeHooks()
+    return DocumentStats(None, hooks, buffer), hooks, buffer
+
+
+def counts(stats):
+    return stats.words, stats.chars, stats.lines
+
+
+def recounted(buffer):
+    stats, _, _ = make_stats(buffer.get_text())
+    return counts(stats)
+
+
+def test_words_cut_by_chunks_are_counted_once():
+    assert count_words_in_chunks(["hel", "lo wor", "ld"]) == 2
+    assert count_words_in_chunks(["one ", "", "two", " three"]) == 3
+    assert count_words_in_chunks(["a", "b", "c"]) == 1
+    assert count_words_in_chunks([]) == 0
+
+
+def test_typing_joins_and_splits_words():
+    stats, hooks, buffer = make_stats("hello world")
+    assert counts(stats) == (2, 11, 1)
+    hooks.edit(buffer, "delete", 5, end=6)      # "helloworld"
+    assert stats.words == 1
+    hooks.edit(buffer, "insert", 2, "\n")       # "he\nlloworld"
+    assert counts(stats) == (2, 11, 2)
+    hooks.edit(buffer, "insert", 0, "  ")       # spaces only, no new word
+    assert stats.words == 2
+
+
+def test_random_edits_match_a_full_recount():
+    rng = random.Random(2)
+    stats, hooks, buffer = make_stats("the quick brown fox\njumps over\n")
+    for _ in range(500):
+        if len(buffer) and rng.random() < 0.4:
+            start = rng.randrange(len(buffer))
+            end = min(len(buffer), start + rng.randrange(1, 8))
+            hooks.edit(buffer, "delete", start, end=end)
+        else:
+            offset = rng.randrange(len(buffer) + 1)
+            hooks.edit(buffer, "insert", offset, rng.choice(["a", " ", "\n", "b c", "word\n\tnext", "  x  "]))
+        assert counts(stats) == recounted(buffer)
+
+
+def test_reset_recounts():
+    stats, hooks, buffer = make_stats("one two")
+    buffer.set_text("one two three\nfour")
+    for listener in hooks.listeners:
+        listener(EditEvent("reset", "1.0", "end", None))
+    assert counts(stats) == (4, 18, 2)
@@ -0,0 +1,145 @@
+import os
+
+import pytest
+
+import edit_journal
+from edit_journal import EditJournal, discard_journal, find_orphans, flush_journals, recover
+from text_buffer import TextBuffer
+from text_hooks import EditEvent
+
+
+class FakeText:
+    def bind(self, *args, **options):
+        pass
+
+
+class FakeHooks:
+    def __init__(self):
+        self.listeners = []
+
+    def add_edit_listener(self, listener):
+        self.listeners.append(listener)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    # Journals of this (running) test process count as left behind
+    monkeypatch.setattr(edit_journal, "_process_alive", lambda pid: False)
+    return "test"
+
+
+def make_journal(app, content=""):
+    buffer = TextBuffer(content)
+    hooks = FakeHooks()
+    journal = EditJournal(FakeText(), hooks, buffer, app)
+    return journal, buffer
+
+
+def insert(journal, buffer, offset, text):
+    buffer.insert(offset, text)
+    event = EditEvent("insert", "1.0", "1.0", text)
+    event.offset = offset
+    journal.on_edit(event)
+
+
+def delete(journal, buffer, start, end):
+    event = EditEvent("delete", "1.0", "1.0", buffer.get_text(start, end))
+    event.offset = start
+    buffer.delete(start, end)
+    journal.on_edit(event)
+
+
+def recovered(app):
+    flush_journals()
+    return [recover(folder) for folder in find_orphans(app)]
+
+
+def test_nothing_is_written_until_the_first_edit(app):
+    journal, buffer = make_journal(app, "hello")
+    journal.start("notes.txt")
+    assert recovered(app) == []
+
+
+def test_edits_are_replayed(app):
+    journal, buffer = make_journal(app, "hello world")
+    journal.start("notes.txt")
+    insert(journal, buffer, 5, ",")
+    delete(journal, buffer, 0, 1)
+    insert(journal, buffer, 0, "J")
+    assert recovered(app) == [("notes.txt", None, "Jello, world")]
+
+
+def test_file_base_is_replayed_on_top_of_the_file(app, tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("line one\n")
+    journal, buffer = make_journal(app, "line one\n")
+    journal.start("notes.txt", str(path))
+    insert(journal, buffer, 9, "line two\n")
+    assert recovered(app) == [("notes.txt", str(path), "line one\nline two\n")]
+
+
+def test_file_changed_since_base_is_not_recovered(app, tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("line one\n")
+    journal, buffer = make_journal(app, "line one\n")
+    journal.start("notes.txt", str(path))
+    insert(journal, buffer, 0, "x")
+    flush_journals()
+    path.write_text("someone else wrote this, and it is longer\n")
+    assert recovered(app) == [None]
+
+
+def test_saving_drops_the_old_log(app, tmp_path):
+    path = tmp_path / "notes.txt"
+    journal, buffer = make_journal(app, "draft")
+    journal.start("notes.txt")
+    insert(journal, buffer, 5, " two")
+    flush_journals()
+    path.write_text(buffer.get_text())
+    journal.start("notes.txt", str(path))       # what a save does
+    assert recovered(app) == []
+
+
+def test_unsaved_text_is_written_right_away(app):
+    journal, buffer = make_journal(app, "recovered text")
+    journal.start("notes.txt", clean=False)
+    assert recovered(app) == [("notes.txt", None, "recovered text")]
+
+
+def test_big_logs_are_folded_into_a_snapshot(app, monkeypatch):
+    monkeypatch.setattr(edit_journal, "COMPACT_MIN_BYTES", 100)
+    journal, buffer = make_journal(app)
+    journal.start("notes.txt")
+    for i in range(50):
+        insert(journal, buffer, len(buffer), f"line {i}\n")
+    (result,) = recovered(app)
+    assert result[2] == buffer.get_text()
+    folder = journal.folder
+    assert len([name for name in os.listdir(folder) if name.startswith("log-")]) == 1
+
+
+def test_torn_last_line_is_ignored(app):
+    journal, buffer = make_journal(app, "abc")
+    journal.start("notes.txt")
+    insert(journal, buffer, 3, "d")
+    flush_journals()
+    log = [name for name in os.listdir(journal.folder) if name.startswith("log-")][0]
+    with open(os.path.join(journal.folder, log), "a", encoding="utf-8") as file:
+        file.write('["i", 4, "unfinish')
+    assert recovered(app) == [("notes.txt", None, "abcd")]
+
+
+def test_recovered_text_survives_a_second_crash(app):
+    journal, buffer = make_journal(app, "first")
+    journal.start("notes.txt")
+    insert(journal, buffer, 5, " draft")
+    (title, path, text), = recovered(app)
+    # What offer_recovery does: the text goes into a new tab, journaled as
+    # unsaved, and the old log is dropped
+    for folder in find_orphans(app):
+        discard_journal(folder)
+    journal, buffer = make_journal(app, text)
+    journal.start(title, path, clean=False)
+    insert(journal, buffer, len(buffer), ", edited")
+    assert recovered(app) == [("notes.txt", None, "first draft, edited")]
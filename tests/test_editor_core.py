@@ -0,0 +1,14 @@
+from types import SimpleNamespace
+
+from editor_core import busy_with, is_replacing
+
+
+def test_busy_with_names_what_locks_the_document():
+    text = SimpleNamespace(search_engine=None, reloader=None)
+    assert busy_with(text) is None
+    text.search_engine = SimpleNamespace(replacing=True)
+    assert is_replacing(text)
+    assert busy_with(text) == "Replace All"
+    text.search_engine.replacing = False
+    text.reloader = object()
+    assert busy_with(text) == "Reload"
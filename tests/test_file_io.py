@@ -0,0 +1,216 @@
+import stat
+import time
+import tkinter as tk
+
+import pytest
+
+import file_io
+from file_io import FileSaver, TextLoader, atomic_write, iter_file_text, iter_string_text
+
+
+class FakeText:
+    # The Text widget calls TextLoader makes; run() plays the after() timers
+    def __init__(self):
+        self.content = ""
+        self.options = {"undo": True, "state": tk.NORMAL}
+        self.timers = {}
+        self.next_id = 0
+        self.inserts = 0
+
+    def cget(self, option):
+        return self.options[option]
+
+    def config(self, **options):
+        self.options.update(options)
+
+    def after(self, delay, callback):
+        self.next_id += 1
+        self.timers[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, timer):
+        self.timers.pop(timer, None)
+
+    def winfo_exists(self):
+        return True
+
+    def insert(self, index, text):
+        assert index == "end-1c"
+        self.content += text
+        self.inserts += 1
+
+    def edit_reset(self):
+        pass
+
+    def edit_modified(self, flag):
+        pass
+
+    def run(self, timeout=10):
+        end = time.monotonic() + timeout
+        while self.timers and time.monotonic() < end:
+            timer = min(self.timers)
+            self.timers.pop(timer)()
+            time.sleep(0.001)
+        assert not self.timers, "never finished"
+
+
+def load(chunks, in_thread=True):
+    text = FakeText()
+    seen = {"progress": []}
+    loader = TextLoader(text, chunks, seen["progress"].append,
+                        lambda cancelled, error: seen.update(done=(cancelled, error)), in_thread)
+    loader.start()
+    assert text.options == {"undo": False, "state": tk.DISABLED}
+    text.run()
+    return text, seen
+
+
+def read_all(chunks):
+    return "".join(text for text, percent in chunks)
+
+
+def test_newlines_are_translated(tmp_path):
+    path = tmp_path / "crlf.txt"
+    path.write_bytes(b"one\r\ntwo\rthree\n")
+    assert read_all(iter_file_text(str(path))) == "one\ntwo\nthree\n"
+
+
+def test_characters_split_between_reads(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_io, "FIRST_READ", 3)
+    path = tmp_path / "utf8.txt"
+    text = "ünïcödé €uro\r\n" * 50
+    path.write_bytes(text.encode("utf-8"))
+    chunks = list(iter_file_text(str(path)))
+    assert len(chunks) > 1
+    assert read_all(chunks) == text.replace("\r\n", "\n")
+    assert chunks[-1][1] == 100
+
+
+def test_text_that_is_not_utf8_is_refused(tmp_path):
+    path = tmp_path / "latin1.txt"
+    path.write_bytes("café\n".encode("latin-1"))
+    with pytest.raises(UnicodeError, match="not utf-8 text"):
+        read_all(iter_file_text(str(path)))
+    assert read_all(iter_file_text(str(path), "latin-1")) == "café\n"
+
+
+def test_loader_inserts_the_whole_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_io, "INSERT_SLICE", 1000)
+    path = tmp_path / "big.txt"
+    content = "".join(f"line {i}\n" for i in range(20000))
+    path.write_text(content)
+    text, seen = load(iter_file_text(str(path)))
+    assert seen["done"] == (False, None)
+    assert text.content == content
+    # In slices, with the widget usable again at the end
+    assert text.inserts >= len(content) // 1000
+    assert text.options == {"undo": True, "state": tk.NORMAL}
+    assert seen["progress"][-1] == 100 and seen["progress"] == sorted(seen["progress"])
+
+
+def test_loader_from_a_string():
+    text, seen = load(iter_string_text("in memory\n"), in_thread=False)
+    assert seen["done"] == (False, None)
+    assert text.content == "in memory\n"
+
+
+def test_loader_reports_a_file_that_cannot_be_read(tmp_path):
+    path = tmp_path / "latin1.txt"
+    path.write_bytes(b"caf\xe9\n")
+    text, seen = load(iter_file_text(str(path)))
+    cancelled, error = seen["done"]
+    assert not cancelled and isinstance(error, UnicodeError)
+    assert text.options["state"] == tk.NORMAL
+
+
+def test_cancelled_loader_stops():
+    def endless():
+        while True:
+            yield "more text\n", 0
+
+    text = FakeText()
+    seen = {}
+    loader = TextLoader(text, endless(), on_done=lambda *result: seen.update(done=result))
+    loader.start()
+    for _ in range(5):
+        text.timers.pop(min(text.timers))()
+        time.sleep(0.01)
+    loader.cancel()
+    assert seen["done"] == (True, None)
+    assert not text.timers and not loader.active
+    assert text.options["state"] == tk.NORMAL
+
+
+def test_atomic_write_replaces_the_file(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("old")
+    atomic_write(str(path), ["new ", "text\n"])
+    assert path.read_text() == "new text\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["notes.txt"]     # no temp file left
+
+
+def test_a_failed_write_leaves_the_old_file(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("old")
+
+    def chunks():
+        yield "half"
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        atomic_write(str(path), chunks())
+    assert path.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["notes.txt"]
+
+
+def test_permissions_are_kept(tmp_path):
+    path = tmp_path / "script.sh"
+    path.write_text("echo")
+    path.chmod(0o755)
+    atomic_write(str(path), ["echo hi"])
+    assert stat.S_IMODE(path.stat().st_mode) == 0o755
+
+
+def test_new_files_follow_the_umask(tmp_path):
+    path = tmp_path / "new.txt"
+    atomic_write(str(path), ["text"])
+    # Not the 0600 of the temp file
+    assert stat.S_IMODE(path.stat().st_mode) == 0o666 & ~file_io._UMASK
+
+
+def test_saving_through_a_symlink_writes_the_target(tmp_path):
+    target = tmp_path / "real.txt"
+    target.write_text("old")
+    link = tmp_path / "link.txt"
+    link.symlink_to(target)
+    atomic_write(str(link), ["new"])
+    assert link.is_symlink()
+    assert target.read_text() == "new"
+
+
+def test_binary_chunks(tmp_path):
+    path = tmp_path / "data.bin"
+    atomic_write(str(path), [b"\x00\x01", b"\xff"], binary=True)
+    assert path.read_bytes() == b"\x00\x01\xff"
+
+
+def test_saver_writes_in_the_background(tmp_path):
+    path = tmp_path / "saved.txt"
+    widget = FakeText()
+    seen = {}
+    saver = FileSaver(widget, str(path), iter(["one\n", "two\n"]), lambda error: seen.update(error=error))
+    saver.start()
+    assert saver.active
+    widget.run()
+    assert seen == {"error": None} and not saver.active
+    assert path.read_text() == "one\ntwo\n"
+
+
+def test_saver_reports_errors(tmp_path):
+    widget = FakeText()
+    seen = {}
+    saver = FileSaver(widget, str(tmp_path / "missing" / "x.txt"), iter(["x"]),
+                      lambda error: seen.update(error=error))
+    saver.start()
+    widget.run()
+    assert isinstance(seen["error"], OSError)
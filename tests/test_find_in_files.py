@@ -0,0 +1,97 @@
+import os
+import re
+import threading
+import time
+
+import pytest
+
+from find_in_files import FileSearch, bytes_pattern, iter_files, search_batch, search_file
+
+
+class FakeWidget:
+    def __init__(self):
+        self.timers = []
+
+    def after(self, delay, callback):
+        self.timers.append(callback)
+
+    def winfo_exists(self):
+        return True
+
+    def run(self, timeout=30):
+        end = time.monotonic() + timeout
+        while self.timers and time.monotonic() < end:
+            self.timers.pop(0)()
+            time.sleep(0.01)
+        assert not self.timers, "the search never finished"
+
+
+@pytest.fixture
+def folder(tmp_path):
+    (tmp_path / "a.py").write_text("import os\n\ndef main():\n    print('TODO: main')\n")
+    (tmp_path / "b.txt").write_bytes(b"todo list\r\nTODO one\r\n")
+    (tmp_path / "image.bin").write_bytes(b"\0TODO")
+    (tmp_path / "empty.txt").write_text("")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "HEAD").write_text("TODO")
+    return tmp_path
+
+
+def names(folder, paths):
+    return sorted(os.path.relpath(path, folder) for path in paths)
+
+
+def run_search(folder, term, **options):
+    widget = FakeWidget()
+    found = {}
+    done = []
+    search = FileSearch(widget, str(folder), term, on_hits=lambda items: found.update(items),
+                        on_done=lambda cancelled, error: done.append((cancelled, error)), **options)
+    search.start()
+    widget.run()
+    assert done == [(False, None)]
+    return {os.path.relpath(path, folder): hits for path, hits in found.items()}, search
+
+
+def test_iter_files_skips_version_control_folders(folder):
+    assert names(folder, iter_files(str(folder))) == ["a.py", "b.txt", "empty.txt", "image.bin"]
+
+
+def test_search_file_gives_lines_and_columns(folder):
+    pattern = re.compile(*bytes_pattern("TODO"))
+    assert search_file(str(folder / "a.py"), pattern) == [(4, 11, "    print('TODO: main')")]
+    # A Windows line ending isn't part of the line text
+    assert search_file(str(folder / "b.txt"), pattern) == [(2, 0, "TODO one")]
+
+
+def test_binary_and_empty_files_have_no_hits(folder):
+    source, flags = bytes_pattern("TODO")
+    assert search_batch([str(folder / "image.bin"), str(folder / "empty.txt")], source, flags) == (2, [])
+
+
+def test_find_options_reach_the_workers(folder):
+    source, flags = bytes_pattern("todo", match_case=False)
+    count, results = search_batch([str(folder / "b.txt")], source, flags)
+    assert results == [(str(folder / "b.txt"), [(1, 0, "todo list"), (2, 0, "TODO one")])]
+    source, flags = bytes_pattern("TODO", whole_word=True)
+    count, results = search_batch([str(folder / "b.txt")], source, flags)
+    assert [hit[0] for hit in results[0][1]] == [2]
+
+
+def test_search_walks_the_folder(folder):
+    found, search = run_search(folder, "TODO")
+    assert sorted(found) == ["a.py", "b.txt"]
+    assert search.files_searched == 4
+
+
+def test_paths_can_be_worked_out_on_the_search_thread(folder):
+    main_thread = []
+
+    def paths():
+        main_thread.append(threading.current_thread() is threading.main_thread())
+        return [str(folder / "b.txt")]
+
+    found, search = run_search(folder, "TODO", paths=paths)
+    assert main_thread == [False]
+    assert sorted(found) == ["b.txt"]
+    assert search.files_searched == 1
@@ -0,0 +1,125 @@
+from highlighter import SyntaxHighlighter
+from lexers import lexer_for_path
+from text_buffer import TextBuffer
+from text_hooks import EditEvent
+
+
+def line_of(index):
+    return int(index.split(".")[0])
+
+
+class FakeText:
+    # A Text widget showing lines top..bottom of a TextBuffer; tags are kept
+    # as sets of (line, start column, end column)
+    def __init__(self, content, top=1, bottom=20):
+        self.buffer = TextBuffer(content)
+        self.top, self.bottom = top, bottom
+        self.tags = {}
+        self.edit_listeners = []
+
+    def index(self, index):
+        return f"{self.top}.0" if index == "@0,0" else f"{self.bottom}.0"
+
+    def winfo_height(self):
+        return 400
+
+    def tag_add(self, tag, *indexes):
+        for first, last in zip(indexes[::2], indexes[1::2]):
+            line, start = map(int, first.split("."))
+            self.tags.setdefault(tag, set()).add((line, start, int(last.split(".")[1])))
+
+    def tag_remove(self, tag, first, last):
+        lines = range(line_of(first), line_of(last) + 1)
+        self.tags[tag] = {run for run in self.tags.get(tag, ()) if run[0] not in lines}
+
+    def tag_config(self, tag, **options):
+        pass
+
+    def tagged(self, tag):
+        return sorted(self.buffer.get_line(line - 1)[start:end] for line, start, end in self.tags.get(tag, ()))
+
+    def tagged_lines(self):
+        return {run[0] for runs in self.tags.values() for run in runs}
+
+    # --- What text_hooks.py reports ---
+    def add_edit_listener(self, listener):
+        self.edit_listeners.append(listener)
+
+    def add_view_listener(self, listener):
+        pass
+
+    def insert(self, offset, text):
+        index = self.buffer.offset_to_index(offset)
+        self.buffer.insert(offset, text)
+        event = EditEvent("insert", index, None, text)
+        event.offset = offset
+        for listener in self.edit_listeners:
+            listener(event)
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.triggered = []
+
+    def register(self, name, callback, **options):
+        pass
+
+    def trigger(self, name):
+        self.triggered.append(name)
+
+
+def make_highlighter(content, **view):
+    text = FakeText(content, **view)
+    highlighter = SyntaxHighlighter(text, text, text.buffer, FakeScheduler(), lexer_for_path("a.py"))
+    return highlighter, text
+
+
+def run(highlighter):
+    steps = highlighter.update()
+    for _ in steps or ():
+        pass
+
+
+def test_the_view_first_then_the_rest_in_the_background():
+    highlighter, text = make_highlighter("if x:\n    pass\n" * 500, top=11, bottom=20)
+    steps = highlighter.update()
+    assert text.tagged_lines() == set(range(11, 21))
+    next(steps)
+    assert 1 in text.tagged_lines() and 1000 not in text.tagged_lines()
+    for _ in steps:
+        pass
+    assert text.tagged_lines() == set(range(1, 1001))
+    assert text.tagged("keyword") == ["if"] * 500 + ["pass"] * 500
+
+
+def test_an_edit_only_redoes_its_line():
+    highlighter, text = make_highlighter("x = 1\ny = 2\nz = 3\n")
+    run(highlighter)
+    assert text.tagged("keyword") == []
+    text.insert(6, "if ")
+    assert list(highlighter.line_done[:4]) == [1, 0, 1, 1]
+    run(highlighter)
+    assert text.tagged("keyword") == ["if"]
+    assert bytes(highlighter.line_done) == b"\x01" * 4
+
+
+def test_new_lines_start_dirty():
+    highlighter, text = make_highlighter("a\nb\n")
+    run(highlighter)
+    text.insert(2, "for\nwhile\n")
+    assert list(highlighter.line_done) == [1, 0, 0, 0, 1]
+    run(highlighter)
+    assert text.tagged("keyword") == ["for", "while"]
+
+
+def test_an_open_string_colors_the_lines_after_it():
+    highlighter, text = make_highlighter("x = 1\nif y:\n    pass\nz = 2\n")
+    run(highlighter)
+    text.insert(0, '"""')
+    run(highlighter)
+    assert text.tagged("keyword") == []
+    assert text.tagged("string") == ["    pass", '"""x = 1', "if y:", "z = 2"]
+    # Closing it again stops at the first line whose state doesn't change
+    text.insert(8, '"""')
+    run(highlighter)
+    assert text.tagged("keyword") == ["if", "pass"]
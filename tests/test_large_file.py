@@ -0,0 +1,85 @@
+import time
+
+import large_file
+from large_file import LargeFileView, LineIndex
+
+
+class FakeWidget:
+    # What LargeFileView's constructor touches; not on screen, so it never
+    # polls or materializes a window by itself
+    def config(self, **options):
+        pass
+
+    def bind(self, *args, **options):
+        pass
+
+    def winfo_exists(self):
+        return False
+
+
+def open_view(path):
+    view = LargeFileView(FakeWidget(), FakeWidget(), str(path))
+    end = time.monotonic() + 10
+    while not view.index.done and time.monotonic() < end:
+        time.sleep(0.01)
+    assert view.index.done
+    return view
+
+
+def test_line_index_over_crlf_lines(monkeypatch):
+    monkeypatch.setattr(large_file, "INDEX_STEP", 4)
+    monkeypatch.setattr(large_file, "SCAN_CHUNK", 16)
+    data = b"".join(b"line %d\r\n" % i for i in range(50))
+    index = LineIndex(data)
+    index.build()
+    assert index.done and index.line_count() == 51
+    for line in (0, 3, 4, 17, 49):
+        offset = index.line_offset(line)
+        assert data[offset:].startswith(b"line %d\r\n" % line)
+        assert index.line_of_offset(offset) == line
+        assert index.line_of_offset(offset + 4) == line
+    assert index.line_offset(50) == len(data)
+
+
+def test_edited_lines_are_saved_with_the_rest(tmp_path):
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"one\ntwo\nthree\n")
+    view = open_view(path)
+    try:
+        assert view.index.line_count() == 4
+        assert view._read_lines(0, 4) == "one\ntwo\nthree\n"
+        assert view._window_text(1, 3) == "two\nthree"
+        view.overlay = {0: (2, "ONE\nTWO\nextra\n")}
+        assert b"".join(view.iter_chunks()) == b"ONE\nTWO\nextra\nthree\n"
+    finally:
+        view.close()
+
+
+def test_crlf_lines_show_without_carriage_returns(tmp_path):
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"".join(b"line %d\r\n" % i for i in range(10)) + b"last")
+    view = open_view(path)
+    try:
+        assert view.newline == "\r\n"
+        assert view._read_lines(2, 4) == "line 2\nline 3\n"
+        assert view._window_text(8, 11) == "line 8\nline 9\nlast"
+        # An edited line is saved with the file's own line breaks
+        chunks = view._overlaid_chunks({3: (5, "changed\nlines\n")})
+        assert b"".join(chunks) == path.read_bytes().replace(
+            b"line 3\r\nline 4\r\n", b"changed\r\nlines\r\n")
+    finally:
+        view.close()
+
+
+def test_lf_files_are_left_as_they_are(tmp_path):
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"one\ntwo\rstill two\nthree\n")
+    view = open_view(path)
+    try:
+        assert view.newline == "\n"
+        assert view.index.line_count() == 4
+        assert view._read_lines(0, 4) == "one\ntwo\rstill two\nthree\n"
+        chunks = view._overlaid_chunks({0: (1, "ONE\n")})
+        assert b"".join(chunks) == b"ONE\ntwo\rstill two\nthree\n"
+    finally:
+        view.close()
@@ -0,0 +1,76 @@
+import lexers
+from lexers import PlainLexer, lexer_for_path, lexer_spec
+
+
+def tokens_text(line, tokens):
+    return [(line[start:end], tag) for start, end, tag in tokens]
+
+
+def test_lexer_is_picked_by_extension():
+    assert type(lexer_for_path("script.py")).__name__ == "PythonLexer"
+    assert type(lexer_for_path("DATA.JSON")).__name__ == "JsonLexer"
+    assert type(lexer_for_path("schema.sql")).__name__ == "SqlLexer"
+    assert isinstance(lexer_for_path("notes.txt"), PlainLexer)
+    assert isinstance(lexer_for_path("Makefile"), PlainLexer)
+    # Untitled documents are still highlighted as Python
+    assert lexer_spec(None) == lexers.PYTHON_LEXER
+
+
+def test_lexer_classes_are_loaded_once():
+    first = lexer_for_path("a.json")
+    second = lexer_for_path("b.geojson")
+    assert first is not second
+    assert type(first) is type(second)
+    assert lexers._classes[("json_lexer", "JsonLexer")] is type(first)
+
+
+def test_plain_text_has_no_tokens():
+    assert PlainLexer().tokenize_line("def x(): pass") == ([], None)
+
+
+def test_python_tokens():
+    line = "if x: print('hi')  # done"
+    tokens, state = lexer_for_path("a.py").tokenize_line(line)
+    assert tokens_text(line, tokens) == [("if", "keyword"), ("'hi'", "string"), ("# done", "comment")]
+    assert state is None
+
+
+def test_keywords_are_whole_words_outside_strings():
+    line = 'notify(ifdef, "if or in") or x  # in'
+    tokens, state = lexer_for_path("a.py").tokenize_line(line)
+    assert tokens_text(line, tokens) == [('"if or in"', "string"), ("or", "keyword"), ("# in", "comment")]
+
+
+def test_python_triple_quoted_string_spans_lines():
+    lexer = lexer_for_path("a.py")
+    tokens, state = lexer.tokenize_line('x = """start')
+    assert state == '"""'
+    tokens, state = lexer.tokenize_line("still inside", state)
+    assert tokens == [(0, 12, "string")] and state == '"""'
+    line = 'end""" and more'
+    tokens, state = lexer.tokenize_line(line, state)
+    assert tokens_text(line, tokens) == [('end"""', "string"), ("and", "keyword")]
+    assert state is None
+
+
+def test_json_tokens():
+    line = '{"name": "x", "size": -1.5e3, "ok": true}'
+    tokens, state = lexer_for_path("a.json").tokenize_line(line)
+    assert tokens_text(line, tokens) == [
+        ('"name"', "key"), ('"x"', "string"), ('"size"', "key"), ("-1.5e3", "number"),
+        ('"ok"', "key"), ("true", "keyword")]
+    assert state is None
+
+
+def test_sql_block_comment_spans_lines():
+    lexer = lexer_for_path("a.sql")
+    line = "SELECT 'a' FROM t /* note"
+    tokens, state = lexer.tokenize_line(line)
+    assert tokens_text(line, tokens) == [
+        ("SELECT", "keyword"), ("'a'", "string"), ("FROM", "keyword"), ("/* note", "comment")]
+    assert state == "/*"
+    line = "end */ where id = 1 -- last"
+    tokens, state = lexer.tokenize_line(line, state)
+    assert tokens_text(line, tokens) == [
+        ("end */", "comment"), ("where", "keyword"), ("1", "number"), ("-- last", "comment")]
+    assert state is None
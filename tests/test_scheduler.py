@@ -0,0 +1,140 @@
+import time
+
+from scheduler import EventScheduler
+
+
+class FakeWidget:
+    # Tk's after()/after_idle() without Tk: run_all() plays the timers
+    def __init__(self):
+        self.timers = {}
+        self.next_id = 0
+        self.errors = []
+
+    def after(self, delay, callback):
+        self.next_id += 1
+        self.timers[self.next_id] = (time.monotonic() + delay / 1000, callback)
+        return self.next_id
+
+    def after_idle(self, callback):
+        return self.after(0, callback)
+
+    def after_cancel(self, timer):
+        self.timers.pop(timer, None)
+
+    def bind(self, *args, **options):
+        pass
+
+    def _root(self):
+        return self
+
+    def report_callback_exception(self, kind, value, traceback):
+        self.errors.append(value)
+
+    def run_all(self, limit=1000):
+        for _ in range(limit):
+            if not self.timers:
+                return
+            timer = min(self.timers, key=lambda t: self.timers[t][0])
+            due, callback = self.timers.pop(timer)
+            time.sleep(max(0, due - time.monotonic()))
+            callback()
+        raise AssertionError("timers never stopped")
+
+
+def test_a_burst_of_triggers_runs_the_job_once():
+    widget = FakeWidget()
+    scheduler = EventScheduler(widget)
+    calls = []
+    scheduler.register("status", lambda: calls.append(1), delay_ms=5)
+    for _ in range(20):
+        scheduler.trigger("status")
+    widget.run_all()
+    assert calls == [1]
+
+
+def test_higher_priority_runs_first():
+    widget = FakeWidget()
+    scheduler = EventScheduler(widget)
+    order = []
+    scheduler.register("low", lambda: order.append("low"), priority=0)
+    scheduler.register("high", lambda: order.append("high"), priority=10)
+    scheduler.trigger("low", "high")
+    widget.run_all()
+    assert order == ["high", "low"]
+
+
+def test_a_failing_job_does_not_stop_the_others():
+    widget = FakeWidget()
+    scheduler = EventScheduler(widget)
+    calls = []
+
+    def broken():
+        raise ValueError("boom")
+
+    scheduler.register("broken", broken, priority=10)
+    scheduler.register("status", lambda: calls.append("status"))
+    scheduler.register("later", lambda: calls.append("later"), delay_ms=5)
+    scheduler.trigger("broken", "status", "later")
+    widget.run_all()
+    assert calls == ["status", "later"]
+    assert [str(error) for error in widget.errors] == ["boom"]
+    # And the scheduler still works afterwards
+    scheduler.trigger("status")
+    widget.run_all()
+    assert calls == ["status", "later", "status"]
+
+
+def test_generators_are_stepped_to_the_end():
+    widget = FakeWidget()
+    scheduler = EventScheduler(widget)
+    steps = []
+
+    def work():
+        for i in range(5):
+            steps.append(i)
+            yield
+
+    scheduler.register("work", work)
+    scheduler.trigger("work")
+    widget.run_all()
+    assert steps == [0, 1, 2, 3, 4]
+
+
+def test_a_failing_generator_is_dropped_and_reported():
+    widget = FakeWidget()
+    scheduler = EventScheduler(widget)
+    steps = []
+
+    def work():
+        steps.append(1)
+        yield
+        raise ValueError("half way")
+
+    scheduler.register("work", work)
+    scheduler.trigger("work")
+    widget.run_all()
+    assert steps == [1]
+    assert scheduler.jobs["work"].task is None
+    assert [str(error) for error in widget.errors] == ["half way"]
+
+
+def test_triggering_again_drops_the_old_generator():
+    widget = FakeWidget()
+    scheduler = EventScheduler(widget)
+    runs = []
+
+    def steps(run):
+        for i in range(3):
+            run.append(i)
+            yield
+
+    def work():
+        runs.append([])
+        return steps(runs[-1])
+
+    scheduler.register("work", work)
+    scheduler.trigger("work")
+    widget.timers[min(widget.timers)][1]()      # the job runs, nothing stepped yet
+    scheduler.trigger("work")
+    widget.run_all()
+    assert runs == [[], [0, 1, 2]]
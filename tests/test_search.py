@@ -0,0 +1,211 @@
+import tkinter as tk
+
+import search
+from search import CURRENT_TAG, MATCH_TAG, SearchEngine, compile_pattern
+from text_buffer import TextBuffer
+from text_hooks import EditEvent
+
+
+class FakeText:
+    # The Text widget calls SearchEngine makes, over a TextBuffer. All lines
+    # are "on screen"; tags are kept as lists of (first, last) indexes
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.listeners = []
+        self.tags = {}
+        self.state = tk.NORMAL
+        self.cursor = "1.0"
+        self.replaced = []
+
+    def tag_config(self, tag, **options):
+        pass
+
+    def tag_raise(self, tag, below):
+        pass
+
+    def tag_add(self, tag, *indexes):
+        self.tags.setdefault(tag, []).extend(zip(indexes[::2], indexes[1::2]))
+
+    def tag_remove(self, tag, first, last):
+        self.tags[tag] = []
+
+    def index(self, index):
+        if index == tk.INSERT:
+            return self.cursor
+        if index == "@0,0":
+            return "1.0"
+        return f"{self.buffer.line_count}.0"
+
+    def winfo_height(self):
+        return 500
+
+    def winfo_exists(self):
+        return True
+
+    def mark_set(self, mark, index):
+        self.cursor = index
+
+    def see(self, index):
+        pass
+
+    def config(self, state):
+        self.state = state
+
+    def replace(self, first, last, new):
+        assert self.state == tk.NORMAL, "Tk drops edits to a DISABLED widget"
+        start, end = self.buffer.index_to_offset(first), self.buffer.index_to_offset(last)
+        self.replaced.append(self.buffer.get_text(start, end))
+        self.buffer.delete(start, end)
+        self.buffer.insert(start, new)
+        for kind, text in (("delete", self.replaced[-1]), ("insert", new)):
+            event = EditEvent(kind, first, None, text)
+            event.offset = start
+            for listener in self.listeners:
+                listener(event)
+
+
+class FakeHooks:
+    def __init__(self, text):
+        self.text = text
+
+    def add_edit_listener(self, listener):
+        self.text.listeners.append(listener)
+
+    def add_view_listener(self, listener):
+        pass
+
+
+class FakeScheduler:
+    # Jobs only run when the test says so; generators one step at a time
+    def __init__(self):
+        self.jobs = {}
+        self.triggered = []
+        self.task = None
+
+    def register(self, name, callback, **options):
+        self.jobs[name] = callback
+
+    def trigger(self, name):
+        self.triggered.append(name)
+
+    def cancel(self, name):
+        pass
+
+    def run(self, name):
+        result = self.jobs[name]()
+        if result is not None:
+            self.task = result
+
+    def step(self):
+        try:
+            next(self.task)
+            return True
+        except StopIteration:
+            self.task = None
+            return False
+
+
+def make_engine(content):
+    buffer = TextBuffer(content)
+    text = FakeText(buffer)
+    scheduler = FakeScheduler()
+    return SearchEngine(text, FakeHooks(text), buffer, scheduler), text, scheduler
+
+
+def matches(pattern, text):
+    return [match.group() for match in pattern.finditer(text)]
+
+
+def test_literal_terms_are_not_regexes():
+    assert matches(compile_pattern("a.b"), "a.b axb") == ["a.b"]
+    assert matches(compile_pattern("a.b", regex=True), "a.b axb") == ["a.b", "axb"]
+
+
+def test_match_case():
+    assert matches(compile_pattern("Cat"), "cat Cat CAT") == ["Cat"]
+    assert matches(compile_pattern("Cat", match_case=False), "cat Cat CAT") == ["cat", "Cat", "CAT"]
+
+
+def test_whole_word():
+    pattern = compile_pattern("cat", whole_word=True)
+    assert matches(pattern, "cat cats concat cat_x (cat)") == ["cat", "cat"]
+    # Terms that start or end with punctuation, where \b would fail
+    pattern = compile_pattern("-x", whole_word=True)
+    assert [m.start() for m in pattern.finditer("a -x b a-x -xy")] == [2]
+    pattern = compile_pattern("a|b", regex=True, whole_word=True)
+    assert matches(pattern, "a b ab") == ["a", "b"]
+
+
+def test_regex_anchors_work_per_line():
+    assert matches(compile_pattern(r"^\w+", regex=True), "one two\nthree") == ["one", "three"]
+
+
+def test_find_all_and_walk_the_matches():
+    engine, text, scheduler = make_engine("foo bar foo\nbaz foo")
+    assert engine.find_all("foo") == 3
+    assert text.tags[MATCH_TAG] == [("1.0", "1.3"), ("1.8", "1.11"), ("2.4", "2.7")]
+    assert engine.find_next() == 0 and text.cursor == "1.3"
+    assert engine.find_next() == 1
+    assert engine.find_next() == 2
+    assert engine.find_next() == 0         # wraps around
+    assert text.tags[CURRENT_TAG] == [("1.0", "1.3")]
+    assert engine.find_previous() == 2
+    assert engine.find_previous() == 1
+    assert engine.find_all("") == 0 and engine.find_next() == -1
+
+
+def test_empty_regex_matches_are_skipped():
+    engine, text, scheduler = make_engine("aa b aaa")
+    assert engine.find_all("a*", regex=True) == 2
+
+
+def test_tagging_is_capped(monkeypatch):
+    monkeypatch.setattr(search, "MAX_TAGGED", 5)
+    engine, text, scheduler = make_engine("e" * 100)
+    assert engine.find_all("e") == 100
+    assert len(text.tags[MATCH_TAG]) == 5
+
+
+def test_edits_refresh_the_results_later():
+    engine, text, scheduler = make_engine("one one")
+    engine.find_all("one")
+    text.replace("1.0", "1.3", "two")
+    assert engine.stale and "search_refresh" in scheduler.triggered
+    scheduler.run("search_refresh")
+    assert engine.count == 1 and not engine.stale
+
+
+def test_replace_all_in_batches_from_the_end(monkeypatch):
+    monkeypatch.setattr(search, "REPLACE_BATCH", 2)
+    engine, text, scheduler = make_engine("cat dog cat CAT cat\ncat")
+    engine.find_all("cat", match_case=False)
+    done = []
+    assert engine.replace_all("cat", on_done=done.append)
+    # Typing now would land between batches at stale offsets
+    assert text.state == tk.DISABLED and engine.replacing
+    assert not engine.replace_all("dog")
+    scheduler.run("replace_all")
+    batches = 0
+    while scheduler.step():
+        batches += 1
+        assert text.state == tk.DISABLED
+    # Only "CAT" changes; the matches that are already "cat" aren't touched
+    assert text.replaced == ["CAT"] and batches == 1
+    assert done == [1] and text.state == tk.NORMAL and not engine.replacing
+    assert text.buffer.get_text() == "cat dog cat cat cat\ncat"
+    assert engine.count == 5
+
+
+def test_replace_all_with_a_regex_template(monkeypatch):
+    monkeypatch.setattr(search, "REPLACE_BATCH", 2)
+    engine, text, scheduler = make_engine("x=1, y=22, z=333")
+    engine.find_all(r"(\w)=(\d+)", regex=True)
+    done = []
+    engine.replace_all(r"\2=\1", regex=True, on_done=done.append)
+    scheduler.run("replace_all")
+    batches = 0
+    while scheduler.step():
+        batches += 1
+    assert batches == 2 and done == [3]
+    assert text.buffer.get_text() == "1=x, 22=y, 333=z"
+    assert text.replaced == ["z=333", "y=22", "x=1"]
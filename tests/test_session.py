@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+import session
+from session import (document_entry, iter_compressed_text, load_session, save_session,
+                     unsaved_path)
+from text_buffer import TextBuffer
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+
+class FakeDocument:
+    # A tab that was never selected, so it has no Text widget yet
+    def __init__(self, path, content=None, modified=False):
+        self.title = os.path.basename(path) if path else "Untitled"
+        self.path = path
+        self.kind = "text"
+        self.cursor = "3.4"
+        self.top = "1.0"
+        self.styles = [[0, 4, 20]]
+        self.pending = None
+        self.text = None
+        self.buffer = TextBuffer(content) if content is not None else None
+        self.modified = modified
+
+    def is_modified(self):
+        return self.modified
+
+
+def read_unsaved(file_name):
+    return "".join(text for text, percent in iter_compressed_text(unsaved_path("test", file_name)))
+
+
+def test_round_trip():
+    saved = FakeDocument("/tmp/saved.py", "print()\n")
+    changed = FakeDocument("/tmp/changed.py", "changed text\n" * 1000, modified=True)
+    untitled = FakeDocument(None, "scratch")
+    save_session("test", [document_entry(doc) for doc in (saved, changed, untitled)], selected=1)
+
+    tabs, selected = load_session("test")
+    assert selected == 1
+    assert [tab["path"] for tab in tabs] == ["/tmp/saved.py", "/tmp/changed.py", None]
+    assert tabs[0]["cursor"] == "3.4" and tabs[0]["styles"] == [[0, 4, 20]]
+    # Only text that isn't on disk is kept, compressed
+    assert tabs[0]["unsaved"] is None
+    assert read_unsaved(tabs[1]["unsaved"]) == "changed text\n" * 1000
+    assert os.path.getsize(unsaved_path("test", tabs[1]["unsaved"])) < 1000
+    assert read_unsaved(tabs[2]["unsaved"]) == "scratch"
+
+
+def test_tabs_not_opened_keep_their_unsaved_text():
+    save_session("test", [document_entry(FakeDocument(None, "first")),
+                          document_entry(FakeDocument(None, "second"))])
+    tabs, _ = load_session("test")
+    # Next time only the second tab was opened (and emptied)
+    first = dict(tabs[0], buffer=None)
+    second = document_entry(FakeDocument(None, ""))
+    save_session("test", [first, second])
+    tabs, _ = load_session("test")
+    assert read_unsaved(tabs[0]["unsaved"]) == "first"
+    assert tabs[1]["unsaved"] is None
+    # The second tab's old file is removed
+    assert sorted(os.listdir(session.session_dir("test"))) == sorted(["session.json", tabs[0]["unsaved"]])
+
+
+def test_no_session():
+    assert load_session("test") is None
+    folder = session.session_dir("test")
+    os.makedirs(folder)
+    with open(os.path.join(folder, "session.json"), "w") as file:
+        file.write("{not json")
+    assert load_session("test") is None
+    with open(os.path.join(folder, "session.json"), "w") as file:
+        file.write('{"version": 0, "tabs": [{}]}')
+    assert load_session("test") is None
@@ -0,0 +1,118 @@
+from style_runs import StyleRuns
+from text_buffer import TextBuffer
+from text_hooks import EditEvent
+
+
+class FakeText:
+    # Just the tag calls StyleRuns makes; tags are kept as sets of offsets
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.tags = {}
+        self.fonts = {}
+
+    def _offsets(self, first, last):
+        if last == "end":
+            return range(self.buffer.index_to_offset(first), len(self.buffer))
+        return range(self.buffer.index_to_offset(first), self.buffer.index_to_offset(last))
+
+    def tag_add(self, tag, first, last):
+        self.tags.setdefault(tag, set()).update(self._offsets(first, last))
+
+    def tag_remove(self, tag, first, last):
+        self.tags.get(tag, set()).difference_update(self._offsets(first, last))
+
+    def tag_config(self, tag, font):
+        self.fonts[tag] = font
+
+    def sizes_at(self, offset):
+        return sorted(tag for tag, offsets in self.tags.items() if offset in offsets)
+
+
+class FakeHooks:
+    def __init__(self):
+        self.listeners = []
+
+    def add_edit_listener(self, listener):
+        self.listeners.append(listener)
+
+    def edit(self, buffer, kind, offset, text=None, end=None):
+        if kind == "insert":
+            buffer.insert(offset, text)
+        else:
+            text = buffer.get_text(offset, end)
+            buffer.delete(offset, end)
+        event = EditEvent(kind, "1.0", "1.0", text)
+        event.offset = offset
+        for listener in self.listeners:
+            listener(event)
+
+
+def make_styles(content):
+    buffer = TextBuffer(content)
+    hooks = FakeHooks()
+    text = FakeText(buffer)
+    return StyleRuns(text, hooks, buffer), text, hooks, buffer
+
+
+def test_overlapping_sizes_leave_one_tag_per_character():
+    styles, text, hooks, buffer = make_styles("0123456789")
+    styles.set_size(0, 6, 20)
+    styles.set_size(3, 9, 14)
+    styles.set_size(4, 5, 20)
+    assert styles.serialize() == [[0, 3, 20], [3, 4, 14], [4, 5, 20], [5, 9, 14]]
+    for offset in range(10):
+        assert len(text.sizes_at(offset)) == (1 if offset < 9 else 0)
+    assert text.sizes_at(4) == ["size_20"]
+    assert text.fonts["size_14"] == ("Helvetica", 14)
+
+
+def test_neighbours_with_the_same_size_merge():
+    styles, text, hooks, buffer = make_styles("0123456789")
+    styles.set_size(0, 3, 12)
+    styles.set_size(3, 6, 12)
+    styles.set_size(8, 10, 12)
+    styles.set_size(6, 8, 12)
+    assert styles.serialize() == [[0, 10, 12]]
+    assert len(styles) == 1
+
+
+def test_back_to_the_default_size():
+    styles, text, hooks, buffer = make_styles("0123456789")
+    styles.set_size(0, 10, 18)
+    styles.set_size(2, 5, None)
+    assert styles.serialize() == [[0, 2, 18], [5, 10, 18]]
+    assert text.sizes_at(3) == []
+
+
+def test_runs_follow_edits():
+    styles, text, hooks, buffer = make_styles("aaaa bbbb cccc")
+    styles.set_size(5, 9, 16)
+    hooks.edit(buffer, "insert", 7, "XX")       # inside: the run grows
+    assert styles.serialize() == [[5, 11, 16]]
+    hooks.edit(buffer, "insert", 5, "<")        # at its start: not part of it
+    hooks.edit(buffer, "insert", 12, ">")       # at its end: not part of it
+    assert styles.serialize() == [[6, 12, 16]]
+    hooks.edit(buffer, "delete", 0, end=8)      # cuts into the start
+    assert styles.serialize() == [[0, 4, 16]]
+    hooks.edit(buffer, "delete", 0, end=4)      # the whole run goes
+    assert styles.serialize() == []
+
+
+def test_deleting_between_equal_runs_joins_them():
+    styles, text, hooks, buffer = make_styles("0123456789")
+    styles.set_size(0, 3, 12)
+    styles.set_size(6, 9, 12)
+    hooks.edit(buffer, "delete", 3, end=6)
+    assert styles.serialize() == [[0, 6, 12]]
+
+
+def test_serialize_and_restore():
+    styles, text, hooks, buffer = make_styles("0123456789")
+    styles.set_size(1, 4, 20)
+    styles.set_size(6, 8, 30)
+    saved = styles.serialize()
+    styles.clear()
+    assert text.sizes_at(2) == []
+    styles.restore(saved)
+    assert styles.serialize() == saved
+    assert text.sizes_at(2) == ["size_20"] and text.sizes_at(7) == ["size_30"]
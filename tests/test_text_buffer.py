@@ -0,0 +1,82 @@
+import random
+
+from text_buffer import TextBuffer
+
+
+def test_insert_and_delete():
+    buffer = TextBuffer("hello world")
+    buffer.insert(5, ",")
+    buffer.insert(len(buffer), "!")
+    buffer.delete(0, 1)
+    buffer.insert(0, "J")
+    assert buffer.get_text() == "Jello, world!"
+    assert buffer.get_text(7, 12) == "world"
+    assert len(buffer) == 13
+
+
+def test_typing_one_character_at_a_time():
+    buffer = TextBuffer("ab")
+    for position, char in enumerate("xyz", 1):
+        buffer.insert(position, char)
+    assert buffer.get_text() == "axyzb"
+
+
+def test_random_edits_match_a_plain_string():
+    rng = random.Random(1)
+    buffer = TextBuffer("first line\nsecond line\n")
+    expected = buffer.get_text()
+    for _ in range(500):
+        if expected and rng.random() < 0.4:
+            start = rng.randrange(len(expected))
+            end = min(len(expected), start + rng.randrange(1, 8))
+            buffer.delete(start, end)
+            expected = expected[:start] + expected[end:]
+        else:
+            offset = rng.randrange(len(expected) + 1)
+            text = rng.choice(["a", "bc", "\n", "def\nghi", " "])
+            buffer.insert(offset, text)
+            expected = expected[:offset] + text + expected[offset:]
+    assert buffer.get_text() == expected
+    assert "".join(buffer.iter_chunks(chunk_size=7)) == expected
+    assert buffer.line_count == expected.count("\n") + 1
+
+
+def test_lines():
+    buffer = TextBuffer("one\ntwo\n")
+    buffer.insert(4, "one and a half\n")
+    assert buffer.line_count == 4
+    assert buffer.get_line(1) == "one and a half"
+    assert buffer.get_lines(0, 3) == ["one", "one and a half", "two"]
+    assert buffer.get_line(3) == ""
+    assert buffer.line_start(2) == 19
+    assert buffer.line_end(0) == 3
+
+
+def test_tk_indexes_and_offsets():
+    buffer = TextBuffer("ab\ncde\n\nf")
+    for offset in range(len(buffer) + 1):
+        assert buffer.index_to_offset(buffer.offset_to_index(offset)) == offset
+    assert buffer.offset_to_index(0) == "1.0"
+    assert buffer.offset_to_index(5) == "2.2"
+    assert buffer.offset_to_index(7) == "3.0"
+    assert buffer.index_to_offset("4.1") == 9
+
+
+def test_snapshot_does_not_see_later_edits():
+    buffer = TextBuffer("base text")
+    snapshot = buffer.snapshot()
+    version = snapshot.version
+    buffer.insert(0, "new ")
+    buffer.delete(4, 9)
+    assert snapshot.get_text() == "base text"
+    assert snapshot.version == version
+    assert buffer.version > version
+    assert buffer.get_text() == "new text"
+
+
+def test_set_text_replaces_everything():
+    buffer = TextBuffer("old")
+    buffer.set_text("")
+    assert buffer.get_text() == "" and len(buffer) == 0 and buffer.line_count == 1
+    buffer.set_text("a\nb")
+    assert buffer.get_lines(0, 5) == ["a", "b"]
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from trigram_index import TrigramIndex, query_trigrams, required_literals
+
+
+@pytest.fixture
+def folder(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    folder = tmp_path / "project"
+    folder.mkdir()
+    (folder / "a.py").write_text("def render_page():\n    pass\n")
+    (folder / "b.py").write_text("nothing to see here\n")
+    return folder
+
+
+def built_index(folder):
+    index = TrigramIndex(str(folder))
+    index.update()
+    return index
+
+
+def names(paths):
+    return sorted(os.path.basename(path) for path in paths)
+
+
+def test_candidates_narrow_down(folder):
+    index = built_index(folder)
+    assert names(index.candidates("render_page")) == ["a.py"]
+    assert names(index.candidates("RENDER")) == ["a.py"]    # case is checked later
+
+
+def test_no_index_yet_means_search_everything(folder):
+    assert TrigramIndex(str(folder)).candidates("render_page") is None
+
+
+def test_new_file_created_after_indexing_is_still_found(folder):
+    index = built_index(folder)
+    (folder / "c.py").write_text("render_page()\n")
+    assert names(index.candidates("render_page")) == ["a.py", "c.py"]
+
+
+def test_file_changed_after_indexing_is_judged_by_its_new_text(folder):
+    index = built_index(folder)
+    (folder / "b.py").write_text("now it calls render_page() too\n")
+    assert names(index.candidates("render_page")) == ["a.py", "b.py"]
+
+
+def test_deleted_file_is_left_out(folder):
+    index = built_index(folder)
+    os.remove(folder / "a.py")
+    assert index.candidates("render_page") == []
+
+
+def test_required_literals():
+    assert required_literals(r"render_\w+\.html") == ["render_", ".html"]
+    assert required_literals("ab?c") == ["a", "c"]
+    assert required_literals("(a|b)") == []
+    assert query_trigrams("ab") == []
+
+
+def test_escapes_with_arguments_end_the_run():
+    assert required_literals(r"\x41BC") == ["BC"]
+    assert required_literals(r"ab\u00e9cd") == ["ab", "cd"]
+    assert required_literals(r"ab\U0001F600cd") == ["ab", "cd"]
+    assert required_literals(r"ab\N{DASH}cd") == ["ab", "cd"]
+    assert required_literals(r"(?P<q>')x") == []
+    assert required_literals(r"ab\012cd") == ["ab", "cd"]
+    assert required_literals(r"abc\1def") == ["abc", "def"]
+
+
+def test_character_classes_starting_with_a_bracket():
+    assert required_literals("[^]]abc") == ["abc"]
+    assert required_literals("[]x]abc") == ["abc"]
+    assert required_literals(r"[\]]abc") == ["abc"]
+    assert required_literals("[abc") == []
+
+
+def test_regex_candidates_have_no_false_negatives(folder):
+    (folder / "c.py").write_text("print('ABCD')\n")
+    index = built_index(folder)
+    assert names(index.candidates(r"\x41BCD", regex=True)) == ["c.py"]
+    assert names(index.candidates(r"[^]]ABC", regex=True)) == ["c.py"]
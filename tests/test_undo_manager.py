@@ -0,0 +1,157 @@
+from text_buffer import TextBuffer
+from text_hooks import EditEvent
+from undo_manager import UndoManager, format_bytes
+
+
+class FakeText:
+    # A Text widget over a TextBuffer: edits are reported to the listeners
+    # with their offset, as text_buffer.attach_buffer does
+    def __init__(self, content=""):
+        self.buffer = TextBuffer(content)
+        self.listeners = []
+        self.idle = []
+        self.insert_mark = None
+
+    def add_edit_listener(self, listener):
+        self.listeners.append(listener)
+
+    def _report(self, kind, offset, text):
+        event = EditEvent(kind, self.buffer.offset_to_index(offset), None, text)
+        event.offset = offset
+        for listener in self.listeners:
+            listener(event)
+
+    def insert(self, index, text):
+        offset = self.buffer.index_to_offset(index)
+        self.buffer.insert(offset, text)
+        self._report("insert", offset, text)
+
+    def delete(self, first, last):
+        start, end = self.buffer.index_to_offset(first), self.buffer.index_to_offset(last)
+        text = self.buffer.get_text(start, end)
+        self.buffer.delete(start, end)
+        self._report("delete", start, text)
+
+    def after_idle(self, callback):
+        self.idle.append(callback)
+
+    def go_idle(self):
+        while self.idle:
+            self.idle.pop(0)()
+
+    def mark_set(self, mark, index):
+        self.insert_mark = index
+
+    def see(self, index):
+        pass
+
+    def get(self):
+        return self.buffer.get_text()
+
+    # --- What the user does ---
+    def type(self, offset, chars):
+        for char in chars:
+            self.insert(self.buffer.offset_to_index(offset), char)
+            self.go_idle()
+            offset += 1
+
+    def backspace(self, offset, count):
+        for _ in range(count):
+            self.delete(self.buffer.offset_to_index(offset - 1), self.buffer.offset_to_index(offset))
+            self.go_idle()
+            offset -= 1
+
+
+def make_undo(content="", **options):
+    text = FakeText(content)
+    return UndoManager(text, text, text.buffer, **options), text
+
+
+def test_typing_is_undone_a_word_at_a_time():
+    undo, text = make_undo()
+    text.type(0, "hello world")
+    assert undo.undo()
+    assert text.get() == "hello "
+    assert undo.undo()
+    assert text.get() == ""
+    assert not undo.undo()
+    assert undo.redo() and undo.redo()
+    assert text.get() == "hello world"
+    assert not undo.can_redo()
+
+
+def test_backspacing_is_one_step():
+    undo, text = make_undo("some text")
+    text.backspace(9, 4)
+    assert text.get() == "some "
+    undo.undo()
+    assert text.get() == "some text"
+    assert text.insert_mark == "1.9"
+
+
+def test_one_event_is_one_step():
+    undo, text = make_undo("replace me")
+    # Typing over a selection: a delete and an insert before Tk is idle
+    text.delete("1.8", "1.10")
+    text.insert("1.8", "you")
+    text.go_idle()
+    assert text.get() == "replace you"
+    undo.undo()
+    assert text.get() == "replace me"
+
+
+def test_begin_and_end_group():
+    undo, text = make_undo("a a a")
+    undo.begin_group()
+    for offset in (4, 2, 0):
+        text.delete(f"1.{offset}", f"1.{offset + 1}")
+        text.insert(f"1.{offset}", "b")
+        text.go_idle()
+    undo.end_group()
+    assert text.get() == "b b b"
+    undo.undo()
+    assert text.get() == "a a a"
+    undo.redo()
+    assert text.get() == "b b b"
+
+
+def test_a_new_edit_drops_the_redos():
+    undo, text = make_undo()
+    text.type(0, "one")
+    undo.undo()
+    assert undo.can_redo()
+    text.type(0, "two")
+    assert not undo.can_redo()
+    undo.undo()
+    assert text.get() == ""
+
+
+def test_memory_budget_drops_the_oldest_steps():
+    undo, text = make_undo(budget=2000)
+    for i in range(50):
+        text.insert(text.buffer.offset_to_index(len(text.buffer)), f"paste {i}\n")
+        text.go_idle()
+        undo.separate()
+    assert undo.memory_use() <= 2000
+    assert undo.truncated
+    steps = 0
+    while undo.undo():
+        steps += 1
+    assert 0 < steps < 50
+    assert text.get().startswith("paste 0\n")
+    assert undo.memory_use() > 0
+
+
+def test_paused_edits_are_not_recorded():
+    undo, text = make_undo()
+    undo.pause()
+    text.insert("1.0", "loaded file")
+    undo.resume()
+    assert not undo.can_undo()
+    assert undo.memory_use() == 0
+
+
+def test_format_bytes():
+    assert format_bytes(10) == "10 B"
+    assert format_bytes(2048) == "2 KB"
+    assert format_bytes(3 * 1024 ** 3) == "3.0 GB"
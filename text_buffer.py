@@ -0,0 +1,295 @@
+import random
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+
+# --- TEXT BUFFER (PIECE TABLE) ---
+# A pure-Python document model that can be used without Tk at all.
+#
+# The text is never copied on edits. Instead the document is a list of
+# "pieces", each one pointing at a slice of a source string:
+#   - the original file contents (one big string)
+#   - small strings that were typed/pasted later
+#
+# The pieces live in a balanced binary tree (a treap) where every node also
+# knows the total length and number of newlines below it. That gives
+# O(log n) insert/delete and O(log n) "where does line N start?" lookups.
+#
+# Nodes are never changed once created; an edit builds a few new nodes and
+# shares the rest. So buffer.snapshot() is free, and a snapshot can be saved,
+# searched or diffed from another thread while the user keeps typing.
+
+CHUNK_SIZE = 64 * 1024      # default size of chunks from iter_chunks()
+MAX_COALESCE = 4096         # typed text is appended to the last piece up to this size
+
+
+class _Source:
+    __slots__ = ("text", "is_added", "_newlines")
+
+    def __init__(self, text, is_added):
+        self.text = text
+        self.is_added = is_added    # True for typed/pasted text
+        self._newlines = None
+
+    # Positions of every "\n" in the source, computed on first use
+    def newlines(self):
+        if self._newlines is None:
+            parts = self.text.split("\n")
+            lengths = accumulate(len(part) + 1 for part in parts[:-1])
+            self._newlines = array("q", (end - 1 for end in lengths))
+        return self._newlines
+
+    def count_newlines(self, start, end):
+        # Small typed pieces change on every key, just count them directly
+        if self.is_added and len(self.text) <= MAX_COALESCE:
+            return self.text.count("\n", start, end)
+        newlines = self.newlines()
+        return bisect_left(newlines, end) - bisect_left(newlines, start)
+
+
+class _Node:
+    __slots__ = ("left", "right", "source", "start", "length", "newlines",
+                 "priority", "total_length", "total_newlines")
+
+    def __init__(self, left, right, source, start, length, newlines, priority):
+        self.left = left
+        self.right = right
+        self.source = source
+        self.start = start
+        self.length = length
+        self.newlines = newlines
+        self.priority = priority
+        self.total_length = length + _length(left) + _length(right)
+        self.total_newlines = newlines + _newlines(left) + _newlines(right)
+
+
+def _length(node):
+    return node.total_length if node else 0
+
+
+def _newlines(node):
+    return node.total_newlines if node else 0
+
+
+def _piece(source, start, length):
+    return _Node(None, None, source, start, length,
+                 source.count_newlines(start, start + length), random.random())
+
+
+def _with_children(node, left, right):
+    return _Node(left, right, node.source, node.start, node.length,
+                 node.newlines, node.priority)
+
+
+def _merge(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.priority > b.priority:
+        return _with_children(a, a.left, _merge(a.right, b))
+    return _with_children(b, _merge(a, b.left), b.right)
+
+
+# Split a tree into (first `offset` characters, the rest)
+def _split(node, offset):
+    if node is None:
+        return None, None
+    left_length = _length(node.left)
+    if offset <= left_length:
+        left, right = _split(node.left, offset)
+        return left, _with_children(node, right, node.right)
+    if offset >= left_length + node.length:
+        left, right = _split(node.right, offset - left_length - node.length)
+        return _with_children(node, node.left, left), right
+    # The split point is inside this node's piece
+    cut = offset - left_length
+    head = _piece(node.source, node.start, cut)
+    tail = _piece(node.source, node.start + cut, node.length - cut)
+    return _merge(node.left, head), _merge(tail, node.right)
+
+
+def _last(node):
+    while node.right is not None:
+        node = node.right
+    return node
+
+
+# Rebuild the right spine with the last piece replaced by `piece`
+def _replace_last(node, piece):
+    if node.right is None:
+        return _Node(node.left, None, piece.source, piece.start, piece.length,
+                     piece.newlines, node.priority)
+    return _with_children(node, node.left, _replace_last(node.right, piece))
+
+
+# Yield (source, start, end) slices that overlap [start, end) in order
+def _slices(node, start, end, base=0):
+    if node is None or start >= base + node.total_length or end <= base:
+        return
+    left_length = _length(node.left)
+    yield from _slices(node.left, start, end, base)
+    piece_base = base + left_length
+    lo = max(start, piece_base)
+    hi = min(end, piece_base + node.length)
+    if lo < hi:
+        yield node.source, node.start + lo - piece_base, node.start + hi - piece_base
+    yield from _slices(node.right, start, end, piece_base + node.length)
+
+
+class TextBuffer:
+    def __init__(self, text=""):
+        self.root = None
+        self.version = 0
+        self.set_text(text)
+
+    # Replace the whole document (e.g. a freshly opened file)
+    def set_text(self, text):
+        self.root = _piece(_Source(text, False), 0, len(text)) if text else None
+        self.version += 1
+
+    def __len__(self):
+        return _length(self.root)
+
+    @property
+    def line_count(self):
+        return _newlines(self.root) + 1
+
+    # A read-only copy that shares all nodes with this buffer (O(1))
+    def snapshot(self):
+        copy = TextBuffer()
+        copy.root = self.root
+        copy.version = self.version
+        return copy
+
+    # --- Editing ---
+    def insert(self, offset, text):
+        if not text:
+            return
+        left, right = _split(self.root, offset)
+        last = _last(left) if left else None
+        source = last.source if last else None
+        if (source is not None and source.is_added
+                and last.start + last.length == len(source.text)
+                and len(source.text) + len(text) <= MAX_COALESCE):
+            # Typing: extend the previous small piece instead of adding one
+            grown = _Source(source.text + text, True)
+            left = _replace_last(left, _piece(grown, last.start, last.length + len(text)))
+        else:
+            left = _merge(left, _piece(_Source(text, True), 0, len(text)))
+        self.root = _merge(left, right)
+        self.version += 1
+
+    def delete(self, start, end):
+        if end <= start:
+            return
+        left, rest = _split(self.root, start)
+        _, right = _split(rest, end - start)
+        self.root = _merge(left, right)
+        self.version += 1
+
+    # --- Reading ---
+    def get_text(self, start=0, end=None):
+        if end is None:
+            end = len(self)
+        return "".join(source.text[lo:hi] for source, lo, hi in _slices(self.root, start, end))
+
+    def iter_chunks(self, start=0, end=None, chunk_size=CHUNK_SIZE):
+        if end is None:
+            end = len(self)
+        for source, lo, hi in _slices(self.root, start, end):
+            for pos in range(lo, hi, chunk_size):
+                yield source.text[pos:min(hi, pos + chunk_size)]
+
+    # --- Lines (0-based line numbers) ---
+    def line_start(self, line):
+        if line <= 0:
+            return 0
+        if line >= self.line_count:
+            return len(self)
+        # Find the offset just after the line-th newline
+        node, wanted, base = self.root, line, 0
+        while node is not None:
+            left_newlines = _newlines(node.left)
+            if wanted <= left_newlines:
+                node = node.left
+                continue
+            wanted -= left_newlines
+            base += _length(node.left)
+            if wanted <= node.newlines:
+                newlines = node.source.newlines()
+                position = newlines[bisect_left(newlines, node.start) + wanted - 1]
+                return base + position - node.start + 1
+            wanted -= node.newlines
+            base += node.length
+            node = node.right
+        return len(self)
+
+    def line_end(self, line):
+        if line + 1 >= self.line_count:
+            return len(self)
+        return self.line_start(line + 1) - 1
+
+    def get_line(self, line):
+        return self.get_text(self.line_start(line), self.line_end(line))
+
+    # Lines first..last-1 as a list of strings (without the "\n")
+    def get_lines(self, first, last):
+        last = min(last, self.line_count)
+        if first >= last:
+            return []
+        return self.get_text(self.line_start(first), self.line_end(last - 1)).split("\n")
+
+    def offset_to_line_col(self, offset):
+        # Count the newlines before `offset`
+        node, remaining, line = self.root, offset, 0
+        while node is not None:
+            left_length = _length(node.left)
+            if remaining < left_length:
+                node = node.left
+                continue
+            line += _newlines(node.left)
+            remaining -= left_length
+            if remaining < node.length:
+                line += node.source.count_newlines(node.start, node.start + remaining)
+                break
+            line += node.newlines
+            remaining -= node.length
+            node = node.right
+        return line, offset - self.line_start(line)
+
+    def line_col_to_offset(self, line, column):
+        return self.line_start(line) + column
+
+    # --- Tk "line.col" indexes (lines start at 1) ---
+    def index_to_offset(self, index):
+        line, column = index.split(".")
+        return self.line_col_to_offset(int(line) - 1, int(column))
+
+    def offset_to_index(self, offset):
+        line, column = self.offset_to_line_col(offset)
+        return f"{line + 1}.{column}"
+
+
+# --- Keep a TextBuffer in sync with a Text widget ---
+# The widget becomes a view of the buffer: every edit reported by the hooks
+# is applied to the buffer too, and the event gets the buffer offset of the
+# edit so later listeners don't have to work it out again.
+# Attach the buffer BEFORE any other edit listener that reads from it.
+# An existing `buffer` can be passed in if the widget already shows its text.
+def attach_buffer(text_widget, hooks, buffer=None):
+    if buffer is None:
+        buffer = TextBuffer(text_widget.get("1.0", "end-1c"))
+
+    def on_edit(event):
+        if event.kind == "reset":
+            buffer.set_text(text_widget.get("1.0", "end-1c"))
+            return
+        event.offset = buffer.index_to_offset(event.start)
+        if event.kind == "insert":
+            buffer.insert(event.offset, event.text)
+        else:
+            buffer.delete(event.offset, event.offset + len(event.text))
+
+    hooks.add_edit_listener(on_edit)
+    return buffer
@@ -0,0 +1,157 @@
+import tkinter as tk
+
+# --- TEXT WIDGET HOOKS ---
+# Tk's own bindings (typing, paste, cut, undo...) talk to the Tcl widget
+# command directly, so overriding Python methods like Text.insert would miss
+# most edits. Instead we rename the real widget command and put a tiny Tcl
+# proc in front of it. The proc runs the real command first (so Tcl errors
+# behave exactly as before) and only then tells Python what changed.
+#
+# Every edit is reported as an EditEvent:
+#   kind  = "insert" / "delete" / "reset"
+#   start = "line.col" index where the edit happened
+#   end   = index after the inserted text / end of the deleted range
+#   text  = the inserted or deleted characters
+#   offset = character offset of `start`, filled in by the TextBuffer sync
+#            (text_buffer.attach_buffer) for the listeners that follow it
+
+_PROXY_PROC = r"""
+proc ::texteditor_text_proxy {orig callback args} {
+    set cmd [lindex $args 0]
+    if {$cmd ne "insert" && $cmd ne "delete" && $cmd ne "replace"} {
+        return [uplevel 1 [list $orig {*}$args]]
+    }
+    # A disabled Text silently ignores edits, so there is nothing to report
+    if {[$orig cget -state] eq "disabled"} {
+        return [uplevel 1 [list $orig {*}$args]]
+    }
+    if {$cmd eq "insert"} {
+        set start [$orig index [lindex $args 1]]
+        # Tk never inserts after the final newline, it moves to end-1c instead
+        if {[$orig compare $start == end]} { set start [$orig index end-1c] }
+        set chars ""
+        foreach {piece tags} [lrange $args 2 end] { append chars $piece }
+        set result [uplevel 1 [list $orig {*}$args]]
+        set end [$orig index "$start + [string length $chars] chars"]
+        $callback insert $start $end $chars
+        return $result
+    }
+    # delete / replace both start by removing a range
+    if {$cmd eq "delete" && [llength $args] > 3} {
+        # Multi-range delete: too rare to track precisely, ask for a resync
+        set result [uplevel 1 [list $orig {*}$args]]
+        $callback reset {} {} {}
+        return $result
+    }
+    set start [$orig index [lindex $args 1]]
+    if {[llength $args] > 2} {
+        set end [$orig index [lindex $args 2]]
+    } else {
+        set end [$orig index "$start + 1 chars"]
+    }
+    # The final newline can never be deleted
+    if {[$orig compare $end > end-1c]} { set end [$orig index end-1c] }
+    if {[$orig compare $start > $end]} { set end $start }
+    set old [$orig get $start $end]
+    set result [uplevel 1 [list $orig {*}$args]]
+    if {$old ne ""} { $callback delete $start $end $old }
+    if {$cmd eq "replace"} {
+        set chars ""
+        foreach {piece tags} [lrange $args 3 end] { append chars $piece }
+        set end [$orig index "$start + [string length $chars] chars"]
+        $callback insert $start $end $chars
+    }
+    return $result
+}
+"""
+
+
+# A listener failed. traceback is only imported then: it isn't needed to start
+def _print_exception():
+    import traceback
+    traceback.print_exc()
+
+
+class EditEvent:
+    __slots__ = ("kind", "start", "end", "text", "offset")
+
+    def __init__(self, kind, start, end, text):
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.text = text
+        self.offset = None
+
+    # Line numbers (1-based, like Tk) of the start/end index
+    @property
+    def start_line(self):
+        return int(self.start.split(".")[0])
+
+    @property
+    def end_line(self):
+        return int(self.end.split(".")[0])
+
+
+class TextHooks:
+    def __init__(self, text_widget):
+        self.widget = text_widget
+        self.edit_listeners = []    # called with an EditEvent after every edit
+        self.view_listeners = []    # called with (first, last) when the view scrolls
+        self.scroll_target = None   # e.g. scrollbar.set, still gets yscrollcommand
+
+        tcl = text_widget.tk
+        if not tcl.call("info", "commands", "::texteditor_text_proxy"):
+            tcl.eval(_PROXY_PROC)
+
+        # Rename ".!text" to ".!text_orig" and put our proxy under the old name
+        self.orig = text_widget._w + "_orig"
+        callback = text_widget.register(self._on_tcl_edit)
+        tcl.call("rename", text_widget._w, self.orig)
+        tcl.call("interp", "alias", "", text_widget._w, "",
+                 "::texteditor_text_proxy", self.orig, callback)
+
+        text_widget.config(yscrollcommand=self._on_yscroll)
+        text_widget.bind("<Destroy>", self._on_destroy, add="+")
+
+    def add_edit_listener(self, callback):
+        self.edit_listeners.append(callback)
+
+    def add_view_listener(self, callback):
+        self.view_listeners.append(callback)
+
+    # Called from Tcl after the real insert/delete has happened
+    def _on_tcl_edit(self, kind, start, end, text):
+        event = EditEvent(kind, start, end, text)
+        for listener in self.edit_listeners:
+            # An exception here would be re-raised by mainloop and kill the
+            # app, so report it and keep going
+            try:
+                listener(event)
+            except Exception:
+                _print_exception()
+
+    def _on_yscroll(self, first, last):
+        if self.scroll_target:
+            self.scroll_target(first, last)
+        for listener in self.view_listeners:
+            try:
+                listener(first, last)
+            except Exception:
+                _print_exception()
+
+    def _on_destroy(self, event):
+        if event.widget is not self.widget:
+            return
+        try:
+            self.widget.tk.call("rename", self.widget._w, "")
+        except tk.TclError:
+            pass
+
+
+# Install hooks on a Text widget (only once) and return them
+def get_hooks(text_widget):
+    hooks = getattr(text_widget, "hooks", None)
+    if hooks is None:
+        hooks = TextHooks(text_widget)
+        text_widget.hooks = hooks
+    return hooks
@@ -0,0 +1,309 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+from find_in_files import SNIFF_BYTES, iter_files, make_pool
+
+# --- TRIGRAM INDEX ---
+# Searching the same folder again and again used to read every file every
+# time. The index remembers, for every file, which 3-byte sequences
+# ("trigrams") it contains. A search for "render_page" can only match files
+# that contain "ren", "end", "nde", ... so only those files are opened and
+# checked with the real regex.
+#
+# The index is a SQLite file under ~/.cache/text-editor/, one per folder.
+# It is built on a background thread (the trigrams of each file are worked
+# out in the worker pool from find_in_files.py) and kept up to date from
+# file modification times and from saves made in the editor.
+#
+# Trigrams are stored lower-cased, so the same index works for "Match case"
+# on and off; the regex check afterwards gets the case right.
+#
+#   index = open_index(folder)
+#   index.update_async()                    # catch up with changed files
+#   paths = index.candidates("render_page") # None = can't narrow, scan all
+#                                           # (new and changed files always included;
+#                                           # stats the tree, so not on the Tk thread)
+
+MAX_INDEXED_BYTES = 32 * 1024 * 1024    # bigger files are always searched
+WRITE_BATCH = 200                       # files written per transaction
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    indexed INTEGER NOT NULL        -- 0 = too big/binary, always a candidate
+);
+CREATE TABLE IF NOT EXISTS trigrams (
+    trigram INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    PRIMARY KEY (trigram, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS trigrams_by_file ON trigrams (file_id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def index_path(folder):
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    digest = hashlib.sha1(os.path.abspath(folder).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache, "text-editor", f"trigrams-{digest}.sqlite")
+
+
+# Runs in a worker process: (path, mtime, size, trigrams) where trigrams is
+# None for files that can't be indexed (binary, too big, unreadable)
+def file_trigrams(path):
+    try:
+        info = os.stat(path)
+        if info.st_size > MAX_INDEXED_BYTES:
+            return path, info.st_mtime_ns, info.st_size, None
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError:
+        return path, 0, 0, None
+    if b"\0" in data[:SNIFF_BYTES]:
+        return path, info.st_mtime_ns, info.st_size, None
+    data = data.lower()
+    grams = {data[i:i + 3] for i in range(len(data) - 2)}
+    return path, info.st_mtime_ns, info.st_size, [int.from_bytes(gram, "big") for gram in grams]
+
+
+# --- Which text must a match contain? ---
+# Literal runs of a regex that every match has to include. Anything the
+# simple scan doesn't understand (groups, alternatives) gives [], meaning
+# "no idea, search every file".
+def required_literals(pattern):
+    runs = []
+    run = ""
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        literal = None
+        if char in "(|":
+            return []
+        if char == "\\":
+            following = pattern[i + 1:i + 2]
+            if following and not following.isalnum():
+                literal = following     # escaped punctuation like \. or \(
+            i = _escape_end(pattern, i)
+        elif char == "[":
+            i = _class_end(pattern, i)
+            if i == -1:
+                return []
+        elif char in "*?{":
+            if char == "{":
+                close = pattern.find("}", i)
+                i = close + 1 if close != -1 else len(pattern)
+            else:
+                i += 1
+        elif char in ".^$+":
+            i += 1
+        else:
+            literal = char
+            i += 1
+        # A run continues only over plain characters
+        if literal is not None:
+            # A quantifier right after this character makes it optional
+            if pattern[i:i + 1] in ("*", "?", "{"):
+                if run:
+                    runs.append(run)
+                run = ""
+                continue
+            run += literal
+        else:
+            if run:
+                runs.append(run)
+            run = ""
+    if run:
+        runs.append(run)
+    return runs
+
+
+# Where the escape starting at pattern[i] ends. \x41, \u00e9, \N{...},
+# octal escapes and backreferences take more than one character after the
+# backslash; they stand for text we don't work out, so they end a run
+def _escape_end(pattern, i):
+    kind = pattern[i + 1:i + 2]
+    i += 2
+    if kind == "x":
+        return i + 2
+    if kind == "u":
+        return i + 4
+    if kind == "U":
+        return i + 8
+    if kind == "N" and pattern[i:i + 1] == "{":
+        close = pattern.find("}", i)
+        return close + 1 if close != -1 else len(pattern)
+    if kind.isdigit():
+        while i < len(pattern) and pattern[i].isdigit():
+            i += 1
+    return i
+
+
+# Where the character class starting at pattern[i] ("[") ends, -1 if it
+# doesn't. A "]" right after "[" or "[^" is a member, not the end
+def _class_end(pattern, i):
+    i += 1
+    if pattern[i:i + 1] == "^":
+        i += 1
+    if pattern[i:i + 1] == "]":
+        i += 1
+    while i < len(pattern):
+        if pattern[i] == "\\":
+            i += 2
+        elif pattern[i] == "]":
+            return i + 1
+        else:
+            i += 1
+    return -1
+
+
+def query_trigrams(term, regex=False):
+    runs = required_literals(term) if regex else [term]
+    grams = set()
+    for run in runs:
+        data = run.encode("utf-8").lower()
+        grams.update(data[i:i + 3] for i in range(len(data) - 2))
+    return [int.from_bytes(gram, "big") for gram in grams]
+
+
+class TrigramIndex:
+    def __init__(self, folder):
+        self.folder = os.path.abspath(folder)
+        self.db_path = index_path(folder)
+        self.updating = False
+        self._local = threading.local()     # one SQLite connection per thread
+        self._write_lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        db = self._db()
+        db.executescript(_SCHEMA)
+        self.ready = db.execute("SELECT 1 FROM meta WHERE key = 'built'").fetchone() is not None
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.db_path, timeout=30)
+            # Readers (searches) don't wait for the background writer
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    # --- Queries ---
+    # Paths that may contain a match, or None if the index can't help.
+    # The trigrams of files created or changed since the last update() are
+    # not known yet, so those files are always searched (found by comparing
+    # mtime and size with the index, the same check update() does). That
+    # stats every file below the folder: call it off the Tk thread
+    def candidates(self, term, regex=False):
+        if not self.ready:
+            return None
+        grams = query_trigrams(term, regex)
+        if not grams:
+            return None
+        db = self._db()
+        marks = ",".join("?" * len(grams))
+        rows = db.execute(
+            f"SELECT path FROM files WHERE id IN ("
+            f"  SELECT file_id FROM trigrams WHERE trigram IN ({marks})"
+            f"  GROUP BY file_id HAVING COUNT(*) = ?)"
+            f" OR indexed = 0", (*grams, len(grams))).fetchall()
+        changed, deleted = self._changed_files(db)
+        paths = {row[0] for row in rows}
+        paths.difference_update(deleted)
+        paths.update(changed)
+        return sorted(paths)
+
+    # Files whose mtime/size differ from the index (new ones included), and
+    # indexed files that are gone
+    def _changed_files(self, db):
+        known = {path: (mtime, size) for path, mtime, size in
+                 db.execute("SELECT path, mtime, size FROM files")}
+        changed = []
+        for path in iter_files(self.folder):
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            if known.pop(path, None) != (info.st_mtime_ns, info.st_size):
+                changed.append(path)
+        return changed, list(known)
+
+    # --- Keeping it up to date ---
+    def update_async(self):
+        if not self.updating:
+            self.updating = True
+            threading.Thread(target=self.update, daemon=True).start()
+
+    # Re-index the files whose mtime/size changed, forget deleted ones
+    def update(self):
+        self.updating = True
+        try:
+            db = self._db()
+            changed, deleted = self._changed_files(db)
+            with self._write_lock, db:
+                for path in deleted:
+                    self._forget(db, path)
+            if changed:
+                pool, _ = make_pool()
+                try:
+                    batch = []
+                    for result in pool.map(file_trigrams, changed, chunksize=16):
+                        batch.append(result)
+                        if len(batch) >= WRITE_BATCH:
+                            self._store(batch)
+                            batch = []
+                    self._store(batch)
+                finally:
+                    pool.shutdown()
+            with self._write_lock, db:
+                db.execute("INSERT OR REPLACE INTO meta VALUES ('built', '1')")
+            self.ready = True
+        finally:
+            self.updating = False
+
+    # A file was saved from the editor
+    def update_file(self, path):
+        threading.Thread(target=self._store, args=([file_trigrams(path)],), daemon=True).start()
+
+    def _store(self, results):
+        if not results:
+            return
+        db = self._db()
+        with self._write_lock, db:
+            for path, mtime, size, grams in results:
+                self._forget(db, path)
+                cursor = db.execute("INSERT INTO files (path, mtime, size, indexed) VALUES (?, ?, ?, ?)",
+                                    (path, mtime, size, int(grams is not None)))
+                if grams:
+                    file_id = cursor.lastrowid
+                    db.executemany("INSERT INTO trigrams VALUES (?, ?)",
+                                   ((gram, file_id) for gram in grams))
+
+    def _forget(self, db, path):
+        row = db.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+        if row:
+            db.execute("DELETE FROM trigrams WHERE file_id = ?", row)
+            db.execute("DELETE FROM files WHERE id = ?", row)
+
+
+# --- One index per folder for the whole app ---
+_indexes = {}
+
+
+def open_index(folder):
+    folder = os.path.abspath(folder)
+    if folder not in _indexes:
+        _indexes[folder] = TrigramIndex(folder)
+    return _indexes[folder]
+
+
+# Called after the editor saved `path`: refresh it in any index that covers it
+def notify_saved(path):
+    path = os.path.abspath(path)
+    for folder, index in _indexes.items():
+        if path.startswith(folder + os.sep):
+            index.update_file(path)
@@ -0,0 +1,254 @@
+import sys
+from collections import deque
+
+# --- UNDO / REDO ---
+# Tk's built-in undo (Text(undo=True)) keeps every change forever, so a long
+# session on a big file, a few Replace Alls or a huge paste could pile up
+# gigabytes of history.
+#
+# The UndoManager keeps its own history from the edits reported by
+# text_hooks.py. Every change is a small "delta":
+#   [offset, removed text, inserted text]
+# and one undo step is a group of deltas. Typing is collected into
+# word-sized groups ("hello " then "world"), everything one key press or
+# command does in one go (e.g. typing over a selection) is one group, and
+# begin_group()/end_group() let bigger operations like Replace All become a
+# single step.
+#
+# The history has a memory budget: when it's over, the oldest steps are
+# dropped. memory_use() tells how much it holds right now.
+#
+#   undo = UndoManager(text, hooks, buffer)
+#   undo.undo() / undo.redo()
+#   undo.begin_group() ... undo.end_group()
+#   undo.pause() ... undo.resume()          # around loading a file
+
+UNDO_BUDGET = 32 * 1024 * 1024      # bytes of history kept per document
+_DELTA_OVERHEAD = sys.getsizeof([0, "", ""])
+
+
+def _delta_size(delta):
+    return _DELTA_OVERHEAD + sys.getsizeof(delta[1]) + sys.getsizeof(delta[2])
+
+
+def format_bytes(count):
+    for unit in ("B", "KB", "MB"):
+        if count < 1024:
+            return f"{count:.0f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+
+class _Group:
+    __slots__ = ("deltas", "size")
+
+    def __init__(self):
+        self.deltas = []
+        self.size = 0
+
+
+class UndoManager:
+    def __init__(self, text_widget, hooks, buffer, budget=UNDO_BUDGET):
+        self.text = text_widget
+        self.buffer = buffer
+        self.budget = budget
+        self.undo_stack = deque()   # oldest step first
+        self.redo_stack = deque()   # the next step to redo last
+        self.bytes = 0
+        self.paused = False
+        self.truncated = False      # steps were dropped to stay in budget
+        self._open = None           # the group typing may still extend
+        self._depth = 0             # nesting of begin_group()
+        self._in_burst = False      # an edit already happened in this event
+        self._applying = False      # our own undo/redo edits aren't recorded
+        self._dropping = False      # the group being built went over budget
+        hooks.add_edit_listener(self.on_edit)
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def memory_use(self):
+        return self.bytes
+
+    # --- Recording ---
+    def on_edit(self, event):
+        if self._applying or self.paused:
+            return
+        if event.kind == "reset":
+            # Something we couldn't follow: the offsets in the history are
+            # no longer trustworthy
+            self.clear()
+            return
+        if event.kind == "insert":
+            delta = [event.offset, "", event.text]
+        else:
+            delta = [event.offset, event.text, ""]
+
+        if self.redo_stack:
+            self.bytes -= sum(group.size for group in self.redo_stack)
+            self.redo_stack.clear()
+        if self._dropping:
+            return
+        # A typed character goes by the word rule even when keys arrive
+        # faster than Tk goes idle
+        typed = len(delta[1]) + len(delta[2]) == 1
+        group = self._open
+        if group is None or not (self._depth or (self._in_burst and not typed)
+                                 or self._continues_typing(group, delta)):
+            group = self._open = _Group()
+            self.undo_stack.append(group)
+        self._add(group, delta)
+
+        # Edits made in the same event (one key press, one paste) belong
+        # together; the flag is cleared once Tk is idle again
+        if not self._in_burst:
+            self._in_burst = True
+            self.text.after_idle(self._end_burst)
+        self._trim()
+
+    def _end_burst(self):
+        self._in_burst = False
+
+    # Single characters typed (or deleted) one after the other, until a new
+    # word starts
+    def _continues_typing(self, group, delta):
+        last = group.deltas[-1]
+        offset, removed, inserted = delta
+        if len(removed) + len(inserted) != 1:
+            return False
+        if inserted:
+            return (offset == last[0] + len(last[2])
+                    and not (last[2][-1:].isspace() and not inserted.isspace()))
+        if last[2]:
+            return False
+        if offset == last[0] - 1:       # Backspace
+            return not (last[1][:1].isspace() and not removed.isspace())
+        if offset == last[0]:           # Delete
+            return not (last[1][-1:].isspace() and not removed.isspace())
+        return False
+
+    def _add(self, group, delta):
+        if group.deltas:
+            last = group.deltas[-1]
+            old_size = _delta_size(last)
+            offset, removed, inserted = delta
+            merged = True
+            if not removed and offset == last[0] + len(last[2]):
+                last[2] += inserted                     # typing on
+            elif not inserted and not last[2] and offset == last[0] - len(removed):
+                last[0], last[1] = offset, removed + last[1]    # Backspace
+            elif not inserted and not last[2] and offset == last[0]:
+                last[1] += removed                      # Delete
+            elif not removed and not last[2] and offset == last[0]:
+                last[2] = inserted                      # typed over a selection
+            else:
+                merged = False
+            if merged:
+                change = _delta_size(last) - old_size
+                group.size += change
+                self.bytes += change
+                return
+        group.deltas.append(delta)
+        size = _delta_size(delta)
+        group.size += size
+        self.bytes += size
+
+    # Drop the oldest steps (then the furthest redos) while over budget
+    def _trim(self):
+        while self.bytes > self.budget and (self.undo_stack or self.redo_stack):
+            stack = self.undo_stack if self.undo_stack else self.redo_stack
+            group = stack.popleft()
+            if group is self._open:
+                # Half of a step can't be undone sensibly: let the rest of
+                # this group go too
+                self._open = None
+                self._dropping = self._depth > 0
+            self.bytes -= group.size
+            self.truncated = True
+
+    # --- Grouping ---
+    # Everything between begin_group() and end_group() is one undo step
+    def begin_group(self):
+        if self._depth == 0:
+            self._open = None
+        self._depth += 1
+
+    def end_group(self):
+        self._depth = max(0, self._depth - 1)
+        if self._depth == 0:
+            self._open = None
+            self._dropping = False
+
+    # Stop collecting into the current step (e.g. the cursor was moved)
+    def separate(self):
+        if not self._depth:
+            self._open = None
+
+    # --- Undo / Redo ---
+    def undo(self):
+        self.separate()
+        if not self.undo_stack:
+            return False
+        group = self.undo_stack.pop()
+        position = None
+        self._applying = True
+        try:
+            for offset, removed, inserted in reversed(group.deltas):
+                start = self.buffer.offset_to_index(offset)
+                if inserted:
+                    self.text.delete(start, self.buffer.offset_to_index(offset + len(inserted)))
+                if removed:
+                    self.text.insert(start, removed)
+                position = offset + len(removed)
+        finally:
+            self._applying = False
+        self.redo_stack.append(group)
+        self._show(position)
+        return True
+
+    def redo(self):
+        self.separate()
+        if not self.redo_stack:
+            return False
+        group = self.redo_stack.pop()
+        position = None
+        self._applying = True
+        try:
+            for offset, removed, inserted in group.deltas:
+                start = self.buffer.offset_to_index(offset)
+                if removed:
+                    self.text.delete(start, self.buffer.offset_to_index(offset + len(removed)))
+                if inserted:
+                    self.text.insert(start, inserted)
+                position = offset + len(inserted)
+        finally:
+            self._applying = False
+        self.undo_stack.append(group)
+        self._show(position)
+        return True
+
+    def _show(self, offset):
+        index = self.buffer.offset_to_index(offset)
+        self.text.mark_set("insert", index)
+        self.text.see(index)
+
+    # --- Resetting ---
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.bytes = 0
+        self._open = None
+        self.truncated = False
+
+    # Loading a file isn't something to undo, and the old history doesn't
+    # fit the new text
+    def pause(self):
+        self.clear()
+        self.paused = True
+
+    def resume(self):
+        self.clear()
+        self.paused = False